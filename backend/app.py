@@ -1,7 +1,7 @@
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, make_response, url_for
 from flask_cors import CORS
-import pandas as pd
 import os
+import hashlib
 import sys # Import sys for path manipulation
 from datetime import datetime
 import urllib3
@@ -12,13 +12,13 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
-# Import S3 utility functions
-from headers.s3_utils import read_csv_from_s3, write_df_to_csv_s3
-# Import the sec_edgar_endpoint class from headers.edgarAPI
-from headers.edgarAPI import sec_edgar_endpoint
-# Import the xbrl_data_processor function
-# Make sure xbrl_data_processor also accepts s3_bucket_name
-from headers.xbrlprocessor_check import get_company_cik, fetch_historical_10k_filings_api_get, xbrl_data_processor 
+# Import the shared in-process cache of parsed company DataFrames
+from headers.frame_cache import company_frame_cache
+# Import the company ingestion pipeline and the background job queue that runs it
+from headers.company_ingestion import ingest_company_data, CompanyFreshnessTracker
+from headers.ingestion_jobs import ingestion_jobs
+# Import the shared rate-limited SEC client (for its request metrics)
+from headers.sec_client import sec_client
 
 # Import the new function from src/profitabilityratios.py
 from src.profitabilityratio import get_netmargin, get_operatingmargin
@@ -28,6 +28,9 @@ from src.liquidityratio import get_currentratio, get_cashratio
 from src.solvencyratio import get_debtequityratio, get_debtassetratio
 # Import the new function from src/efficiencyratio.py
 from src.efficiencyratio import get_inventoryturnoverratio, get_assetturnoverratio
+# Import the declarative ratio registry and its vectorized evaluator
+from src.ratio_registry import RATIO_REGISTRY, RATIO_REGISTRY_VERSION
+from src.ratio_engine import evaluate_ratio, evaluate_ratios
 
 app = Flask(__name__)
 CORS(app, origins=["https://effortless-kringle-511233.netlify.app", "http://localhost:3000"])
@@ -42,89 +45,118 @@ if not S3_BUCKET_NAME:
 # This acts like your 'data/' folder, but in S3
 S3_COMPANY_CSV_PREFIX = 'company-csv-data/' 
 
+# Default /api/company-info mode: 'async' always queues an ingestion job, 'swr' serves an
+# existing S3 dataset immediately and revalidates it in the background once older than the TTL
+COMPANY_INFO_MODE = os.environ.get('COMPANY_INFO_MODE', 'async')
+company_freshness = CompanyFreshnessTracker(
+    ttl_seconds=float(os.environ.get('COMPANY_DATA_TTL_SECONDS', 24 * 3600))
+)
+
+def ratio_etag(s3_etag, ratio_key):
+    """Strong ETag of a ratio response computed from the company CSV with S3 ETag `s3_etag`."""
+    return hashlib.sha256(f"{s3_etag}|{RATIO_REGISTRY_VERSION}|{ratio_key}".encode('utf-8')).hexdigest()
+
+
+def conditional_ratio_response(ticker, ratio_key, build_response):
+    """
+    Serves a ratio response with a strong ETag derived from the S3 object ETag of the
+    company CSV, the ratio registry version and `ratio_key`. Requests whose If-None-Match
+    matches get a 304 after at most a HEAD request, without reading the CSV body.
+    Otherwise `build_response(df)` is called with the company frame.
+    """
+    s3_file_key = f"{S3_COMPANY_CSV_PREFIX}{ticker.lower()}.csv"
+    try:
+        s3_etag = company_frame_cache.current_etag(s3_file_key, bucket_name=S3_BUCKET_NAME)
+    except FileNotFoundError:
+        return jsonify({"status": "error", "message": f"No financial data found for {ticker}."}), 404
+
+    etag = ratio_etag(s3_etag, ratio_key)
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        # On a cache miss the CSV may have been rewritten since the HEAD request: tag the body
+        # with the ETag of the object it was actually computed from
+        df, served_etag = company_frame_cache.get_with_etag(s3_file_key, bucket_name=S3_BUCKET_NAME, etag=s3_etag)
+        etag = ratio_etag(served_etag, ratio_key)
+        response = make_response(build_response(df))
+        if response.status_code != 200:
+            return response
+
+    response.set_etag(etag)
+    # Let browsers keep the payload but revalidate it on every use
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
 
 # API ENDPOINT: Receive Ticker and Compute Company Data
 @app.route('/api/company-info/<ticker>', methods=['GET'])
 def get_company_info(ticker):
     """
-    Receives a company ticker, fetches EDGAR data, processes XBRL,
-    saves it to S3, and returns a success message.
-    Only processes data if new data is more recent than existing data or if no existing data.
+    Receives a company ticker and enqueues a background ingestion job that fetches
+    EDGAR data, processes XBRL and saves it to S3 (only if newer data is available).
+    Returns 202 with the job id; progress is reported by /api/company-info/jobs/<job_id>.
+    Concurrent requests for the same ticker share the in-flight job.
+
+    With ?mode=swr (or COMPANY_INFO_MODE=swr) a ticker already ingested into S3 is
+    confirmed with 200 straight away; if its data is older than COMPANY_DATA_TTL_SECONDS
+    a revalidation job is queued in the background and reported in the response.
     """
     print(f"Backend received request for ticker: {ticker}")
 
-    # Dynamically set the S3 file key based on the ticker
-    s3_file_key = f"{S3_COMPANY_CSV_PREFIX}{ticker.lower()}.csv"
-    print(f"Using S3 file key: s3://{S3_BUCKET_NAME}/{s3_file_key}")
+    mode = request.args.get('mode', COMPANY_INFO_MODE)
+    if mode not in ('async', 'swr'):
+        return jsonify({"status": "error", "message": f"Unknown mode '{mode}', expected 'async' or 'swr'."}), 400
 
-    try:
-        # Step 1: Create an instance of sec_edgar_endpoint
-        #edgar_api = sec_edgar_endpoint()
-        # Step 2: Call the main_execution function to get reporting data
-        #reportings_data, cik = edgar_api.main_execution(ticker)
-        cik = get_company_cik(ticker)
-        reportings_data = fetch_historical_10k_filings_api_get(cik, ticker)
-        print(f"Reportings data obtained for {ticker}:\n{reportings_data.head()}")
-
-        # Ensure 'reporting_date' is in datetime format for proper comparison
-        reportings_data['reporting_date'] = pd.to_datetime(reportings_data['reporting_date'])
-
-        # Get the latest report date from the newly fetched data
-        latest_fetched_date = reportings_data['reporting_date'].max()
-        print(f"Latest fetched report date from accessionNumber datatable: {latest_fetched_date}")
-
-        latest_stored_date = None
-        
-        # Check if the ticker-specific CSV exists in S3 and load it
+    def submit_ingestion():
+        return ingestion_jobs.submit(
+            ticker,
+            lambda progress_callback: ingest_company_data(
+                ticker, S3_BUCKET_NAME, S3_COMPANY_CSV_PREFIX, progress_callback=progress_callback
+            ),
+        )
+
+    if mode == 'swr':
+        s3_file_key = f"{S3_COMPANY_CSV_PREFIX}{ticker.lower()}.csv"
         try:
-            existing_df = read_csv_from_s3(file_key=s3_file_key, bucket_name=S3_BUCKET_NAME)
-            
-            # Identify date columns by excluding 'Accounting Variable'
-            date_columns = [col for col in existing_df.columns if col != 'Accounting Variable']
-            
-            # Convert date column names to datetime objects and find the maximum date
-            if date_columns:
-                latest_stored_date = pd.to_datetime(date_columns).max()
-                print(f"Latest stored report date for {ticker} in S3: {latest_stored_date}")
-            else:
-                print(f"No date columns found in existing S3 file {s3_file_key}. Will process new data.")
-
-        except FileNotFoundError:
-            print(f"No existing data file found for {ticker} in S3: {s3_file_key}")
-        except pd.errors.EmptyDataError:
-            print(f"Existing S3 file {s3_file_key} is empty. Will process new data.")
+            exists, stale = company_freshness.check(s3_file_key, bucket_name=S3_BUCKET_NAME)
         except Exception as e:
-            print(f"Error reading existing CSV from S3 {s3_file_key}: {e}. Will process new data.")
-
-        # Conditionally process and save data
-        if latest_stored_date is None or latest_fetched_date > latest_stored_date:
-            print("Newer data available or no existing data. Processing financial data...")
-            # Step 3: Process the financial data using xbrl_data_processor
-            # Ensure xbrl_data_processor handles S3 writes (as per previous modifications)
-            processed_financial_data = xbrl_data_processor(reportings_data, ticker, cik)
-            print(f"Processed financial data for {ticker}:\n{processed_financial_data.head()}")
-
-            # Step 4: Save the processed DataFrame to S3
-            write_df_to_csv_s3(processed_financial_data, file_key=s3_file_key, bucket_name=S3_BUCKET_NAME)
-            print(f"Data for {ticker} saved to s3://{S3_BUCKET_NAME}/{s3_file_key}")
-
-            message = "Company's Latest Financial data obtained and saved to S3!"
-            if latest_stored_date is None:
-                message = "Company's financial data obtained and saved to S3 for the first time."
-            elif latest_fetched_date > latest_stored_date:
-                 message = "Company's financial data updated with more recent information in S3."
-
-            return jsonify({"status": "success", "message": message, "ticker": ticker})
-        else:
-            print("Existing data in S3 is already up to date. No new processing needed.")
-            return jsonify({"status": "success", "message": "Company's financial data in S3 is already up to date.", "ticker": ticker})
-
-    except ValueError as e:
-        print(f"ValueError in get_company_info: {e}")
-        return jsonify({"status": "error", "message": str(e)}), 404
-    except Exception as e:
-        print(f"Unexpected error in get_company_info: {e}")
-        return jsonify({"status": "error", "message": f"An unexpected error occurred: {str(e)}"}), 500
+            print(f"Freshness check failed for {s3_file_key}: {e}. Falling back to ingestion.")
+            exists, stale = False, False
+
+        if exists:
+            response = {
+                "status": "success",
+                "message": "Company's financial data is available in S3.",
+                "ticker": ticker,
+                "stale": stale,
+            }
+            if stale:
+                # Serve what we have and refresh it in the background
+                job = submit_ingestion()
+                response["job_id"] = job["job_id"]
+                response["status_url"] = url_for('get_company_info_job', job_id=job["job_id"])
+            return jsonify(response)
+
+    job = submit_ingestion()
+    return jsonify({
+        "status": "accepted",
+        "message": "Company's financial data ingestion has been queued.",
+        "ticker": ticker,
+        "job_id": job["job_id"],
+        "job_status": job["status"],
+        "status_url": url_for('get_company_info_job', job_id=job["job_id"]),
+    }), 202
+
+# API ENDPOINT: Status of a company data ingestion job
+@app.route('/api/company-info/jobs/<job_id>', methods=['GET'])
+def get_company_info_job(job_id):
+    """
+    Returns the state of an ingestion job, including per-filing progress.
+    """
+    job = ingestion_jobs.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": f"Unknown ingestion job {job_id}."}), 404
+    return jsonify({"status": "success", "data": job})
     
 # API ENDPOINT: Compute Profitability Ratio: NetMargin 
 @app.route('/api/profitability/net-margin/<ticker>', methods=['GET'])
@@ -135,11 +167,7 @@ def get_profitability_netmargin(ticker):
     """
     print(f"Backend received request for Net Margin and Revenue data.")
     # Call the outsourced function
-    # Dynamically set the S3 file key based on the ticker
-    s3_file_key = f"{S3_COMPANY_CSV_PREFIX}{ticker.lower()}.csv"
-    df = read_csv_from_s3(file_key=s3_file_key, bucket_name=S3_BUCKET_NAME)
-    response_data = get_netmargin(df)
-    return response_data
+    return conditional_ratio_response(ticker, 'net-margin', get_netmargin)
 
 # API ENDPOINT: Compute Profitability Ratio: Operating Margin
 @app.route('/api/profitability/operating-margin/<ticker>', methods=['GET'])
@@ -151,11 +179,7 @@ def get_profitability_operatingmargin(ticker):
     print(f"Backend received request for Operating Margin and Revenue data.")
 
     # Call the outsourced function
-    # Dynamically set the S3 file key based on the ticker
-    s3_file_key = f"{S3_COMPANY_CSV_PREFIX}{ticker.lower()}.csv"
-    df = read_csv_from_s3(file_key=s3_file_key, bucket_name=S3_BUCKET_NAME)
-    response_data = get_operatingmargin(df)
-    return response_data
+    return conditional_ratio_response(ticker, 'operating-margin', get_operatingmargin)
 
 # API ENDPOINT: Compute Liquidity Ratio: Current Ratio
 @app.route('/api/liquidity/current-ratio/<ticker>', methods=['GET'])
@@ -167,11 +191,7 @@ def get_liquidity_currentratio(ticker):
     print(f"Backend received request for CurrentRatio.")
 
     # Call the outsourced function
-    # Dynamically set the S3 file key based on the ticker
-    s3_file_key = f"{S3_COMPANY_CSV_PREFIX}{ticker.lower()}.csv"
-    df = read_csv_from_s3(file_key=s3_file_key, bucket_name=S3_BUCKET_NAME)
-    response_data = get_currentratio(df)
-    return response_data
+    return conditional_ratio_response(ticker, 'current-ratio', get_currentratio)
 
 # API ENDPOINT: Compute Liquidity Ratio: Cash Ratio
 @app.route('/api/liquidity/cash-ratio/<ticker>', methods=['GET'])
@@ -183,11 +203,7 @@ def get_liquidity_cashratio(ticker):
     print(f"Backend received request for CashRatio.")
 
     # Call the outsourced function
-    # Dynamically set the S3 file key based on the ticker
-    s3_file_key = f"{S3_COMPANY_CSV_PREFIX}{ticker.lower()}.csv"
-    df = read_csv_from_s3(file_key=s3_file_key, bucket_name=S3_BUCKET_NAME)
-    response_data = get_cashratio(df)
-    return response_data
+    return conditional_ratio_response(ticker, 'cash-ratio', get_cashratio)
 
 # API ENDPOINT: Compute Solvency Ratio: Debt to Equity Ratio
 @app.route('/api/solvency/debtequity-ratio/<ticker>', methods=['GET'])
@@ -198,11 +214,7 @@ def get_solvency_debtequityratio(ticker):
     """
     print(f"Backend received request for Debt to Equity.")
     # Call the outsourced function
-    # Dynamically set the S3 file key based on the ticker
-    s3_file_key = f"{S3_COMPANY_CSV_PREFIX}{ticker.lower()}.csv"
-    df = read_csv_from_s3(file_key=s3_file_key, bucket_name=S3_BUCKET_NAME)
-    response_data = get_debtequityratio(df)
-    return response_data
+    return conditional_ratio_response(ticker, 'debtequity-ratio', get_debtequityratio)
 
 # API ENDPOINT: Compute Solvency Ratio: Debt to Asset Ratio
 @app.route('/api/solvency/debtasset-ratio/<ticker>', methods=['GET'])
@@ -214,11 +226,7 @@ def get_solvency_debtassetratio(ticker):
     print(f"Backend received request for Debt to Asset.")
 
     # Call the outsourced function
-    # Dynamically set the S3 file key based on the ticker
-    s3_file_key = f"{S3_COMPANY_CSV_PREFIX}{ticker.lower()}.csv"
-    df = read_csv_from_s3(file_key=s3_file_key, bucket_name=S3_BUCKET_NAME)
-    response_data = get_debtassetratio(df)
-    return response_data
+    return conditional_ratio_response(ticker, 'debtasset-ratio', get_debtassetratio)
 
 # API ENDPOINT: Compute Efficiency Ratio: Inventory Turnover
 @app.route('/api/efficiency/inventoryturnover-ratio/<ticker>', methods=['GET'])
@@ -230,11 +238,7 @@ def get_efficiency_inventoryturnoverratio(ticker):
     print(f"Backend received request for Inventory Tunrover.")
 
     # Call the outsourced function
-    # Dynamically set the S3 file key based on the ticker
-    s3_file_key = f"{S3_COMPANY_CSV_PREFIX}{ticker.lower()}.csv"
-    df = read_csv_from_s3(file_key=s3_file_key, bucket_name=S3_BUCKET_NAME)
-    response_data = get_inventoryturnoverratio(df)
-    return response_data
+    return conditional_ratio_response(ticker, 'inventoryturnover-ratio', get_inventoryturnoverratio)
 
 # API ENDPOINT: Compute Efficiency Ratio: Asset Turnover
 @app.route('/api/efficiency/assetturnover-ratio/<ticker>', methods=['GET'])
@@ -246,13 +250,73 @@ def get_efficiency_assetturnoverratio(ticker):
     print(f"Backend received request for Asset Tunrover.")
 
     # Call the outsourced function
-    # Dynamically set the S3 file key based on the ticker
-    s3_file_key = f"{S3_COMPANY_CSV_PREFIX}{ticker.lower()}.csv"
-    df = read_csv_from_s3(file_key=s3_file_key, bucket_name=S3_BUCKET_NAME)
-    response_data = get_assetturnoverratio(df)
-    return response_data
+    return conditional_ratio_response(ticker, 'assetturnover-ratio', get_assetturnoverratio)
+# API ENDPOINT: Any registered ratio by name
+@app.route('/api/ratio/<name>/<ticker>', methods=['GET'])
+def get_ratio(name, ticker):
+    """
+    Evaluates the ratio registered under `name` in src/ratio_registry.py
+    and returns it in the same shape as the individual ratio endpoints.
+    """
+    print(f"Backend received request for ratio {name} of {ticker}.")
+
+    definition = RATIO_REGISTRY.get(name)
+    if definition is None:
+        return jsonify({
+            "status": "error",
+            "message": f"Unknown ratio '{name}'. Available ratios: {', '.join(RATIO_REGISTRY)}."
+        }), 404
 
+    def build_response(df):
+        response_data, status_code = evaluate_ratio(df, definition)
+        return jsonify(response_data), status_code
 
+    return conditional_ratio_response(ticker, name, build_response)
+
+# API ENDPOINT: All ratios for a ticker in one request
+@app.route('/api/ratios/<ticker>', methods=['GET'])
+def get_all_ratios(ticker):
+    """
+    Loads the company frame once and evaluates every registered ratio (or the comma
+    separated subset given in `?metrics=`) against it in a single pass, returning
+    one payload per metric in the same shape as the individual ratio endpoints.
+    """
+    print(f"Backend received request for bundled ratios of {ticker}.")
+
+    metrics_param = request.args.get('metrics')
+    if metrics_param:
+        metrics = list(dict.fromkeys(m.strip() for m in metrics_param.split(',') if m.strip()))
+        unknown = [m for m in metrics if m not in RATIO_REGISTRY]
+        if unknown:
+            return jsonify({
+                "status": "error",
+                "message": f"Unknown metrics: {', '.join(unknown)}. Available metrics: {', '.join(RATIO_REGISTRY)}."
+            }), 400
+    else:
+        metrics = list(RATIO_REGISTRY)
+
+    def build_response(df):
+        results = evaluate_ratios(df, [RATIO_REGISTRY[m] for m in metrics])
+        return jsonify({
+            "status": "success",
+            "ticker": ticker,
+            "data": {metric: payload for metric, (payload, _) in results.items()}
+        })
+
+    return conditional_ratio_response(ticker, ','.join(sorted(metrics)), build_response)
+
+# API ENDPOINT: Backend cache metrics
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Returns the hit/miss/eviction counters of the in-process caches and the
+    submitted/coalesced counters of the ingestion job queue and per-host SEC request metrics.
+    """
+    return jsonify({"status": "success", "data": {
+        "frame_cache": company_frame_cache.stats(),
+        "ingestion_jobs": ingestion_jobs.stats(),
+        "sec_client": sec_client.stats(),
+    }})
 
 
 if __name__ == '__main__':
@@ -0,0 +1,170 @@
+import json
+from array import array
+from datetime import date, datetime
+
+from .sec_client import sec_client
+
+try:
+    import ijson
+except ImportError:  # Optional: without it the whole document is loaded with json and filtered afterwards
+    ijson = None
+
+COMPANY_FACTS_URL = "https://data.sec.gov/api/xbrl/companyfacts/CIK{cik}.json"
+
+
+class CompanyFactsBuffer:
+    """
+    Columnar store of the companyfacts entries kept by load_company_facts: int32 concept and
+    accession codes, float64 values and int32 period end day ordinals, one row per entry.
+    Concept names and accession numbers are stored once each.
+    """
+
+    def __init__(self):
+        self.concept_names = []
+        self.accession_numbers = []
+        self._concept_codes = {}
+        self._accession_codes = {}
+        self.concepts = array('i')
+        self.accessions = array('i')
+        self.values = array('d')
+        self.ends = array('i')
+
+    def __len__(self):
+        return len(self.values)
+
+    def append(self, concept, accession, value, end):
+        """Adds one entry; `end` is the period end as a proleptic Gregorian ordinal."""
+        concept_code = self._concept_codes.get(concept)
+        if concept_code is None:
+            concept_code = self._concept_codes[concept] = len(self.concept_names)
+            self.concept_names.append(concept)
+        accession_code = self._accession_codes.get(accession)
+        if accession_code is None:
+            accession_code = self._accession_codes[accession] = len(self.accession_numbers)
+            self.accession_numbers.append(accession)
+        self.concepts.append(concept_code)
+        self.accessions.append(accession_code)
+        self.values.append(value)
+        self.ends.append(end)
+
+    def facts(self):
+        """All entries as (concept, value, period end datetime) tuples."""
+        ends = {}
+        facts = []
+        for concept, value, end in zip(self.concepts, self.values, self.ends):
+            if end not in ends:
+                ends[end] = datetime.fromordinal(end)
+            facts.append((self.concept_names[concept], value, ends[end]))
+        return facts
+
+    def by_accession(self):
+        """
+        {accession number: [(concept, value, period end datetime), ...]}. companyfacts lists every
+        non-dimensional fact once per filing it appeared in, so each accession's list holds the
+        current and comparative period facts that parsing that filing's XBRL instance would give.
+        """
+        ends = {}
+        facts_by_accession = {}
+        for concept, accession, value, end in zip(self.concepts, self.accessions, self.values, self.ends):
+            if end not in ends:
+                ends[end] = datetime.fromordinal(end)
+            facts_by_accession.setdefault(self.accession_numbers[accession], []).append(
+                (self.concept_names[concept], value, ends[end])
+            )
+        return facts_by_accession
+
+
+def _append_entry(buffer, concept, entry, since):
+    end = entry.get('end')
+    value = entry.get('val')
+    # ISO dates compare like the dates they spell, no parsing needed to filter
+    if value is None or not end or not entry.get('accn') or (since and end < since):
+        return
+    try:
+        buffer.append(concept, entry['accn'], float(value), date.fromisoformat(end[:10]).toordinal())
+    except (TypeError, ValueError):
+        pass  # Malformed entry, skipped like the others outside the filter
+
+
+# Nesting depth of the maps/arrays in {"facts": {taxonomy: {concept: {"units": {unit: [entry]}}}}}
+_TAXONOMY_DEPTH, _CONCEPT_DEPTH, _ENTRY_DEPTH = 2, 3, 7
+
+
+def _scan_events(events, buffer, concepts, since, taxonomies):
+    # ijson basic_parse events: only the depth is tracked, no prefix strings are built
+    depth = 0
+    in_facts = in_taxonomy = False
+    concept = None  # Wanted concept being read, None while skipping one
+    entry = field = None
+    for event, value in events:
+        if event == 'map_key':
+            if depth == _ENTRY_DEPTH:
+                field = value
+            elif depth == _CONCEPT_DEPTH:
+                concept = value if in_taxonomy and (concepts is None or value in concepts) else None
+            elif depth == _TAXONOMY_DEPTH:
+                in_taxonomy = in_facts and value in taxonomies
+            elif depth == 1:
+                in_facts = value == 'facts'
+        elif event == 'start_map' or event == 'start_array':
+            depth += 1
+            if depth == _ENTRY_DEPTH and concept is not None:
+                entry = {}
+        elif event == 'end_map' or event == 'end_array':
+            if depth == _ENTRY_DEPTH and entry is not None:
+                _append_entry(buffer, concept, entry, since)
+                entry = None
+            depth -= 1
+        elif entry is not None and depth == _ENTRY_DEPTH:
+            entry[field] = value
+
+
+def load_company_facts(source, concepts=None, since=None, taxonomies=('us-gaap', 'dei')):
+    """
+    Reads a companyfacts JSON document from the binary file-like `source` into a
+    CompanyFactsBuffer, keeping only the entries of `concepts` (a set, all if None) in
+    `taxonomies` whose period ends on or after `since` (a date).
+
+    With ijson installed the document is streamed: entries outside the filter are never
+    turned into Python objects, and the full document is never held in memory. Otherwise it
+    is loaded with json and filtered afterwards. Raises ValueError on malformed JSON.
+    """
+    buffer = CompanyFactsBuffer()
+    since = since.isoformat() if since else None
+
+    if ijson is not None:
+        try:
+            _scan_events(ijson.basic_parse(source, use_float=True), buffer, concepts, since, taxonomies)
+        except ijson.JSONError as e:
+            raise ValueError(f"Invalid companyfacts JSON: {e}") from e
+        return buffer
+
+    company_facts_data = json.load(source)
+    # In document order, like the streamed path, so both give identical buffers
+    for taxonomy, taxonomy_facts in company_facts_data.get('facts', {}).items():
+        if taxonomy not in taxonomies:
+            continue
+        for concept, concept_data in taxonomy_facts.items():
+            if concepts is not None and concept not in concepts:
+                continue
+            for unit_entries in concept_data.get('units', {}).values():
+                for entry in unit_entries:
+                    _append_entry(buffer, concept, entry, since)
+    return buffer
+
+
+def fetch_company_facts(cik, concepts=None, since=None, headers=None):
+    """
+    Streams the companyfacts JSON of `cik` (one request covering every period the company
+    reported) through the shared SEC client into a CompanyFactsBuffer; see load_company_facts.
+    Raises requests exceptions or ValueError on failure.
+    """
+    response = sec_client.get(COMPANY_FACTS_URL.format(cik=str(cik).zfill(10)), headers=headers, stream=True)
+    try:
+        if response.status_code >= 400:
+            response.content  # Read the (small) error body so it stays available after close()
+        response.raise_for_status()
+        response.raw.decode_content = True  # Let urllib3 undo the gzip transfer encoding
+        return load_company_facts(response.raw, concepts, since)
+    finally:
+        response.close()
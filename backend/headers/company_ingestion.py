@@ -0,0 +1,157 @@
+import os
+import threading
+import time
+
+import pandas as pd
+
+from .s3_utils import write_df_to_csv_s3, head_s3_object
+from .frame_cache import company_frame_cache
+from .dataset_metadata import build_dataset_metadata, latest_stored_report_date, plan_incremental_update
+from .financial_frame import merge_report_columns
+from .concept_map import financial_extractor
+from .xbrlprocessor_check import get_company_cik, fetch_historical_10k_filings_api_get, xbrl_data_processor
+
+
+def incremental_ingestion_enabled():
+    """Whether stored datasets are updated with only their missing filings (INGESTION_INCREMENTAL, default on)."""
+    return os.environ.get('INGESTION_INCREMENTAL', '1') != '0'
+
+
+def ingest_company_data(ticker, bucket_name, csv_prefix, progress_callback=None, incremental=None):
+    """
+    Fetches EDGAR filings for a ticker, processes XBRL and saves the financial
+    DataFrame to S3 as <csv_prefix><ticker>.csv.
+    Only processes data if new data is more recent than existing data or if no existing data.
+
+    In incremental mode (default: incremental_ingestion_enabled()) an existing dataset is
+    updated in place: only the filings whose report dates it lacks are processed and their
+    columns merged into it (see plan_incremental_update), so a yearly refresh parses one 10-K.
+
+    progress_callback is forwarded to xbrl_data_processor to report per-filing progress.
+    Returns a dict with a user facing 'message' and whether the stored data was 'updated'.
+    Raises ValueError if the ticker cannot be resolved.
+    """
+    # Dynamically set the S3 file key based on the ticker
+    s3_file_key = f"{csv_prefix}{ticker.lower()}.csv"
+    print(f"Using S3 file key: s3://{bucket_name}/{s3_file_key}")
+
+    cik = get_company_cik(ticker)
+    if cik is None:
+        raise ValueError(f"Ticker {ticker} not found in SEC database")
+    reportings_data = fetch_historical_10k_filings_api_get(cik, ticker)
+    if reportings_data.empty:
+        raise ValueError(f"No 10-K filings found for {ticker}")
+    print(f"Reportings data obtained for {ticker}:\n{reportings_data.head()}")
+
+    # Ensure 'reporting_date' is in datetime format for proper comparison
+    reportings_data['reporting_date'] = pd.to_datetime(reportings_data['reporting_date'])
+
+    # Get the latest report date from the newly fetched data
+    latest_fetched_date = reportings_data['reporting_date'].max()
+    print(f"Latest fetched report date from accessionNumber datatable: {latest_fetched_date}")
+
+    latest_stored_date = None
+
+    # Read the latest stored report date from the S3 object metadata (HEAD only)
+    try:
+        latest_stored_date = latest_stored_report_date(
+            s3_file_key, bucket_name=bucket_name, load_frame=company_frame_cache.get
+        )
+        if latest_stored_date is not None:
+            print(f"Latest stored report date for {ticker} in S3: {latest_stored_date}")
+        else:
+            print(f"No usable report date for existing S3 file {s3_file_key}. Will process new data.")
+
+    except FileNotFoundError:
+        print(f"No existing data file found for {ticker} in S3: {s3_file_key}")
+    except pd.errors.EmptyDataError:
+        print(f"Existing S3 file {s3_file_key} is empty. Will process new data.")
+    except Exception as e:
+        print(f"Error reading existing CSV from S3 {s3_file_key}: {e}. Will process new data.")
+
+    # Conditionally process and save data
+    if latest_stored_date is None or latest_fetched_date > latest_stored_date:
+        print("Newer data available or no existing data. Processing financial data...")
+        if incremental is None:
+            incremental = incremental_ingestion_enabled()
+        existing_df, report_dates = None, None
+        if incremental and latest_stored_date is not None:
+            try:
+                existing_df = company_frame_cache.get(s3_file_key, bucket_name=bucket_name)
+                report_dates = plan_incremental_update(existing_df, reportings_data, financial_extractor.variables)
+            except Exception as e:
+                print(f"Could not load the stored data of {ticker} for an incremental update: {e}. Rebuilding it.")
+            if report_dates is None:
+                existing_df = None
+
+        if existing_df is not None:
+            print(f"Incremental update of {ticker}: processing {len(report_dates)} new report date(s) "
+                  f"{sorted(str(date) for date in report_dates)}")
+            if progress_callback is not None:
+                for _, row in reportings_data.iterrows():
+                    if pd.notna(row['reporting_date']) and row['reporting_date'].date() not in report_dates:
+                        progress_callback(row['accession_number'], row['reporting_date'].date(), 'done', "already stored")
+
+        processed_financial_data = xbrl_data_processor(
+            reportings_data, ticker, cik, progress_callback=progress_callback, report_dates=report_dates
+        )
+        if existing_df is not None:
+            processed_financial_data = merge_report_columns(
+                existing_df, processed_financial_data, reportings_data['reporting_date'].dropna()
+            )
+        print(f"Processed financial data for {ticker}:\n{processed_financial_data.head()}")
+
+        # Save the processed DataFrame to S3
+        write_df_to_csv_s3(processed_financial_data, file_key=s3_file_key, bucket_name=bucket_name,
+                           metadata=build_dataset_metadata(processed_financial_data, reportings_data))
+        company_frame_cache.invalidate(s3_file_key)
+        print(f"Data for {ticker} saved to s3://{bucket_name}/{s3_file_key}")
+
+        if latest_stored_date is None:
+            message = "Company's financial data obtained and saved to S3 for the first time."
+        else:
+            message = "Company's financial data updated with more recent information in S3."
+        return {"message": message, "updated": True}
+
+    print("Existing data in S3 is already up to date. No new processing needed.")
+    return {"message": "Company's financial data in S3 is already up to date.", "updated": False}
+
+
+class CompanyFreshnessTracker:
+    """
+    Decides, without touching EDGAR, whether an ingested company dataset can be served as is
+    and whether it is due for a background revalidation (stale-while-revalidate).
+
+    A dataset is stale once neither its S3 LastModified time nor the last revalidation
+    scheduled by this process is within `ttl_seconds`. Datasets checked within the TTL are
+    answered from memory without an S3 request.
+    """
+
+    def __init__(self, ttl_seconds=24 * 3600):
+        self.ttl_seconds = ttl_seconds
+        self._checked_at = {}  # s3 file key -> time the dataset was last known fresh
+        self._lock = threading.Lock()
+
+    def check(self, file_key, bucket_name=None):
+        """
+        Returns (exists, stale) for the dataset at `file_key`.
+        A stale dataset is marked as revalidating, so only the first caller sees stale=True
+        until the TTL elapses again.
+        """
+        now = time.time()
+        with self._lock:
+            checked_at = self._checked_at.get(file_key)
+        if checked_at is not None and now - checked_at < self.ttl_seconds:
+            return True, False
+
+        try:
+            last_modified = head_s3_object(file_key, bucket_name=bucket_name)['LastModified'].timestamp()
+        except FileNotFoundError:
+            return False, False
+
+        with self._lock:
+            checked_at = max(last_modified, self._checked_at.get(file_key, 0.0))
+            stale = now - checked_at >= self.ttl_seconds
+            # Either fresh as of its last write, or a revalidation is being scheduled right now
+            self._checked_at[file_key] = now if stale else checked_at
+        return True, stale
@@ -0,0 +1,33 @@
+def build_concept_index(facts, concepts=None):
+    """
+    Builds {concept: (concept, value, date)} from a list of (concept, value, date) fact tuples,
+    keeping the latest-dated tuple per concept (the first one seen on ties).
+    One pass over the facts, so every later lookup is a dict read. If `concepts` (a set) is
+    given, facts of any other concept are skipped.
+    """
+    concept_index = {}
+    for fact in facts:
+        if concepts is not None and fact[0] not in concepts:
+            continue
+        latest = concept_index.get(fact[0])
+        if latest is None or fact[2] > latest[2]:
+            concept_index[fact[0]] = fact
+    return concept_index
+
+
+def find_latest_in_index(concept_index, search_string_list):
+    """
+    Index-backed equivalent of find_latest_tuple_by_string: returns the latest tuple of the
+    first concept in `search_string_list` that was reported, or None if none of them was.
+    """
+    for search_element in search_string_list:
+        latest = concept_index.get(search_element)
+        if latest is not None:
+            return latest
+    return None
+
+
+def latest_concept_value(concept_index, search_string_list, default=0.0):
+    """Returns the value of find_latest_in_index, or `default` if none of the concepts was reported."""
+    latest = find_latest_in_index(concept_index, search_string_list)
+    return latest[1] if latest is not None else default
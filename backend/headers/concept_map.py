@@ -0,0 +1,212 @@
+from dataclasses import dataclass
+
+from .concept_index import build_concept_index, find_latest_in_index
+
+
+@dataclass(frozen=True)
+class ConceptMapping:
+    """
+    Declarative description of how one 'Accounting Variable' is read from a filing's facts.
+
+    name:      Variable (row) name.
+    concepts:  Ordered us-gaap concept candidates; the latest fact of the first reported one wins.
+    derive:    Expression over other variables, e.g. 'LongTermDebt(BV) + ShortTermDebt(BV)'
+               (only '+' and '-' between space separated names). Used when none of `concepts`
+               was reported, or always if there are no concepts.
+    default:   Value when neither a concept nor a derivation applies.
+    output:    False for helper variables only used by derivations, never written as a row.
+    """
+    name: str
+    concepts: tuple = ()
+    derive: str = None
+    default: float = 0.0
+    output: bool = True
+
+
+def _parse_expression(expression):
+    """'A + B - C' -> [(1, 'A'), (1, 'B'), (-1, 'C')]"""
+    tokens = expression.split()
+    terms = [(1, tokens[0])]
+    for i in range(1, len(tokens), 2):
+        if tokens[i] not in ('+', '-') or i + 1 >= len(tokens):
+            raise ValueError(f"Invalid derived expression: {expression!r}")
+        terms.append((1 if tokens[i] == '+' else -1, tokens[i + 1]))
+    return terms
+
+
+class ConceptExtractor:
+    """
+    A concept mapping table compiled once into a single-pass extractor.
+
+    extract() makes one pass over a report date's (concept, value, date) facts, keeping only
+    the concepts the table refers to, resolves every variable's concept candidates from that
+    index and then evaluates the derived variables in dependency order.
+    `variables` selects and orders the output rows (all output mappings, in table order, by default).
+    """
+
+    def __init__(self, mappings, variables=None):
+        self.mappings = {mapping.name: mapping for mapping in mappings}
+        if variables is None:
+            variables = [mapping.name for mapping in mappings if mapping.output]
+        self.variables = list(variables)
+
+        self._terms = {
+            name: _parse_expression(mapping.derive)
+            for name, mapping in self.mappings.items() if mapping.derive
+        }
+        self._order = self._resolution_order()
+        self.concepts = frozenset(
+            concept for name in self._order for concept in self.mappings[name].concepts
+        )
+
+    def _resolution_order(self):
+        # Depth-first topological sort of the variables the output rows depend on
+        order, state = [], {}
+
+        def visit(name, path):
+            if name not in self.mappings:
+                raise ValueError(f"Unknown variable {name!r} in concept mapping ({' -> '.join(path)})")
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'visiting':
+                raise ValueError(f"Circular derivation in concept mapping: {' -> '.join(path + [name])}")
+            state[name] = 'visiting'
+            for _, dependency in self._terms.get(name, ()):
+                visit(dependency, path + [name])
+            state[name] = 'done'
+            order.append(name)
+
+        for variable in self.variables:
+            visit(variable, [])
+        return order
+
+    def resolve(self, facts):
+        """
+        Returns ({variable: value}, {variable: sources}) for the output variables of one report
+        date's facts. `sources` is the frozenset of concepts the value was read from (all the
+        concepts behind a derived value); an empty set means the default was used.
+        """
+        concept_index = build_concept_index(facts, self.concepts)
+        values, sources = {}, {}
+        for name in self._order:
+            mapping = self.mappings[name]
+            latest = find_latest_in_index(concept_index, mapping.concepts) if mapping.concepts else None
+            if latest is not None:
+                values[name] = latest[1]
+                sources[name] = frozenset((latest[0],))
+            elif name in self._terms:
+                values[name] = sum(sign * values[dependency] for sign, dependency in self._terms[name])
+                sources[name] = frozenset().union(*(sources[dependency] for _, dependency in self._terms[name]))
+            else:
+                values[name] = mapping.default
+                sources[name] = frozenset()
+        return ({variable: values[variable] for variable in self.variables},
+                {variable: sources[variable] for variable in self.variables})
+
+    def extract(self, facts):
+        """Returns {variable: value} for the output variables of one report date's facts."""
+        return self.resolve(facts)[0]
+
+    def fill(self, financial_matrix, date_str, facts):
+        """
+        Writes the extracted variables of `facts` into the `date_str` column of a FinancialMatrix
+        and returns their sources (see resolve).
+        """
+        values, sources = self.resolve(facts)
+        for variable, value in values.items():
+            financial_matrix.set(variable, date_str, value)
+        return sources
+
+
+def _with_overrides(mappings, overrides):
+    """Copy of `mappings` with same-named entries replaced by `overrides` and the others appended."""
+    overrides = {mapping.name: mapping for mapping in overrides}
+    merged = [overrides.pop(mapping.name, mapping) for mapping in mappings]
+    return merged + list(overrides.values())
+
+
+# Variables of company_data.csv, as filled by xbrl_data_processor
+FINANCIAL_CONCEPT_MAP = [
+    ConceptMapping('Revenue', ("Revenues", "RevenueFromContractWithCustomerExcludingAssessedTax")),
+    ConceptMapping('CostofSales', ("CostOfRevenue", "CostOfGoodsAndServicesSold")),
+    ConceptMapping('GrossProfit', ("GrossProfit",)),
+    ConceptMapping('OperatingExpense', ("CostsAndExpenses",)),
+    ConceptMapping('ResearchExpense', ("ResearchAndDevelopmentExpense",)),
+    ConceptMapping('Depreciation', ("Depreciation", "DepreciationDepletionAndAmortization",
+                                    "DepreciationAmortizationAndOther", "DepreciationAmortizationAndAccretionNet")),
+    ConceptMapping('Amortization', ("AmortizationOfIntangibleAssets",)),
+    ConceptMapping('OperatingIncome', ("OperatingIncomeLoss",)),
+    ConceptMapping('Interest', ("InterestExpense",)),
+    ConceptMapping('Tax', ("IncomeTaxExpenseBenefit",)),
+    ConceptMapping('NetIncome', ("NetIncomeLoss",)),
+    ConceptMapping('TotalAsset', ("Assets",)),
+    ConceptMapping('CurrentAssets', ("AssetsCurrent",)),
+    ConceptMapping('Inventory', ("InventoryNet",)),
+    ConceptMapping('PPEnet', ("PropertyPlantAndEquipmentNet",)),
+    ConceptMapping('Equity(BV)', ("StockholdersEquity",)),
+    ConceptMapping('ShortTermDebt(BV)', ("DebtCurrent",)),
+    ConceptMapping('LongTermDebt(BV)', derive='LongTermDebtWithoutLease(BV) + LongTermLease(BV)'),
+    ConceptMapping('Debt(BV)', derive='LongTermDebt(BV) + ShortTermDebt(BV)'),
+    ConceptMapping('CurrentLiabilities', ("LiabilitiesCurrent",)),
+    ConceptMapping('LiabilitiesAndStockholdersEquity', ("LiabilitiesAndStockholdersEquity",), output=False),
+    ConceptMapping('TotalLiability', derive='LiabilitiesAndStockholdersEquity - Equity(BV)'),
+    ConceptMapping('LongTermDebtWithoutLease(BV)', ("LongTermDebtNoncurrent",)),
+    ConceptMapping('LongTermLease(BV)', ("LongTermLeaseLiabilityNoncurrentNet",)),
+    ConceptMapping('LeaseDueThisYear', ("CurrentLeaseLiabilityNet",)),
+    ConceptMapping('LeaseDueYearOne', ("LesseeOperatingLeaseLiabilityPaymentsDueNextTwelveMonths",)),
+    ConceptMapping('LeaseDueYearTwo', ("LesseeOperatingLeaseLiabilityPaymentsDueYearTwo",)),
+    ConceptMapping('LeaseDueYearThree', ("LesseeOperatingLeaseLiabilityPaymentsDueYearThree",)),
+    ConceptMapping('LeaseDueYearFour', ("LesseeOperatingLeaseLiabilityPaymentsDueYearFour",)),
+    ConceptMapping('LeaseDueYearFive', ("LesseeOperatingLeaseLiabilityPaymentsDueYearFive",)),
+    ConceptMapping('LeaseDueAfterYearFive', ("LesseeOperatingLeaseLiabilityPaymentsDueAfterYearFive",)),
+    ConceptMapping('Cash', ("CashAndCashEquivalentsAtCarryingValue",)),
+]
+
+# Bulk loader (xbrlprocesscheck): more concept fallbacks and a few extra rows
+EXTENDED_CONCEPT_MAP = _with_overrides(FINANCIAL_CONCEPT_MAP, [
+    ConceptMapping('Interest', ("InterestExpense", "InterestExpenseNonoperating", "InterestAndDebtExpense",
+                                "InterestIncomeExpenseNet")),
+    ConceptMapping('NetIncome', ("NetIncomeLoss", "ProfitLoss", "NetIncomeLossAvailableToCommonStockholdersBasic")),
+    ConceptMapping('LongTermDebtWithoutLease(BV)', ("LongTermDebtNoncurrent", "LongTermDebt")),
+    ConceptMapping('Debt(BV)', derive='LongTermDebtWithLease(BV) + ShortTermDebt(BV)'),
+    ConceptMapping('Cash', ("CashAndCashEquivalentsAtCarryingValue",
+                            "CashCashEquivalentsRestrictedCashAndRestrictedCashEquivalents")),
+    ConceptMapping('LongTermDebtWithLease(BV)',
+                   ("LongTermDebtAndCapitalLeaseObligations",
+                    "LongTermDebtAndCapitalLeaseObligationsIncludingCurrentMaturities",
+                    "DebtAndCapitalLeaseObligations"),
+                   derive='LongTermDebtWithoutLease(BV) + LongTermLease(BV)'),
+    ConceptMapping('OperatingIncomeAfterInterest',
+                   ("IncomeLossFromContinuingOperationsBeforeIncomeTaxesMinorityInterestAndIncomeLossFromEquityMethodInvestments",
+                    "IncomeLossFromContinuingOperationsBeforeIncomeTaxesExtraordinaryItemsNoncontrollingInterest")),
+    ConceptMapping('InterestIncome', ("InvestmentIncomeInterest",)),
+    ConceptMapping('MinorityInterest', ("MinorityInterest",)),
+    ConceptMapping('EquityIncludingMinorityInterest', ("StockholdersEquityIncludingPortionAttributableToNoncontrollingInterest",)),
+])
+
+FINANCIAL_VARIABLES = [
+    'Revenue', 'CostofSales', 'GrossProfit', 'OperatingExpense', 'ResearchExpense', 'Depreciation', 'Amortization', 'OperatingIncome', 'Interest', 'Tax', 'NetIncome',
+    'TotalAsset', 'CurrentAssets', 'Inventory', 'PPEnet', 'Equity(BV)', 'ShortTermDebt(BV)', 'LongTermDebt(BV)', 'Debt(BV)', 'CurrentLiabilities', 'TotalLiability',
+    'LongTermDebtWithoutLease(BV)', 'LongTermLease(BV)', 'LeaseDueThisYear', 'LeaseDueYearOne', 'LeaseDueYearTwo', 'LeaseDueYearThree', 'LeaseDueYearFour',
+    'LeaseDueYearFive', 'LeaseDueAfterYearFive', 'Cash'
+]
+
+EXTENDED_FINANCIAL_VARIABLES = [
+    'Revenue', 'CostofSales', 'GrossProfit', 'OperatingExpense', 'ResearchExpense', 'Depreciation', 'Amortization', 'OperatingIncome', 'OperatingIncomeAfterInterest', 'InterestIncome', 'Interest', 'Tax', 'NetIncome',
+    'TotalAsset', 'CurrentAssets', 'Inventory', 'PPEnet', 'MinorityInterest', 'EquityIncludingMinorityInterest', 'Equity(BV)', 'ShortTermDebt(BV)', 'LongTermDebtWithLease(BV)', 'Debt(BV)', 'CurrentLiabilities', 'TotalLiability',
+    'LongTermDebtWithoutLease(BV)', 'LongTermLease(BV)', 'LeaseDueThisYear', 'LeaseDueYearOne', 'LeaseDueYearTwo', 'LeaseDueYearThree', 'LeaseDueYearFour',
+    'LeaseDueYearFive', 'LeaseDueAfterYearFive', 'Cash'
+]
+
+# Rows of the legacy xbrlprocessing output
+BASIC_FINANCIAL_VARIABLES = [
+    'Revenue', 'OperatingIncome', 'Equity(BV)', 'ShortTermDebt(BV)',
+    'LongTermDebtWithoutLease(BV)', 'LongTermLease(BV)', 'LongTermDebt(BV)', 'Debt(BV)', 'Cash', 'Tax',
+    'LeaseDueThisYear', 'LeaseDueYearOne', 'LeaseDueYearTwo', 'LeaseDueYearThree', 'LeaseDueYearFour', 'LeaseDueYearFive',
+    'LeaseDueAfterYearFive', 'NetIncome', 'CurrentAssets', 'CurrentLiabilities', 'TotalLiability', 'TotalAsset', 'Inventory'
+]
+
+# Compiled once at import and shared by the XBRL processors
+financial_extractor = ConceptExtractor(FINANCIAL_CONCEPT_MAP, FINANCIAL_VARIABLES)
+extended_financial_extractor = ConceptExtractor(EXTENDED_CONCEPT_MAP, EXTENDED_FINANCIAL_VARIABLES)
+basic_financial_extractor = ConceptExtractor(FINANCIAL_CONCEPT_MAP, BASIC_FINANCIAL_VARIABLES)
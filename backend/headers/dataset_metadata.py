@@ -0,0 +1,74 @@
+import pandas as pd
+
+from .s3_utils import head_s3_object, read_csv_from_s3
+
+# Bump whenever the layout of the company CSV changes, so stored datasets are reprocessed
+DATASET_SCHEMA_VERSION = '1'
+
+# S3 caps user metadata at 2 KB per object; keep the accession list well below that
+MAX_ACCESSION_METADATA_CHARS = 1500
+
+
+def build_dataset_metadata(df, reportings_data):
+    """
+    Builds the S3 object metadata stored alongside a company CSV: the latest report date
+    (latest date column of `df`), the schema version and the accession numbers of the
+    10-K filings in `reportings_data`, most recent first.
+    """
+    date_columns = [col for col in df.columns if col != 'Accounting Variable']
+    latest_report_date = pd.to_datetime(date_columns).max() if date_columns else None
+
+    filings = reportings_data.sort_values('reporting_date', ascending=False)
+    accession_numbers = ''
+    for accession_number in filings['accession_number'].astype(str):
+        candidate = f"{accession_numbers},{accession_number}" if accession_numbers else accession_number
+        if len(candidate) > MAX_ACCESSION_METADATA_CHARS:
+            break
+        accession_numbers = candidate
+
+    return {
+        'latest-report-date': latest_report_date.strftime('%Y-%m-%d') if latest_report_date is not None else '',
+        'schema-version': DATASET_SCHEMA_VERSION,
+        'accession-numbers': accession_numbers,
+    }
+
+
+def latest_stored_report_date(file_key, bucket_name=None, load_frame=None):
+    """
+    Returns the latest report date of the company CSV at `file_key` as a Timestamp, or None
+    if it has no dates or was written with an older schema version (i.e. must be reprocessed).
+
+    The date is read from the object metadata with a single HEAD request. Objects written
+    before the metadata existed fall back to loading the CSV (with `load_frame(file_key,
+    bucket_name=...)`, read_csv_from_s3 by default) and scanning its date columns.
+    Raises FileNotFoundError if the object does not exist.
+    """
+    metadata = head_s3_object(file_key, bucket_name=bucket_name).get('Metadata', {})
+    if 'latest-report-date' in metadata:
+        if metadata.get('schema-version') != DATASET_SCHEMA_VERSION:
+            print(f"Stored data {file_key} has schema version {metadata.get('schema-version')}, "
+                  f"expected {DATASET_SCHEMA_VERSION}.")
+            return None
+        return pd.to_datetime(metadata['latest-report-date']) if metadata['latest-report-date'] else None
+
+    print(f"No report date metadata on {file_key}, reading the CSV instead.")
+    existing_df = (load_frame or read_csv_from_s3)(file_key, bucket_name=bucket_name)
+    date_columns = [col for col in existing_df.columns if col != 'Accounting Variable']
+    return pd.to_datetime(date_columns).max() if date_columns else None
+
+
+def plan_incremental_update(existing_df, reportings_data, variables):
+    """
+    Returns the report dates (datetime.date) of the 10-K filings in `reportings_data` that have
+    no column yet in the stored company frame `existing_df`, i.e. the only filings an update
+    needs to process. Returns None when the stored frame cannot be updated in place because
+    its 'Accounting Variable' rows differ from `variables`, so the dataset must be rebuilt.
+    """
+    if 'Accounting Variable' not in existing_df.columns or list(existing_df['Accounting Variable']) != list(variables):
+        print("Stored data has different variable rows, it will be rebuilt from all filings.")
+        return None
+    stored_dates = {
+        pd.to_datetime(col).date() for col in existing_df.columns if col != 'Accounting Variable'
+    }
+    fetched_dates = {pd.to_datetime(date).date() for date in reportings_data['reporting_date'].dropna()}
+    return fetched_dates - stored_dates
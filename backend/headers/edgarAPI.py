@@ -1,45 +1,25 @@
-import requests
 import pandas as pd
 import warnings
 import json # Import json for explicit parsing
-from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
-import time # For rate limiting, if not already implemented
+
+from .ticker_index import ticker_index
+from .sec_client import sec_client
 
 class sec_edgar_endpoint:
     # ... (existing __init__ with session, headers, and rate limiting logic) ...
     def __init__(self):
         self.headers = {"User-Agent": 'FinancialDataValidator/1.0 (contact@example.com)'}
-        # Create a session for connection pooling
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        # Pooled, rate-limited session shared with the rest of the backend
+        self.session = sec_client
 
     def get_cik_matching_ticker(self, ticker):
-        #self._apply_rate_limit() # Ensure rate limit is applied
         ticker = ticker.upper()
         self.ticker = ticker
         
-        # DEBUGGING CHANGE START
-        print(f"Fetching company_tickers.json for {self.ticker}...")
-        response = self.session.get("https://www.sec.gov/files/company_tickers.json", verify=False, timeout=15) # Add timeout
-        response.raise_for_status() # Raise an exception for HTTP errors (4xx or 5xx)
-        
-        if not response.text.strip(): # Check if response body is empty
-            print(f"ERROR: company_tickers.json response is empty for {self.ticker}. Status: {response.status_code}")
-            raise ValueError(f"Empty response for company_tickers.json while processing {self.ticker}")
-
-        try:
-            ticker_json = response.json()
-        except json.JSONDecodeError as e:
-            print(f"ERROR: Failed to parse JSON for company_tickers.json for {self.ticker}. Error: {e}")
-            print(f"Response text (first 500 chars): {response.text[:500]}")
-            raise ValueError(f"Invalid JSON for company_tickers.json while processing {self.ticker}") from e
-        # DEBUGGING CHANGE END
-
-        for company in ticker_json.values():
-            if company["ticker"] == self.ticker:
-                self.cik = str(company["cik_str"]).zfill(10)
-                return self.cik
+        cik = ticker_index.lookup(self.ticker)
+        if cik is not None:
+            self.cik = cik
+            return self.cik
             
         raise ValueError(f"Ticker {self.ticker} not found in SEC database")
     
@@ -48,7 +28,7 @@ class sec_edgar_endpoint:
         
         # DEBUGGING CHANGE START
         print(f"Fetching submission data for CIK {self.cik} from URL: {url}...")
-        response = self.session.get(url, verify=False, timeout=15) # Add timeout
+        response = self.session.get(url, headers=self.headers, timeout=15) # Add timeout
         response.raise_for_status() # Raise an exception for HTTP errors (4xx or 5xx)
 
         if not response.text.strip(): # Check if response body is empty
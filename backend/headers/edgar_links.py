@@ -0,0 +1,212 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+from .sec_client import sec_client
+
+EDGAR_ARCHIVES_URL = "https://www.sec.gov/Archives/edgar/data"
+
+# XML files of a filing that are not its XBRL instance: linkbases, the filing summary and old R pages
+_NON_INSTANCE_XML = re.compile(r'(_(cal|def|lab|pre)\.xml|^FilingSummary\.xml|^R\d+\.xml)$')
+_DATED_INSTANCE_XML = re.compile(r'-\d{8}\.xml$')
+
+# Answers meaning the document does not exist; other failures (timeouts, 5xx) are probed again next time
+MISSING_STATUSES = (404, 410)
+
+
+class LinkProbeCache:
+    """
+    Outcome of HEAD probes of EDGAR archive URLs. Working links are remembered for good (filed
+    documents never move); missing ones for `negative_ttl_seconds`, so candidates that do not
+    exist are not probed again on every ingestion.
+    """
+
+    def __init__(self, negative_ttl_seconds=24 * 3600):
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._working = set()
+        self._missing = {}  # url -> time the probe found it missing
+        self._lock = threading.Lock()
+
+    def lookup(self, url):
+        """True if `url` is known to work, False if known to be missing, None if unknown."""
+        with self._lock:
+            if url in self._working:
+                return True
+            missing_at = self._missing.get(url)
+            if missing_at is None:
+                return None
+            if time.time() - missing_at < self.negative_ttl_seconds:
+                return False
+            del self._missing[url]
+            return None
+
+    def record(self, url, status_code):
+        with self._lock:
+            if status_code == 200:
+                self._working.add(url)
+            elif status_code in MISSING_STATUSES:
+                self._missing[url] = time.time()
+
+
+link_probe_cache = LinkProbeCache()
+
+
+def _probe(url, headers, timeout):
+    try:
+        return sec_client.head(url, allow_redirects=True, timeout=timeout, headers=headers).status_code
+    except requests.exceptions.RequestException:
+        return None
+
+
+def find_first_working_links(candidate_lists, headers=None, max_workers=8, timeout=10, probe_cache=link_probe_cache):
+    """
+    Returns, for each list of candidate URLs in `candidate_lists`, its first URL (in list order)
+    answering a HEAD request with 200, or None if none does.
+
+    The candidates of all lists are probed concurrently through the shared rate-limited SEC
+    client, so resolving every filing of a ticker takes about one round trip instead of one per
+    candidate. Once a candidate works, the later candidates of its list that have not been sent
+    yet are dropped. Outcomes already in `probe_cache` are not probed again.
+    """
+    best = {}  # list index -> position of its earliest working candidate found so far
+    pending = {}  # future -> (list index, position, url)
+    futures_by_list = defaultdict(list)
+    probes = 0
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for i, urls in enumerate(candidate_lists):
+            for position, url in enumerate(urls):
+                known = probe_cache.lookup(url)
+                if known:
+                    best[i] = position
+                    break  # Later candidates can only lose against a known working one
+                if known is None:
+                    future = pool.submit(_probe, url, headers, timeout)
+                    pending[future] = (i, position, url)
+                    futures_by_list[i].append((position, future))
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                i, position, url = pending.pop(future)
+                if future.cancelled():
+                    continue
+                probes += 1
+                status_code = future.result()
+                probe_cache.record(url, status_code)
+                if status_code == 200 and position < best.get(i, len(candidate_lists[i])):
+                    best[i] = position
+                    for later_position, later_future in futures_by_list[i]:
+                        if later_position > position:
+                            later_future.cancel()
+
+    print(f"Resolved {len(best)} of {len(candidate_lists)} EDGAR links with {probes} HEAD request(s) "
+          f"in {time.perf_counter() - started:.2f}s")
+    return [urls[best[i]] if i in best else None for i, urls in enumerate(candidate_lists)]
+
+
+def pick_instance_document(file_names):
+    """
+    Returns the name of the XBRL instance among the file names of a filing's directory, or None.
+
+    Inline XBRL filings come with an extracted instance <name>_htm.xml; their primary document
+    <name>.htm is picked so it can be read with the streaming reader (the _htm.xml if the
+    .htm is not listed). Older filings have a standalone instance .xml next to their
+    linkbases, usually named <prefix>-<yyyymmdd>.xml.
+    """
+    names = set(file_names)
+    for name in file_names:
+        if name.endswith('_htm.xml'):
+            primary_document = name[:-len('_htm.xml')] + '.htm'
+            return primary_document if primary_document in names else name
+
+    instances = [name for name in file_names if name.endswith('.xml') and not _NON_INSTANCE_XML.search(name)]
+    dated = [name for name in instances if _DATED_INSTANCE_XML.search(name)]
+    return (dated or instances or [None])[0]
+
+
+class FilingIndexResolver:
+    """
+    Resolves the XBRL instance URL of a filing from the index.json of its EDGAR archive
+    directory: one request per accession number instead of HEAD probes of guessed file names.
+
+    Filings never change, so resolved URLs are kept for good, in memory and in a JSON file at
+    `cache_path`. Filings whose index could not be read, or has no instance, are not cached.
+    """
+
+    def __init__(self, cache_path=None, user_agent=None):
+        self.cache_path = cache_path or os.path.join('/tmp', 'edgar_links', 'instance_documents.json')
+        self.headers = {'User-Agent': user_agent} if user_agent else None
+        self._urls = None  # accession number -> instance URL
+        self._lock = threading.Lock()
+
+    def resolve(self, cik, accession_number):
+        """Instance URL of the filing, or None if it cannot be found."""
+        return self.resolve_many(cik, [accession_number])[0]
+
+    def resolve_many(self, cik, accession_numbers, max_workers=8):
+        """Instance URLs (or None) of the filings of `cik`, fetching the unknown indexes concurrently."""
+        with self._lock:
+            if self._urls is None:
+                self._urls = self._load()
+            known = dict(self._urls)
+
+        unknown = [accession for accession in dict.fromkeys(accession_numbers) if accession not in known]
+        if unknown:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                resolved = dict(zip(unknown, pool.map(lambda accession: self._fetch(cik, accession), unknown)))
+            resolved = {accession: url for accession, url in resolved.items() if url}
+            if resolved:
+                with self._lock:
+                    self._urls.update(resolved)
+                    self._persist()
+                known.update(resolved)
+            print(f"Resolved {len(resolved)} of {len(unknown)} filing indexes of CIK {cik} "
+                  f"({len(accession_numbers) - len(unknown)} already known)")
+        return [known.get(accession) for accession in accession_numbers]
+
+    def _fetch(self, cik, accession_number):
+        directory_url = f"{EDGAR_ARCHIVES_URL}/{int(cik)}/{accession_number.replace('-', '')}"
+        try:
+            response = sec_client.get(f"{directory_url}/index.json", headers=self.headers)
+            response.raise_for_status()
+            items = response.json().get('directory', {}).get('item', [])
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"Could not read the filing index of {accession_number}: {e}")
+            return None
+        name = pick_instance_document([item.get('name', '') for item in items])
+        if name is None:
+            print(f"No XBRL instance in the filing index of {accession_number}")
+            return None
+        return f"{directory_url}/{name}"
+
+    def _load(self):
+        try:
+            with open(self.cache_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable filing index cache {self.cache_path}: {e}")
+            return {}
+
+    def _persist(self):
+        # Caller holds _lock
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self._urls, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Could not persist the filing index cache to {self.cache_path}: {e}")
+
+
+filing_index_resolver = FilingIndexResolver(cache_path=os.environ.get('FILING_INDEX_CACHE_PATH'))
@@ -0,0 +1,122 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+
+from .s3_utils import read_bytes_from_s3, write_bytes_to_s3
+
+# Bump whenever the facts extracted from a filing change (reader, filtering), so old entries are ignored.
+# 2: facts whose inline transformation failed are skipped by both readers
+FACT_CACHE_VERSION = '2'
+
+
+class FactCache:
+    """
+    The facts extracted from each filing (see parallel_parse.parse_filings), keyed by accession
+    number. Filed 10-Ks are immutable, so entries never expire: a filing parsed once is never
+    downloaded or parsed again.
+
+    Entries are gzipped JSON files named <accession>-<digest>.json.gz, where the digest covers
+    the concept whitelist the facts were limited to and FACT_CACHE_VERSION. They are kept in
+    `cache_dir` and, when an S3 bucket is configured (`bucket_name` or S3_BUCKET_NAME), under
+    `s3_prefix` in S3, so they survive redeploys and are shared between the web app and the
+    bulk loader. S3 errors are logged and treated as misses.
+
+    Entries do not depend on which reader parsed the filing (XBRL_STREAMING_READER): the
+    streaming reader and extract_instance_facts keep the same facts, skipping those whose
+    value could not be transformed into a number. A change to either reader's filtering must
+    keep them aligned and bump FACT_CACHE_VERSION.
+    """
+
+    def __init__(self, cache_dir, bucket_name=None, s3_prefix='xbrl-fact-cache/'):
+        self.cache_dir = cache_dir
+        self.bucket_name = bucket_name or os.environ.get('S3_BUCKET_NAME')
+        self.s3_prefix = s3_prefix
+        self._digests = {}  # concept whitelist -> digest
+
+    def _file_name(self, accession_number, concepts):
+        digest = self._digests.get(concepts)
+        if digest is None:
+            whitelist = '*' if concepts is None else ','.join(sorted(concepts))
+            digest = hashlib.sha1(f"{FACT_CACHE_VERSION}:{whitelist}".encode()).hexdigest()[:12]
+            self._digests[concepts] = digest
+        return f"{accession_number}-{digest}.json.gz"
+
+    def get(self, accession_number, concepts=None):
+        """
+        Returns {'facts': [(concept, value, period end datetime), ...], 'fact_count': n} as stored
+        by put() for the filing and concept whitelist (a frozenset), or None on a miss.
+        """
+        file_name = self._file_name(accession_number, concepts)
+        path = os.path.join(self.cache_dir, file_name)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = self._read_s3(file_name)
+            if data is None:
+                return None
+            self._write_local(path, data)
+
+        try:
+            entry = json.loads(gzip.decompress(data))
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable fact cache entry {file_name}: {e}")
+            return None
+        concept_names = entry['concepts']
+        ends = {}
+        facts = []
+        for concept, value, end in entry['facts']:
+            if end not in ends:
+                ends[end] = datetime.fromisoformat(end)
+            facts.append((concept_names[concept], value, ends[end]))
+        return {'facts': facts, 'fact_count': entry['fact_count']}
+
+    def put(self, accession_number, concepts, facts, fact_count):
+        """Stores the facts extracted from a filing, locally and in S3."""
+        concept_codes = {}
+        rows = []
+        for concept, value, end in facts:
+            code = concept_codes.setdefault(concept, len(concept_codes))
+            rows.append((code, value, end.strftime('%Y-%m-%d')))
+        entry = {
+            'accession_number': accession_number,
+            'fact_count': fact_count,
+            'concepts': list(concept_codes),
+            'facts': rows,
+        }
+        data = gzip.compress(json.dumps(entry, separators=(',', ':')).encode('utf-8'))
+
+        file_name = self._file_name(accession_number, concepts)
+        self._write_local(os.path.join(self.cache_dir, file_name), data)
+        if self.bucket_name:
+            try:
+                write_bytes_to_s3(data, f"{self.s3_prefix}{file_name}", bucket_name=self.bucket_name,
+                                  content_type='application/gzip')
+            except Exception as e:
+                logging.warning(f"Could not store fact cache entry {file_name} in S3: {e}")
+
+    def _read_s3(self, file_name):
+        if not self.bucket_name:
+            return None
+        try:
+            return read_bytes_from_s3(f"{self.s3_prefix}{file_name}", bucket_name=self.bucket_name)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.warning(f"Could not read fact cache entry {file_name} from S3: {e}")
+            return None
+
+    def _write_local(self, path, data):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Written to a temporary file and renamed, so concurrent readers never see a partial entry
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.warning(f"Could not write fact cache entry {path}: {e}")
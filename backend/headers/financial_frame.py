@@ -0,0 +1,106 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+
+class FinancialMatrix:
+    """
+    Preallocated float64 (variables x report dates) matrix filled by the XBRL processors.
+
+    Rows and columns are addressed by name through dict lookups, and the company DataFrame
+    ('Accounting Variable' column followed by one column per report date) is built once
+    at the end with to_frame().
+    """
+
+    def __init__(self, variables, report_dates):
+        self.variables = list(variables)
+        self.date_columns = [date.strftime('%Y-%m-%d') for date in sorted(report_dates)]
+        self._rows = {variable: i for i, variable in enumerate(self.variables)}
+        self._columns = {date_str: j for j, date_str in enumerate(self.date_columns)}
+        self.values = np.zeros((len(self.variables), len(self.date_columns)), dtype=np.float64)
+
+    def has_date(self, date_str):
+        return date_str in self._columns
+
+    def set(self, variable, date_str, value):
+        """
+        Stores `value` (None is stored as NaN); variables not in this matrix are ignored.
+        Non-numeric values are logged and stored as NaN.
+        """
+        row = self._rows.get(variable)
+        if row is None:
+            return
+        if value is None:
+            value = np.nan
+        else:
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                logging.warning(f"Non-numeric value {value!r} for {variable} on {date_str}, stored as NaN")
+                value = np.nan
+        self.values[row, self._columns[date_str]] = value
+
+    def get(self, variable, date_str):
+        return self.values[self._rows[variable], self._columns[date_str]]
+
+    def to_frame(self):
+        df = pd.DataFrame(self.values, columns=self.date_columns)
+        df.insert(0, 'Accounting Variable', self.variables)
+        return df
+
+
+class CellProvenance:
+    """
+    Records which extraction path served each cell of a FinancialMatrix, e.g. 'companyfacts'
+    or 'xbrl'; cells never recorded are 'missing' (their value is the mapping default).
+    """
+
+    MISSING = 'missing'
+
+    def __init__(self, financial_matrix):
+        self.variables = financial_matrix.variables
+        self.date_columns = financial_matrix.date_columns
+        self._rows = financial_matrix._rows
+        self._columns = financial_matrix._columns
+        self.sources = np.full((len(self.variables), len(self.date_columns)), self.MISSING, dtype=object)
+
+    def set(self, variable, date_str, source):
+        row = self._rows.get(variable)
+        if row is None:
+            return
+        self.sources[row, self._columns[date_str]] = source
+
+    def counts(self):
+        """{source: number of cells}"""
+        sources, counts = np.unique(self.sources.astype(str), return_counts=True)
+        return {str(source): int(count) for source, count in zip(sources, counts)}
+
+    def to_dict(self):
+        """{date column: {variable: source}}, the layout pd.DataFrame() turns back into a frame"""
+        return {
+            date_str: dict(zip(self.variables, self.sources[:, j]))
+            for j, date_str in enumerate(self.date_columns)
+        }
+
+    def to_frame(self):
+        df = pd.DataFrame(self.sources, columns=self.date_columns)
+        df.insert(0, 'Accounting Variable', self.variables)
+        return df
+
+
+def merge_report_columns(existing_df, new_df, report_dates):
+    """
+    Merges the date columns of the company DataFrame `new_df` into `existing_df` (both with the
+    same 'Accounting Variable' rows), `new_df` winning for dates in both. Only the columns of
+    `report_dates` are kept, in ascending order, so the result has the layout of a frame built
+    from those filings at once.
+    """
+    keep = {pd.Timestamp(date).strftime('%Y-%m-%d') for date in report_dates}
+    existing = existing_df.set_index('Accounting Variable')
+    new = new_df.set_index('Accounting Variable').reindex(existing.index)
+    columns = {col: existing[col] for col in existing.columns}
+    columns.update((col, new[col]) for col in new.columns)
+
+    merged = pd.DataFrame({col: columns[col] for col in sorted(columns) if col in keep}, index=existing.index)
+    return merged.reset_index()
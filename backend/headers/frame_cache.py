@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from .s3_utils import head_s3_object, read_csv_with_etag_from_s3
+
+
+class CompanyFrameCache:
+    """
+    Bounded, thread-safe LRU cache of parsed company CSV DataFrames.
+
+    Entries are keyed by S3 file key and validated against the object's ETag,
+    so a CSV rewritten by the ingestion pipeline is picked up on the next read.
+    A HEAD request is only issued when an entry has not been validated within
+    the last `revalidate_seconds`, which lets the burst of ratio requests fired
+    by one dashboard load share a single S3 read.
+
+    Cached DataFrames are shared between requests and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries=64, revalidate_seconds=5.0):
+        self.max_entries = max_entries
+        self.revalidate_seconds = revalidate_seconds
+        self._entries = OrderedDict()  # file_key -> {'df', 'etag', 'validated_at'}
+        self._lock = threading.Lock()
+        self._key_locks = {}  # file_key -> lock serialising loads of the same key
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _key_lock(self, file_key):
+        with self._lock:
+            return self._key_locks.setdefault(file_key, threading.Lock())
+
+    def _lookup(self, file_key, bucket_name=None, etag=None):
+        """Returns (DataFrame, ETag) of the cached entry if it is still valid, otherwise None. Caller holds no locks."""
+        with self._lock:
+            entry = self._entries.get(file_key)
+            if entry is None:
+                return None
+            fresh = (time.monotonic() - entry['validated_at']) < self.revalidate_seconds
+            if etag is None and fresh:
+                self._entries.move_to_end(file_key)
+                self.hits += 1
+                return entry['df'], entry['etag']
+            cached_etag = entry['etag']
+
+        if etag is None:
+            etag = head_s3_object(file_key, bucket_name=bucket_name)['ETag']
+
+        with self._lock:
+            entry = self._entries.get(file_key)
+            if entry is not None and entry['etag'] == etag == cached_etag:
+                entry['validated_at'] = time.monotonic()
+                self._entries.move_to_end(file_key)
+                self.hits += 1
+                return entry['df'], entry['etag']
+        return None
+
+    def get(self, file_key, bucket_name=None, etag=None):
+        """
+        Returns the parsed DataFrame for `file_key`, reading it from S3 only when it is
+        not cached or its ETag changed. If the caller already knows the current ETag
+        (e.g. from its own HEAD request) it can pass it to skip the validation request.
+        """
+        return self.get_with_etag(file_key, bucket_name, etag)[0]
+
+    def get_with_etag(self, file_key, bucket_name=None, etag=None):
+        """
+        Like get(), but returns (DataFrame, ETag) where the ETag is that of the object the
+        DataFrame was read from. It differs from a passed `etag` when the object was
+        rewritten between the caller's HEAD request and the GET made on a cache miss.
+        """
+        cached = self._lookup(file_key, bucket_name, etag)
+        if cached is not None:
+            return cached
+
+        # Serialise loads per key so concurrent misses for one ticker share a single GET
+        with self._key_lock(file_key):
+            cached = self._lookup(file_key, bucket_name, etag)
+            if cached is not None:
+                return cached
+
+            df, loaded_etag = read_csv_with_etag_from_s3(file_key=file_key, bucket_name=bucket_name)
+            with self._lock:
+                self.misses += 1
+                self._entries[file_key] = {'df': df, 'etag': loaded_etag, 'validated_at': time.monotonic()}
+                self._entries.move_to_end(file_key)
+                while len(self._entries) > self.max_entries:
+                    evicted_key, _ = self._entries.popitem(last=False)
+                    self._key_locks.pop(evicted_key, None)
+                    self.evictions += 1
+            return df, loaded_etag
+
+    def current_etag(self, file_key, bucket_name=None):
+        """
+        Returns the S3 ETag of `file_key` without reading the object body: the cached
+        ETag if it was validated within `revalidate_seconds`, otherwise a HEAD request.
+        """
+        with self._lock:
+            entry = self._entries.get(file_key)
+            if entry is not None and (time.monotonic() - entry['validated_at']) < self.revalidate_seconds:
+                return entry['etag']
+        return head_s3_object(file_key, bucket_name=bucket_name)['ETag']
+
+    def invalidate(self, file_key):
+        """Drops the cached entry for `file_key`, e.g. after a new CSV was written."""
+        with self._lock:
+            self._entries.pop(file_key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+# Process-wide cache shared by every ratio endpoint
+company_frame_cache = CompanyFrameCache(
+    max_entries=int(os.environ.get('COMPANY_FRAME_CACHE_SIZE', 64)),
+    revalidate_seconds=float(os.environ.get('COMPANY_FRAME_CACHE_REVALIDATE_SECONDS', 5)),
+)
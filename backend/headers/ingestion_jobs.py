@@ -0,0 +1,167 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, in-process single-flight still applies
+    fcntl = None
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+@contextmanager
+def ticker_file_lock(ticker, lock_dir):
+    """
+    Holds an exclusive advisory lock on <lock_dir>/<ticker>.lock for the duration of the block,
+    so that only one worker process ingests a ticker at a time.
+    Yields True if the lock had to be waited for (another process was ingesting the ticker).
+    """
+    if fcntl is None:
+        yield False
+        return
+
+    os.makedirs(lock_dir, exist_ok=True)
+    with open(os.path.join(lock_dir, f"{ticker.lower()}.lock"), "w") as lock_file:
+        waited = False
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            waited = True
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield waited
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class IngestionJobQueue:
+    """
+    In-process queue of company ingestion jobs run by a background worker pool.
+
+    Each job records its lifecycle ('queued', 'running', 'succeeded', 'failed') and
+    the progress of every filing reported by the ingestion function. Only the most
+    recent `max_retained_jobs` jobs are kept for status lookups.
+
+    Ingestion is single-flight per ticker: while a job for a ticker is queued or running,
+    further submissions for it are coalesced onto that job. Across worker processes the
+    ingestion itself runs under a per-ticker file lock in `lock_dir`.
+    """
+
+    def __init__(self, max_workers=2, max_retained_jobs=500, lock_dir=None):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ingestion')
+        self._jobs = OrderedDict()  # job_id -> job record
+        self._active = {}  # ticker -> job record of its queued/running job
+        self._lock = threading.Lock()
+        self.max_retained_jobs = max_retained_jobs
+        self.lock_dir = lock_dir or os.path.join('/tmp', 'ingestion_locks')
+        self.submitted = 0
+        self.coalesced = 0
+        self.lock_waits = 0
+
+    def submit(self, ticker, ingest):
+        """
+        Enqueues `ingest(progress_callback)` for `ticker` and returns a snapshot of the job.
+        If a job for the same ticker is already queued or running, no new job is created and
+        the snapshot of the in-flight job is returned instead.
+        The return value of `ingest` (a dict) is stored as the job result.
+        """
+        ticker = ticker.upper()
+        with self._lock:
+            active = self._active.get(ticker)
+            if active is not None and active["status"] in ACTIVE_STATUSES:
+                active["coalesced_requests"] += 1
+                self.coalesced += 1
+                return self._snapshot(active)
+
+            job_id = uuid.uuid4().hex
+            job = {
+                "job_id": job_id,
+                "ticker": ticker,
+                "status": "queued",
+                "message": None,
+                "result": None,
+                "filings": OrderedDict(),  # accession number -> filing progress
+                "coalesced_requests": 0,
+                "created_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+            }
+            self.submitted += 1
+            self._active[ticker] = job
+            self._jobs[job_id] = job
+            while len(self._jobs) > self.max_retained_jobs:
+                self._jobs.popitem(last=False)
+            snapshot = self._snapshot(job)
+
+        self._executor.submit(self._run, job, ingest)
+        return snapshot
+
+    def get(self, job_id):
+        """Returns a snapshot of the job, or None if it is unknown or no longer retained."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._snapshot(job) if job is not None else None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "coalesced": self.coalesced,
+                "lock_waits": self.lock_waits,
+                "active": sum(1 for job in self._active.values() if job["status"] in ACTIVE_STATUSES),
+                "retained": len(self._jobs),
+            }
+
+    def _run(self, job, ingest):
+        def progress_callback(accession_number, reporting_date, status, detail=None):
+            with self._lock:
+                job["filings"][accession_number] = {
+                    "accession_number": accession_number,
+                    "reporting_date": str(reporting_date) if reporting_date is not None else None,
+                    "status": status,
+                    "detail": detail,
+                }
+
+        self._update(job, status="running", started_at=time.time())
+        try:
+            with ticker_file_lock(job["ticker"], self.lock_dir) as waited:
+                if waited:
+                    # Another process held the ticker; its freshly written CSV makes this run a no-op
+                    with self._lock:
+                        self.lock_waits += 1
+                result = ingest(progress_callback)
+            self._update(job, status="succeeded", result=result, message=result.get("message"),
+                         finished_at=time.time())
+        except Exception as e:
+            print(f"Ingestion job {job['job_id']} for {job['ticker']} failed: {e}")
+            self._update(job, status="failed", message=str(e) or type(e).__name__, finished_at=time.time())
+        finally:
+            with self._lock:
+                if self._active.get(job["ticker"]) is job:
+                    del self._active[job["ticker"]]
+
+    def _update(self, job, **fields):
+        with self._lock:
+            job.update(fields)
+
+    @staticmethod
+    def _snapshot(job):
+        filings = list(job["filings"].values())
+        finished = sum(1 for filing in filings if filing["status"] in ("done", "failed"))
+        snapshot = {key: value for key, value in job.items() if key != "filings"}
+        snapshot["filings"] = [dict(filing) for filing in filings]
+        snapshot["progress"] = {"filings_total": len(filings), "filings_finished": finished}
+        return snapshot
+
+
+# Process-wide queue used by the /api/company-info endpoints
+ingestion_jobs = IngestionJobQueue(
+    max_workers=int(os.environ.get('INGESTION_WORKERS', 2)),
+    max_retained_jobs=int(os.environ.get('INGESTION_JOBS_RETAINED', 500)),
+    lock_dir=os.environ.get('INGESTION_LOCK_DIR'),
+)
@@ -0,0 +1,54 @@
+import logging
+from datetime import datetime
+
+from xbrl.instance import ExplicitMember, InstantContext, NumericFact, TimeFrameContext
+
+
+def _context_end(context):
+    """End datetime of a non-dimensional instant/duration context, or None for any other context."""
+    if any(isinstance(segment, ExplicitMember) for segment in context.segments):
+        return None
+    if isinstance(context, TimeFrameContext):
+        day = context.end_date
+    elif isinstance(context, InstantContext):
+        day = context.instant_date
+    else:
+        return None  # Forever contexts have no period end
+    return datetime(day.year, day.month, day.day)
+
+
+def extract_instance_facts(inst, concepts=None):
+    """
+    Returns (concept, value, period end datetime) tuples for the non-dimensional numeric facts
+    of a parsed XbrlInstance, in document order, keeping only `concepts` (a set) if given.
+
+    These are the same facts the processors used to read back from inst.json() (facts with
+    exactly the unit/concept/entity/contextId/period dimensions), taken straight from the
+    parsed objects: no JSON string is built and each context's end date is resolved once.
+
+    py-xbrl keeps the raw text of a fact whose inline transformation failed; such facts are
+    skipped, like read_ixbrl_facts does, so both readers give the same facts. Nil facts are
+    kept with a None value.
+    """
+    context_ends = {}
+    facts = []
+    for fact in inst.facts:
+        if not isinstance(fact, NumericFact):
+            continue
+        concept = fact.concept.name
+        if concepts is not None and concept not in concepts:
+            continue
+
+        value = fact.value
+        if value is not None and not isinstance(value, (int, float)):
+            logging.warning(f"Skipping {concept} fact with unreadable value {value!r}")
+            continue
+
+        context = fact.context
+        key = id(context)
+        if key not in context_ends:
+            context_ends[key] = _context_end(context)
+        end = context_ends[key]
+        if end is not None:
+            facts.append((concept, value, end))
+    return facts
@@ -0,0 +1,127 @@
+import logging
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+from xbrl.transformations import TransformationException, TransformationNotImplemented, normalize
+
+IX_NAMESPACES = ('http://www.xbrl.org/2013/inlineXBRL', 'http://www.xbrl.org/2008/inlineXBRL')
+XBRLI_NS = '{http://www.xbrl.org/2003/instance}'
+XBRLDI_NS = '{http://xbrl.org/2006/xbrldi}'
+XSI_NIL = '{http://www.w3.org/2001/XMLSchema-instance}nil'
+
+_NON_FRACTION_TAGS = {f'{{{ns}}}nonFraction' for ns in IX_NAMESPACES}
+_NON_NUMERIC_TAGS = {f'{{{ns}}}nonNumeric' for ns in IX_NAMESPACES}
+_CONTEXT_TAG = XBRLI_NS + 'context'
+
+
+class IxbrlReadError(Exception):
+    """The document could not be read by the streaming reader; use the full XBRL parser instead."""
+
+
+def is_inline_xbrl(uri):
+    # Same rule as XbrlParser.parse_instance: anything but .xml/.xbrl is inline XBRL
+    return uri.split('.')[-1] not in ('xml', 'xbrl')
+
+
+def _context_end(context_elem):
+    """End datetime of a non-dimensional instant/duration context, None otherwise."""
+    segment = context_elem.find(f'{XBRLI_NS}entity/{XBRLI_NS}segment')
+    if segment is not None and segment.find(XBRLDI_NS + 'explicitMember') is not None:
+        return None
+    end = context_elem.find(f'{XBRLI_NS}period/{XBRLI_NS}instant')
+    if end is None:
+        end = context_elem.find(f'{XBRLI_NS}period/{XBRLI_NS}endDate')
+    if end is None or not end.text:
+        return None  # Forever context
+    return datetime.strptime(end.text.strip()[:10], '%Y-%m-%d')
+
+
+def _fact_value(fact_elem, ns_map):
+    """Numeric value of an ix:nonFraction, with its format, scale and sign applied (None if nil)."""
+    if fact_elem.get(XSI_NIL) == 'true':
+        return None
+    value = ''.join(fact_elem.itertext())
+
+    fact_format = fact_elem.get('format')
+    if fact_format:
+        prefix, format_code = fact_format.split(':')
+        value = normalize(ns_map[prefix], format_code, value)
+
+    scaled_value = float(value) * pow(10, int(fact_elem.get('scale', 0)))
+    # Same floating-point error mitigation as py-xbrl
+    if abs(scaled_value) > 1e6:
+        scaled_value = float(round(scaled_value))
+    if fact_elem.get('sign') == '-':
+        scaled_value = -scaled_value
+    return scaled_value
+
+
+def read_ixbrl_facts(source, concepts=None):
+    """
+    Stream-parses an inline XBRL (.htm) document and returns (facts, fact_count).
+
+    `facts` are the (concept, value, period end datetime) tuples of its non-dimensional
+    ix:nonFraction facts, in document order and limited to `concepts` (a set of local names)
+    if given: the same tuples extract_instance_facts gets from a fully parsed XbrlInstance.
+    `fact_count` counts all ix:nonFraction and ix:nonNumeric facts, like len(inst.facts).
+
+    Only the document itself is read: the taxonomy schemas are never resolved. Elements are
+    discarded as soon as they are consumed. Raises IxbrlReadError (or ET.ParseError) when the
+    document cannot be read this way.
+    """
+    ns_stack = []
+    ns_map = None
+    context_ends = {}
+    raw_facts = []  # (concept, contextRef, value)
+    fact_count = 0
+    open_elements = 0  # Facts and contexts being read, whose children must be kept until they end
+
+    for event, elem in ET.iterparse(source, events=('start', 'end', 'start-ns', 'end-ns')):
+        if event == 'start-ns':
+            ns_stack.append(elem)
+            ns_map = None
+        elif event == 'end-ns':
+            ns_stack.pop()
+            ns_map = None
+        elif event == 'start':
+            if elem.tag in _NON_FRACTION_TAGS or elem.tag in _NON_NUMERIC_TAGS or elem.tag == _CONTEXT_TAG:
+                open_elements += 1
+        elif elem.tag in _NON_FRACTION_TAGS:
+            open_elements -= 1
+            fact_count += 1
+            concept = elem.get('name', '').split(':')[-1]
+            if concepts is None or concept in concepts:
+                if ns_map is None:
+                    ns_map = dict(ns_stack)
+                try:
+                    value = _fact_value(elem, ns_map)
+                except (ValueError, KeyError, TransformationException, TransformationNotImplemented) as e:
+                    logging.warning(f"Skipping {concept} fact with unreadable value {''.join(elem.itertext())!r}: {e}")
+                else:
+                    raw_facts.append((concept, elem.get('contextRef', '').strip(), value))
+            if not open_elements:
+                elem.clear()
+        elif elem.tag in _NON_NUMERIC_TAGS:
+            open_elements -= 1
+            fact_count += 1
+            if not open_elements:
+                elem.clear()
+        elif elem.tag == _CONTEXT_TAG:
+            open_elements -= 1
+            context_ends[elem.get('id', '').strip()] = _context_end(elem)
+            elem.clear()
+        elif not open_elements:
+            # Elements outside facts and contexts (the HTML layout) are not needed once read
+            elem.clear()
+
+    if fact_count == 0 or not context_ends:
+        raise IxbrlReadError("No inline XBRL facts or contexts found")
+
+    facts = []
+    for concept, context_ref, value in raw_facts:
+        if context_ref not in context_ends:
+            raise IxbrlReadError(f"Fact {concept} refers to unknown context {context_ref!r}")
+        end = context_ends[context_ref]
+        if end is not None:
+            facts.append((concept, value, end))
+    return facts, fact_count
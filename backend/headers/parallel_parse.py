@@ -0,0 +1,222 @@
+import logging
+import multiprocessing
+import os
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from xbrl.cache import HttpCache
+from xbrl.helper.uri_helper import is_url
+from xbrl.instance import XbrlParser
+
+from .instance_facts import extract_instance_facts
+from .ixbrl_reader import IxbrlReadError, is_inline_xbrl, read_ixbrl_facts
+from .sec_client import TokenBucket, sec_client
+from .taxonomy_bundle import load_taxonomy_bundle
+from .taxonomy_memo import install_taxonomy_memo, taxonomy_memo
+
+
+def resolve_parse_workers(filing_count, workers=None):
+    """
+    Number of parser processes to use for `filing_count` filings. `workers` is an int or 'auto'
+    (one per CPU); if None it is read from XBRL_PARSE_WORKERS, which defaults to 1 (parse
+    sequentially in the calling process).
+    """
+    if workers is None:
+        workers = os.environ.get('XBRL_PARSE_WORKERS', '1')
+    if workers == 'auto':
+        workers = os.cpu_count() or 1
+    return max(1, min(int(workers), filing_count))
+
+
+class AtomicHttpCache(HttpCache):
+    """
+    HttpCache that writes each download to a temporary file and renames it into place, so
+    parser processes sharing one cache directory never read a partially written file.
+    """
+
+    def cache_file(self, file_url):
+        file_url = file_url.strip()
+        file_path = self.url_to_path(file_url)
+        if os.path.exists(file_path):
+            return file_path
+
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        query_response = self.connection_manager.download(file_url, headers=self.headers)
+        if query_response.status_code == 404:
+            raise Exception(f"Could not find file on {file_url}. Error code: {query_response.status_code}")
+        if query_response.status_code != 200:
+            raise Exception(f"Could not download file from {file_url}. Error code: {query_response.status_code}")
+
+        tmp_path = f"{file_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(query_response.content)
+        os.replace(tmp_path, file_path)
+        return file_path
+
+
+# Parser of a pool worker process, set up by _init_worker
+_worker_parser = None
+
+
+def _init_worker(cache_dir, headers, rate_per_second):
+    global _worker_parser
+    # Each worker only gets its share of the SEC request budget, so the pool as a whole stays within it
+    sec_client.limiter = TokenBucket(rate_per_second)
+    cache = AtomicHttpCache(cache_dir, verify_https=False)
+    cache.set_headers(headers)
+    sec_client.attach_to_cache(cache)
+    # The bundle was extracted by the parent; this registers its namespace catalog in the worker
+    load_taxonomy_bundle(cache)
+    install_taxonomy_memo()
+    _worker_parser = XbrlParser(cache)
+
+
+def streaming_reader_enabled():
+    """Whether inline XBRL filings are first read with the streaming reader (XBRL_STREAMING_READER, default on)."""
+    return os.environ.get('XBRL_STREAMING_READER', '1') != '0'
+
+
+def _parse_filing(parser, url, concepts, streaming=True):
+    if streaming and is_inline_xbrl(url):
+        started = time.perf_counter()
+        try:
+            path = parser.cache.cache_file(url) if is_url(url) else url
+            facts, fact_count = read_ixbrl_facts(path, concepts)
+            return {
+                'facts': facts,
+                'fact_count': fact_count,
+                'parse_seconds': time.perf_counter() - started,
+                'extract_seconds': 0.0,
+                'reader': 'stream',
+                'pid': os.getpid(),
+            }
+        except (IxbrlReadError, ET.ParseError) as e:
+            logging.warning(f"Streaming read of {url} failed ({e}), falling back to the full XBRL parser")
+
+    started = time.perf_counter()
+    inst = parser.parse_instance(url)
+    parsed = time.perf_counter()
+    facts = extract_instance_facts(inst, concepts)
+    return {
+        'facts': facts,
+        'fact_count': len(inst.facts),
+        'parse_seconds': parsed - started,
+        'extract_seconds': time.perf_counter() - parsed,
+        'reader': 'full',
+        'pid': os.getpid(),
+    }
+
+
+def _parse_in_worker(url, concepts, streaming):
+    return _parse_filing(_worker_parser, url, concepts, streaming)
+
+
+def parse_filings(filings, concepts, parser, cache, workers=1, streaming=None, fact_cache=None):
+    """
+    Parses the XBRL instance of every (key, url, accession number) in `filings` and yields
+    (key, result) as each one finishes, in completion order. `result` is either the exception
+    raised for that filing or a dict with the extracted 'facts' (see extract_instance_facts,
+    limited to `concepts`), the instance's total 'fact_count' and the 'download_seconds',
+    'parse_seconds', 'extract_seconds', 'reader' ('stream', 'full' or 'cache') and 'pid' of the work.
+
+    With a `fact_cache` (see fact_cache.FactCache), filings whose facts were extracted before
+    are answered from it first, without any download or parse, and newly parsed ones are
+    added to it. Filings without an accession number are always parsed.
+
+    Inline XBRL documents are first read with the streaming reader (ixbrl_reader), which needs
+    no taxonomy; the full py-xbrl parser is the fallback for anything it cannot read, and the
+    only path when `streaming` is False (default: streaming_reader_enabled()).
+
+    Instance documents are always downloaded into `cache` in this process first, through the
+    shared rate-limited SEC client. With workers == 1 they are then parsed here by `parser`;
+    otherwise by a pool of `workers` spawned processes sharing the cache directory, each
+    limited to an equal share of the SEC request rate for the schemas and linkbases they fetch.
+    """
+    if streaming is None:
+        streaming = streaming_reader_enabled()
+
+    accessions = {}
+    to_parse = []
+    for key, url, accession_number in filings:
+        cached = fact_cache.get(accession_number, concepts) if fact_cache and accession_number else None
+        if cached is not None:
+            yield key, dict(cached, download_seconds=0.0, parse_seconds=0.0, extract_seconds=0.0,
+                            reader='cache', pid=os.getpid())
+            continue
+        accessions[key] = accession_number
+        to_parse.append((key, url))
+
+    for key, result in _parse_uncached(to_parse, concepts, parser, cache, min(workers, len(to_parse)), streaming):
+        if fact_cache and accessions[key] and not isinstance(result, Exception):
+            fact_cache.put(accessions[key], concepts, result['facts'], result['fact_count'])
+        yield key, result
+
+
+def _parse_uncached(filings, concepts, parser, cache, workers, streaming):
+    if workers <= 1:
+        for key, url in filings:
+            try:
+                download_seconds = _download(cache, url)
+                result = _parse_filing(parser, url, concepts, streaming)
+            except Exception as e:
+                yield key, e
+                continue
+            result['download_seconds'] = download_seconds
+            yield key, result
+        return
+
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        # Spawned, not forked: the caller may be a multi-threaded web process
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker,
+        initargs=(cache.cache_dir, cache.headers, sec_client.limiter.rate / (workers + 1)),
+    )
+    try:
+        futures = {}
+        download_seconds = {}
+        for key, url in filings:
+            try:
+                download_seconds[key] = _download(cache, url)
+            except Exception as e:
+                yield key, e
+                continue
+            futures[pool.submit(_parse_in_worker, url, concepts, streaming)] = key
+
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                yield key, e
+                continue
+            result['download_seconds'] = download_seconds[key]
+            yield key, result
+    finally:
+        # Also reached when the caller stops iterating early: drop the filings not started yet
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _download(cache, url):
+    if not is_url(url):
+        return 0.0  # Local instance file, nothing to fetch
+    started = time.perf_counter()
+    cache.cache_file(url)
+    return time.perf_counter() - started
+
+
+def print_parse_timings(timings, wall_seconds, workers):
+    """Prints the per-filing timings collected from parse_filings and the overall speedup."""
+    print(f"\n--- XBRL parse timings ({workers} worker{'s' if workers != 1 else ''}) ---")
+    print(f"{'report date':<12} {'reader':<7} {'download s':>10} {'parse s':>8} {'extract s':>9} {'facts':>7} {'pid':>7}")
+    for report_date, result in timings:
+        print(f"{str(report_date)[:10]:<12} {result['reader']:<7} {result['download_seconds']:>10.2f} "
+              f"{result['parse_seconds']:>8.2f} {result['extract_seconds']:>9.3f} {result['fact_count']:>7} {result['pid']:>7}")
+    busy_seconds = sum(result['download_seconds'] + result['parse_seconds'] + result['extract_seconds']
+                       for _, result in timings)
+    print(f"Total {busy_seconds:.2f}s of work in {wall_seconds:.2f}s wall time "
+          f"({busy_seconds / wall_seconds if wall_seconds else 0:.1f}x)")
+    memo = taxonomy_memo.stats()
+    print(f"Taxonomy memo (this process): {memo['entries']} schemas, {memo['mb']:.0f} MB, "
+          f"{memo['hits']} hits, {memo['misses']} parses, {memo['evictions']} evicted")
@@ -78,7 +78,78 @@ def read_csv_from_s3(file_key: str, bucket_name: str = None) -> pd.DataFrame:
         print(f"Error reading s3://{actual_bucket_name}/{file_key}: {e}")
         raise
 
-def write_df_to_csv_s3(df: pd.DataFrame, file_key: str, bucket_name: str = None):
+def head_s3_object(file_key: str, bucket_name: str = None) -> dict:
+    """
+    Fetches the metadata of an S3 object (ETag, LastModified, ContentLength, ...)
+    with a HEAD request, without downloading its body.
+
+    Args:
+        file_key (str): The full path to the object within the S3 bucket.
+        bucket_name (str, optional): The name of the S3 bucket. If not provided,
+                                     it will try to use the 'S3_BUCKET_NAME' 
+                                     environment variable.
+
+    Returns:
+        dict: The head_object response returned by boto3.
+
+    Raises:
+        ValueError: If the S3 bucket name is not provided.
+        FileNotFoundError: If the specified file_key does not exist in the bucket.
+        Exception: For other S3 related errors.
+    """
+    try:
+        actual_bucket_name = _get_s3_bucket_name(bucket_name)
+        return s3_client.head_object(Bucket=actual_bucket_name, Key=file_key)
+    except ValueError as ve:
+        raise ve
+    except s3_client.exceptions.ClientError as e:
+        # head_object has no body, so a missing key surfaces as a bare 404 ClientError
+        if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+            raise FileNotFoundError(
+                f"File '{file_key}' not found in bucket '{actual_bucket_name}'."
+            )
+        print(f"Error reading metadata of s3://{actual_bucket_name}/{file_key}: {e}")
+        raise
+
+def read_csv_with_etag_from_s3(file_key: str, bucket_name: str = None):
+    """
+    Reads a CSV file from an S3 bucket into a pandas DataFrame and also returns
+    the ETag of the object version that was read.
+
+    Args:
+        file_key (str): The full path to the CSV file within the S3 bucket.
+        bucket_name (str, optional): The name of the S3 bucket. If not provided,
+                                     it will try to use the 'S3_BUCKET_NAME' 
+                                     environment variable.
+
+    Returns:
+        tuple: (pd.DataFrame, str) the parsed DataFrame and the object's ETag.
+
+    Raises:
+        ValueError: If the S3 bucket name is not provided.
+        FileNotFoundError: If the specified file_key does not exist in the bucket.
+        Exception: For other S3 or pandas related errors during reading.
+    """
+    try:
+        actual_bucket_name = _get_s3_bucket_name(bucket_name)
+        print(f"Attempting to read s3://{actual_bucket_name}/{file_key}")
+
+        obj = s3_client.get_object(Bucket=actual_bucket_name, Key=file_key)
+        df = pd.read_csv(BytesIO(obj['Body'].read()))
+
+        print(f"Successfully read s3://{actual_bucket_name}/{file_key}")
+        return df, obj['ETag']
+    except s3_client.exceptions.NoSuchKey:
+        raise FileNotFoundError(
+            f"File '{file_key}' not found in bucket '{actual_bucket_name}'."
+        )
+    except ValueError as ve:
+        raise ve
+    except Exception as e:
+        print(f"Error reading s3://{actual_bucket_name}/{file_key}: {e}")
+        raise
+
+def write_df_to_csv_s3(df: pd.DataFrame, file_key: str, bucket_name: str = None, metadata: dict = None):
     """
     Writes a pandas DataFrame to an S3 bucket as a CSV file.
 
@@ -89,6 +160,8 @@ def write_df_to_csv_s3(df: pd.DataFrame, file_key: str, bucket_name: str = None)
         bucket_name (str, optional): The name of the S3 bucket. If not provided,
                                      it will try to use the 'S3_BUCKET_NAME' 
                                      environment variable.
+        metadata (dict, optional): User metadata (string keys and values) stored on the
+                                   object, readable later with head_s3_object.
 
     Raises:
         ValueError: If the S3 bucket name is not provided.
@@ -103,11 +176,15 @@ def write_df_to_csv_s3(df: pd.DataFrame, file_key: str, bucket_name: str = None)
         df.to_csv(csv_buffer, index=False) # index=False to avoid writing DataFrame index
         
         # Upload the CSV string to S3
+        put_kwargs = {}
+        if metadata:
+            put_kwargs['Metadata'] = {str(key): str(value) for key, value in metadata.items()}
         s3_client.put_object(
             Bucket=actual_bucket_name,
             Key=file_key,
             Body=csv_buffer.getvalue(), # Get the string value from the buffer
-            ContentType='text/csv' # Important: Set the correct Content-Type
+            ContentType='text/csv', # Important: Set the correct Content-Type
+            **put_kwargs
         )
         print(f"Successfully wrote DataFrame to s3://{actual_bucket_name}/{file_key}")
     except ValueError as ve:
@@ -200,3 +277,60 @@ def write_json_to_s3(data: object, file_key: str, bucket_name: str = None):
     except Exception as e:
         print(f"Error writing JSON to s3://{actual_bucket_name}/{file_key}: {e}")
         raise
+
+def read_bytes_from_s3(file_key: str, bucket_name: str = None) -> bytes:
+    """
+    Reads the raw body of an S3 object.
+
+    Args:
+        file_key (str): The full path to the object within the S3 bucket.
+        bucket_name (str, optional): The name of the S3 bucket. If not provided,
+                                     it will try to use the 'S3_BUCKET_NAME'
+                                     environment variable.
+
+    Returns:
+        bytes: The object's body.
+
+    Raises:
+        ValueError: If the S3 bucket name is not provided.
+        FileNotFoundError: If the specified file_key does not exist in the bucket.
+        Exception: For other S3 related errors during reading.
+    """
+    try:
+        actual_bucket_name = _get_s3_bucket_name(bucket_name)
+        obj = s3_client.get_object(Bucket=actual_bucket_name, Key=file_key)
+        return obj['Body'].read()
+    except s3_client.exceptions.NoSuchKey:
+        raise FileNotFoundError(
+            f"File '{file_key}' not found in bucket '{actual_bucket_name}'."
+        )
+    except ValueError as ve:
+        raise ve
+    except Exception as e:
+        print(f"Error reading s3://{actual_bucket_name}/{file_key}: {e}")
+        raise
+
+def write_bytes_to_s3(data: bytes, file_key: str, bucket_name: str = None, content_type: str = 'application/octet-stream'):
+    """
+    Writes raw bytes to an S3 object.
+
+    Args:
+        data (bytes): The object's body.
+        file_key (str): The full path for the object within the S3 bucket.
+        bucket_name (str, optional): The name of the S3 bucket. If not provided,
+                                     it will try to use the 'S3_BUCKET_NAME'
+                                     environment variable.
+        content_type (str, optional): The object's Content-Type.
+
+    Raises:
+        ValueError: If the S3 bucket name is not provided.
+        Exception: For other S3 related errors during writing.
+    """
+    try:
+        actual_bucket_name = _get_s3_bucket_name(bucket_name)
+        s3_client.put_object(Bucket=actual_bucket_name, Key=file_key, Body=data, ContentType=content_type)
+    except ValueError as ve:
+        raise ve
+    except Exception as e:
+        print(f"Error writing to s3://{actual_bucket_name}/{file_key}: {e}")
+        raise
@@ -0,0 +1,183 @@
+import email.utils
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Suppress InsecureRequestWarning
+import urllib3
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+USER_AGENT = "YourCustomResearchApp/1.0 (your.email@example.com)"
+
+# Responses worth retrying: throttling and transient server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, holding at most `capacity` tokens.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available and returns the number of seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class SecClient:
+    """
+    Shared HTTP client for sec.gov endpoints.
+
+    Every request (including retries) takes a token from a process-wide token bucket, so the
+    whole process stays within SEC's fair-access budget (10 requests/second by default)
+    without fixed sleeps. Connections are pooled and kept alive per host. Requests failing
+    with 429/5xx or a connection error are retried with jittered exponential backoff,
+    honouring Retry-After when the server sends it.
+
+    It also implements `download(url, headers)`, so it can replace the ConnectionManager of
+    a py-xbrl HttpCache (see `attach_to_cache`).
+    """
+
+    def __init__(self, user_agent=USER_AGENT, rate_per_second=10, burst=None, max_retries=5,
+                 backoff_factor=0.5, max_backoff=30, pool_maxsize=20, timeout=30, verify=False):
+        self.limiter = TokenBucket(rate_per_second, burst)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.verify = verify
+
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': user_agent})
+        # Retries are handled in request() so each attempt goes through the rate limiter
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._metrics = defaultdict(lambda: {
+            "requests": 0, "retries": 0, "throttled": 0, "errors": 0,
+            "wait_seconds": 0.0, "latency_seconds": 0.0,
+        })
+        self._metrics_lock = threading.Lock()
+
+    def request(self, method, url, **kwargs):
+        """
+        Sends a rate-limited request and returns the final response (which may still be an
+        error response once retries are exhausted). Connection errors are re-raised after
+        the last attempt.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        kwargs.setdefault('verify', self.verify)
+        host = urlsplit(url).netloc
+
+        for attempt in range(self.max_retries + 1):
+            waited = self.limiter.acquire()
+            started = time.monotonic()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self._record(host, waited, time.monotonic() - started, retry=attempt > 0, error=True)
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                print(f"  {method} {url} failed ({e}), retrying in {delay:.2f}s")
+                time.sleep(delay)
+                continue
+
+            self._record(host, waited, time.monotonic() - started, retry=attempt > 0,
+                         throttled=response.status_code == 429,
+                         error=response.status_code >= 400)
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                return response
+
+            delay = self._retry_after(response)
+            if delay is None:
+                delay = self._backoff(attempt)
+            print(f"  {method} {url} returned {response.status_code}, retrying in {delay:.2f}s")
+            response.close()
+            time.sleep(delay)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.request('HEAD', url, **kwargs)
+
+    def download(self, url, headers=None):
+        """py-xbrl ConnectionManager interface used by HttpCache.cache_file."""
+        return self.get(url, headers=headers, allow_redirects=True)
+
+    def attach_to_cache(self, cache):
+        """Routes the downloads of a py-xbrl HttpCache through this client instead of its fixed 500ms delay."""
+        cache.connection_manager = self
+        return cache
+
+    def stats(self):
+        """Per-host request, retry, throttling and error counters plus average latency and limiter wait."""
+        with self._metrics_lock:
+            stats = {}
+            for host, metrics in self._metrics.items():
+                host_stats = dict(metrics)
+                host_stats["avg_latency_ms"] = round(1000 * metrics["latency_seconds"] / max(metrics["requests"], 1), 1)
+                host_stats["wait_seconds"] = round(metrics["wait_seconds"], 3)
+                host_stats["latency_seconds"] = round(metrics["latency_seconds"], 3)
+                stats[host] = host_stats
+            return stats
+
+    def _record(self, host, waited, latency, retry=False, throttled=False, error=False):
+        with self._metrics_lock:
+            metrics = self._metrics[host]
+            metrics["requests"] += 1
+            metrics["retries"] += int(retry)
+            metrics["wait_seconds"] += waited
+            metrics["latency_seconds"] += latency
+            metrics["throttled"] += int(throttled)
+            metrics["errors"] += int(error)
+
+    def _backoff(self, attempt):
+        # "Full jitter": uniform in [0, min(cap, base * 2^attempt)]
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** attempt)))
+
+    def _retry_after(self, response):
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return min(self.max_backoff, max(0.0, float(value)))
+        except ValueError:
+            pass
+        try:
+            retry_at = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return min(self.max_backoff, max(0.0, retry_at.timestamp() - time.time()))
+
+
+# Process-wide client shared by every module talking to sec.gov
+sec_client = SecClient(
+    user_agent=os.environ.get('SEC_USER_AGENT', USER_AGENT),
+    rate_per_second=float(os.environ.get('SEC_RATE_LIMIT', 10)),
+)
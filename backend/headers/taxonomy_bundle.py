@@ -0,0 +1,241 @@
+import glob
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import tarfile
+import tempfile
+import threading
+from datetime import datetime, timezone
+
+from xbrl.cache import HttpCache
+from xbrl.taxonomy import ns_schema_map, parse_taxonomy_url
+
+from .s3_utils import read_bytes_from_s3, write_bytes_to_s3
+from .sec_client import sec_client
+
+# Bump when the layout of the bundle archive changes
+TAXONOMY_BUNDLE_FORMAT = 1
+
+DEFAULT_BUNDLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "taxonomy_bundles")
+S3_BUNDLE_PREFIX = 'xbrl-taxonomy-bundles/'
+
+_CATALOG_MEMBER = 'catalog.json'
+_FILES_PREFIX = 'files/'
+_INSTALLED_DIR = '.taxonomy-bundles'  # Catalogs of the bundles extracted into a cache directory
+
+
+def _dated(year, until):
+    # FASB and SEC taxonomies carried a -01-31 suffix in their version until `until`
+    return f"{year}-01-31" if year <= until else str(year)
+
+
+# prefix: (first year published, version of a year, namespace, entry schema URL)
+STANDARD_TAXONOMIES = {
+    'us-gaap': (2019, lambda year: _dated(year, 2021), "http://fasb.org/us-gaap/{v}",
+                "https://xbrl.fasb.org/us-gaap/{v}/elts/us-gaap-{v}.xsd"),
+    'srt': (2019, lambda year: _dated(year, 2021), "http://fasb.org/srt/{v}",
+            "https://xbrl.fasb.org/srt/{v}/elts/srt-{v}.xsd"),
+    'dei': (2019, lambda year: _dated(year, 2020), "http://xbrl.sec.gov/dei/{v}",
+            "https://xbrl.sec.gov/dei/{v}/dei-{v}.xsd"),
+    'ecd': (2023, str, "http://xbrl.sec.gov/ecd/{v}", "https://xbrl.sec.gov/ecd/{v}/ecd-{v}.xsd"),
+    'cyd': (2024, str, "http://xbrl.sec.gov/cyd/{v}", "https://xbrl.sec.gov/cyd/{v}/cyd-{v}.xsd"),
+}
+
+
+def standard_schemas(years):
+    """{namespace: entry schema URL} of the STANDARD_TAXONOMIES published in `years`."""
+    schemas = {}
+    for first_year, version_of, namespace, schema_url in STANDARD_TAXONOMIES.values():
+        for year in years:
+            if year >= first_year:
+                version = version_of(year)
+                schemas[namespace.format(v=version)] = schema_url.format(v=version)
+    return schemas
+
+
+def build_taxonomy_bundle(years, output_dir=DEFAULT_BUNDLE_DIR, user_agent=None, extra_schemas=None):
+    """
+    Downloads the standard taxonomies of `years` (see STANDARD_TAXONOMIES) plus `extra_schemas`
+    ({namespace: schema URL}) with everything they import and reference, and packs them into a
+    gzipped tar in `output_dir`. Returns the path of the bundle.
+
+    Each schema is fetched by parsing it with py-xbrl, so the bundle holds exactly the files a
+    parse of a filing pulls for it, stored under their HttpCache paths. The bundle name carries
+    the years and a digest of its content, e.g. xbrl-taxonomies-2019-2025-<digest>.tar.gz.
+    Schemas that cannot be fetched (not published yet) are skipped with a warning.
+    """
+    schemas = standard_schemas(years)
+    schemas.update(extra_schemas or {})
+
+    download_dir = tempfile.mkdtemp(prefix='xbrl-taxonomies-')
+    try:
+        cache = HttpCache(download_dir, verify_https=False)
+        if user_agent:
+            cache.set_headers({'User-Agent': user_agent})
+        sec_client.attach_to_cache(cache)
+
+        namespaces = {}
+        for namespace, schema_url in schemas.items():
+            try:
+                parse_taxonomy_url(schema_url, cache)
+            except Exception as e:
+                logging.warning(f"Skipping taxonomy {namespace} ({schema_url}): {e}")
+                continue
+            namespaces[namespace] = schema_url
+            logging.info(f"Fetched taxonomy {namespace}")
+
+        files = sorted(
+            os.path.relpath(os.path.join(root, name), download_dir)
+            for root, _, names in os.walk(download_dir) for name in names
+        )
+        digest = hashlib.sha1()
+        for relative_path in files:
+            with open(os.path.join(download_dir, relative_path), 'rb') as f:
+                digest.update(relative_path.encode('utf-8') + b'\0' + hashlib.sha1(f.read()).digest())
+        version = digest.hexdigest()[:12]
+
+        catalog = {
+            'format': TAXONOMY_BUNDLE_FORMAT,
+            'version': version,
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'years': sorted(years),
+            'namespaces': namespaces,
+            'files': len(files),
+        }
+        span = f"{min(years)}-{max(years)}" if years else "custom"
+        os.makedirs(output_dir, exist_ok=True)
+        bundle_path = os.path.join(output_dir, f"xbrl-taxonomies-{span}-{version}.tar.gz")
+
+        with tarfile.open(bundle_path, 'w:gz') as bundle:
+            # The catalog goes first, so loaders can read it without decompressing the rest
+            catalog_bytes = json.dumps(catalog, indent=2).encode('utf-8')
+            info = tarfile.TarInfo(_CATALOG_MEMBER)
+            info.size = len(catalog_bytes)
+            bundle.addfile(info, io.BytesIO(catalog_bytes))
+            for relative_path in files:
+                bundle.add(os.path.join(download_dir, relative_path), arcname=_FILES_PREFIX + relative_path)
+    finally:
+        shutil.rmtree(download_dir, ignore_errors=True)
+
+    logging.info(f"Built {bundle_path}: {len(namespaces)} taxonomies, {len(files)} files")
+    return bundle_path
+
+
+def upload_taxonomy_bundle(bundle_path, bucket_name=None):
+    """Stores the bundle in S3 under S3_BUNDLE_PREFIX, where load_taxonomy_bundle finds it."""
+    with open(bundle_path, 'rb') as f:
+        write_bytes_to_s3(f.read(), S3_BUNDLE_PREFIX + os.path.basename(bundle_path),
+                          bucket_name=bucket_name, content_type='application/gzip')
+
+
+def resolve_bundle_path():
+    """
+    Path of the taxonomy bundle to load: XBRL_TAXONOMY_BUNDLE if set (a path, or the name of a
+    bundle in S3), else the newest bundle in DEFAULT_BUNDLE_DIR, else None.
+    """
+    configured = os.environ.get('XBRL_TAXONOMY_BUNDLE')
+    if configured:
+        return configured if os.path.dirname(configured) else os.path.join(DEFAULT_BUNDLE_DIR, configured)
+    bundles = glob.glob(os.path.join(DEFAULT_BUNDLE_DIR, 'xbrl-taxonomies-*.tar.gz'))
+    return max(bundles, key=os.path.getmtime) if bundles else None
+
+
+_install_lock = threading.Lock()
+
+
+def load_taxonomy_bundle(cache, bundle_path=None, bucket_name=None):
+    """
+    Seeds the HttpCache `cache` with the taxonomy files of a bundle made by
+    build_taxonomy_bundle (see resolve_bundle_path), and adds its namespace -> schema URL
+    catalog to py-xbrl's map of well-known taxonomies. Taxonomy files are then read from disk
+    instead of being downloaded on the first parse of every fresh instance.
+
+    A bundle missing locally is downloaded from S3 (`bucket_name` or S3_BUCKET_NAME) if one is
+    configured. Each bundle is extracted once per cache directory; files already cached are
+    kept. Returns the catalog, or None when no bundle could be loaded (parsing then downloads
+    the taxonomies as before).
+    """
+    bundle_path = bundle_path or resolve_bundle_path()
+    if not bundle_path:
+        return None
+    installed_path = os.path.join(cache.cache_dir, _INSTALLED_DIR, os.path.basename(bundle_path) + '.json')
+
+    with _install_lock:
+        try:
+            with open(installed_path, 'r') as f:
+                catalog = json.load(f)
+        except (OSError, ValueError):
+            catalog = _install_bundle(cache, bundle_path, installed_path, bucket_name)
+    if catalog is None:
+        return None
+
+    for namespace, schema_url in catalog['namespaces'].items():
+        ns_schema_map.setdefault(namespace, schema_url)
+    return catalog
+
+
+def _install_bundle(cache, bundle_path, installed_path, bucket_name):
+    if not os.path.exists(bundle_path) and not _download_bundle(bundle_path, bucket_name):
+        logging.warning(f"Taxonomy bundle {bundle_path} not found, taxonomies will be downloaded when parsing")
+        return None
+
+    cache_dir = os.path.realpath(cache.cache_dir)
+    extracted = 0
+    try:
+        with tarfile.open(bundle_path, 'r:gz') as bundle:
+            catalog = json.load(bundle.extractfile(_CATALOG_MEMBER))
+            if catalog.get('format') != TAXONOMY_BUNDLE_FORMAT:
+                logging.warning(f"Ignoring taxonomy bundle {bundle_path} of unknown format {catalog.get('format')}")
+                return None
+            for member in bundle:
+                if not member.isfile() or not member.name.startswith(_FILES_PREFIX):
+                    continue
+                path = os.path.realpath(os.path.join(cache_dir, member.name[len(_FILES_PREFIX):]))
+                if not path.startswith(cache_dir + os.sep):
+                    raise ValueError(f"Unsafe path in bundle: {member.name}")
+                if os.path.exists(path):
+                    continue
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # Written to a temporary file and renamed, so concurrent parsers never read a partial file
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    shutil.copyfileobj(bundle.extractfile(member), f)
+                os.replace(tmp_path, path)
+                extracted += 1
+
+        os.makedirs(os.path.dirname(installed_path), exist_ok=True)
+        with open(installed_path, 'w') as f:
+            json.dump(catalog, f)
+    except (OSError, KeyError, ValueError, tarfile.TarError) as e:
+        logging.warning(f"Could not load taxonomy bundle {bundle_path}: {e}")
+        return None
+
+    logging.info(f"Loaded taxonomy bundle {os.path.basename(bundle_path)} into {cache_dir}: "
+                 f"{len(catalog['namespaces'])} taxonomies, {extracted} of {catalog['files']} files extracted")
+    return catalog
+
+
+def _download_bundle(bundle_path, bucket_name):
+    bucket_name = bucket_name or os.environ.get('S3_BUCKET_NAME')
+    if not bucket_name:
+        return False
+    try:
+        data = read_bytes_from_s3(S3_BUNDLE_PREFIX + os.path.basename(bundle_path), bucket_name=bucket_name)
+    except FileNotFoundError:
+        return False
+    except Exception as e:
+        logging.warning(f"Could not download taxonomy bundle {os.path.basename(bundle_path)} from S3: {e}")
+        return False
+    try:
+        os.makedirs(os.path.dirname(bundle_path), exist_ok=True)
+        tmp_path = f"{bundle_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, bundle_path)
+    except OSError as e:
+        logging.warning(f"Could not store taxonomy bundle {bundle_path}: {e}")
+        return False
+    return True
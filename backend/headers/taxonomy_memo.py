@@ -0,0 +1,126 @@
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import xbrl.instance
+import xbrl.taxonomy
+from xbrl.helper.uri_helper import is_url
+
+# Parsed taxonomies take about 3x the size of their XML files in memory (tracemalloc on a large schema);
+# rounded up to also cover the arc and locator objects of the linkbases
+MEMORY_PER_FILE_BYTE = 4
+
+
+def _memo_key(schema_url):
+    # http:// and https:// spellings of a schema are the same file in the HttpCache
+    return re.sub(r'^https?://', '', schema_url.strip())
+
+
+def _file_size(cache, uri):
+    try:
+        return os.path.getsize(cache.url_to_path(uri) if is_url(uri) else uri)
+    except (OSError, TypeError):
+        return 0
+
+
+class TaxonomyMemo:
+    """
+    Process-wide memo of the TaxonomySchema objects parsed by py-xbrl's parse_taxonomy_url,
+    keyed by schema URL. Once installed (see install_taxonomy_memo), every parse in the process
+    shares it: the us-gaap, dei and srt schemas of a year and their linkbases are parsed by the
+    first filing that imports them, and reused by the later filings of every ticker.
+
+    The memory of an entry is estimated from the size of its schema and linkbase files
+    (MEMORY_PER_FILE_BYTE). Least recently used entries are evicted once the total passes
+    `max_bytes`. An evicted schema stays alive as long as a memoized schema importing it does.
+    py-xbrl's own per-HttpCache lru_cache is bypassed, so taxonomies are not kept twice.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (TaxonomySchema, estimated bytes)
+        self._namespaces = {}  # key -> target namespace, for stats
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, schema_url):
+        key = _memo_key(schema_url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, schema_url, taxonomy, cache):
+        key = _memo_key(schema_url)
+        linkbases = taxonomy.lab_linkbases + taxonomy.def_linkbases + taxonomy.cal_linkbases + taxonomy.pre_linkbases
+        size = MEMORY_PER_FILE_BYTE * (
+            _file_size(cache, schema_url) + sum(_file_size(cache, linkbase.linkbase_uri) for linkbase in linkbases)
+        )
+        with self._lock:
+            if key in self._entries:
+                # Parsed concurrently by another thread: keep the entry already shared
+                return self._entries[key][0]
+            self._entries[key] = (taxonomy, size)
+            self._namespaces[key] = taxonomy.namespace
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+                evicted_key, (_, evicted_size) = self._entries.popitem(last=False)
+                del self._namespaces[evicted_key]
+                self.total_bytes -= evicted_size
+                self.evictions += 1
+        return taxonomy
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'namespaces': len(set(self._namespaces.values())),
+                    'mb': self.total_bytes / 1e6, 'hits': self.hits, 'misses': self.misses,
+                    'evictions': self.evictions}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._namespaces.clear()
+            self.total_bytes = 0
+
+
+def resolve_memo_bytes():
+    """Memory bound of the taxonomy memo, from XBRL_TAXONOMY_MEMO_MB (default 512, 0 disables it)."""
+    return int(float(os.environ.get('XBRL_TAXONOMY_MEMO_MB', '512')) * 1e6)
+
+
+taxonomy_memo = TaxonomyMemo(resolve_memo_bytes())
+
+_parse_taxonomy_url = getattr(xbrl.taxonomy.parse_taxonomy_url, '__wrapped__', xbrl.taxonomy.parse_taxonomy_url)
+
+
+def _memoized_parse_taxonomy_url(schema_url, cache, imported_schema_uris=None):
+    taxonomy = taxonomy_memo.get(schema_url)
+    if taxonomy is not None:
+        return taxonomy
+    if imported_schema_uris is None:
+        taxonomy = _parse_taxonomy_url(schema_url, cache)  # Keeps py-xbrl's default set of imported URIs
+    else:
+        taxonomy = _parse_taxonomy_url(schema_url, cache, imported_schema_uris)
+    return taxonomy_memo.put(schema_url, taxonomy, cache)
+
+
+def install_taxonomy_memo():
+    """
+    Routes py-xbrl's parse_taxonomy_url through taxonomy_memo, for the schemas imported by
+    filings and those imported by other schemas. Idempotent; does nothing if the memo is
+    disabled (XBRL_TAXONOMY_MEMO_MB=0).
+    """
+    if taxonomy_memo.max_bytes <= 0 or xbrl.taxonomy.parse_taxonomy_url is _memoized_parse_taxonomy_url:
+        return
+    xbrl.taxonomy.parse_taxonomy_url = _memoized_parse_taxonomy_url
+    xbrl.instance.parse_taxonomy_url = _memoized_parse_taxonomy_url
+    logging.info(f"Taxonomy memo installed ({taxonomy_memo.max_bytes / 1e6:.0f} MB)")
@@ -0,0 +1,173 @@
+import json
+import os
+import threading
+import time
+
+import requests
+
+from .sec_client import sec_client
+
+SEC_COMPANY_TICKERS_URL = "https://www.sec.gov/files/company_tickers.json"
+USER_AGENT = "YourCustomResearchApp/1.0 (your.email@example.com)"
+
+
+class TickerIndex:
+    """
+    In-memory ticker -> CIK index built from SEC's company_tickers.json.
+
+    The index is loaded once (from the local disk copy at `cache_path`, else from `seed_path`,
+    else from sec.gov) and lookups are plain dict reads. Once older than `ttl_seconds` it is
+    refreshed in a background thread with a conditional request (If-None-Match /
+    If-Modified-Since), so lookups never wait on the network after the first load.
+    """
+
+    def __init__(self, url=SEC_COMPANY_TICKERS_URL, cache_path=None, ttl_seconds=24 * 3600,
+                 seed_path=None, user_agent=USER_AGENT):
+        self.url = url
+        self.cache_path = cache_path or os.path.join('/tmp', 'ticker_index', 'company_tickers.json')
+        self.ttl_seconds = ttl_seconds
+        self.seed_path = seed_path
+        self.user_agent = user_agent
+        self._ciks = {}  # ticker -> 10 digit, zero padded CIK
+        self._etag = None
+        self._last_modified = None
+        self._refreshed_at = 0.0
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def lookup(self, ticker):
+        """
+        Returns the 10 digit CIK of `ticker`, or None if SEC does not list it.
+        Only the very first lookup of a process without a local copy of the index hits the network.
+        """
+        if not self._loaded:
+            self._load()
+        if time.time() - self._refreshed_at >= self.ttl_seconds:
+            self._refresh_in_background()
+        return self._ciks.get(ticker.upper())
+
+    def refresh(self):
+        """Re-downloads company_tickers.json if it changed since the last download and persists it."""
+        with self._refresh_lock:
+            self._fetch()
+
+    def _fetch(self):
+        # Caller holds _refresh_lock
+        headers = {'User-Agent': self.user_agent}
+        if self._ciks:
+            if self._etag:
+                headers['If-None-Match'] = self._etag
+            if self._last_modified:
+                headers['If-Modified-Since'] = self._last_modified
+
+        response = sec_client.get(self.url, headers=headers)
+        if response.status_code == 304:
+            print("company_tickers.json not modified, keeping the current ticker index.")
+            self._refreshed_at = time.time()
+        else:
+            response.raise_for_status()
+            ciks = self._parse(response.json())
+            with self._lock:
+                self._ciks = ciks
+                self._etag = response.headers.get('ETag')
+                self._last_modified = response.headers.get('Last-Modified')
+                self._refreshed_at = time.time()
+            print(f"Ticker index refreshed with {len(ciks)} tickers.")
+        self._persist()
+
+    def _load(self):
+        with self._refresh_lock:
+            if self._loaded:
+                return
+            if not self._load_from_disk() and self.seed_path:
+                self._load_seed()
+            if not self._ciks:
+                # Nothing on disk: this first lookup has to wait for the download
+                self._fetch()
+            self._loaded = True
+
+    def _load_from_disk(self):
+        try:
+            with open(self.cache_path, 'r') as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable ticker index {self.cache_path}: {e}")
+            return False
+
+        with self._lock:
+            self._ciks = stored.get('tickers', {})
+            self._etag = stored.get('etag')
+            self._last_modified = stored.get('last_modified')
+            self._refreshed_at = stored.get('refreshed_at', 0.0)
+        print(f"Ticker index loaded from {self.cache_path} with {len(self._ciks)} tickers.")
+        return bool(self._ciks)
+
+    def _load_seed(self):
+        # The seed is only a starting point: refreshed_at stays 0 so it is revalidated right away
+        try:
+            with open(self.seed_path, 'r') as f:
+                ciks = self._parse(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable ticker index seed {self.seed_path}: {e}")
+            return
+        with self._lock:
+            self._ciks = ciks
+        print(f"Ticker index seeded from {self.seed_path} with {len(ciks)} tickers.")
+
+    def _persist(self):
+        with self._lock:
+            stored = {
+                'etag': self._etag,
+                'last_modified': self._last_modified,
+                'refreshed_at': self._refreshed_at,
+                'tickers': self._ciks,
+            }
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(stored, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Could not persist ticker index to {self.cache_path}: {e}")
+
+    def _refresh_in_background(self):
+        if self._refresh_lock.locked():
+            return
+
+        def run():
+            try:
+                with self._refresh_lock:
+                    # Another thread may have refreshed while this one was starting
+                    if time.time() - self._refreshed_at >= self.ttl_seconds:
+                        self._fetch()
+            except (requests.exceptions.RequestException, ValueError) as e:
+                print(f"Background ticker index refresh failed: {e}")
+
+        threading.Thread(target=run, name='ticker-index-refresh', daemon=True).start()
+
+    @staticmethod
+    def _parse(tickers_data):
+        """
+        Builds {ticker: cik} from SEC's company_tickers.json ({"0": {"cik_str", "ticker", "title"}, ...}).
+        A list of records is accepted too; records without a CIK are skipped.
+        """
+        records = tickers_data.values() if isinstance(tickers_data, dict) else tickers_data
+        ciks = {}
+        for company_info in records:
+            if 'cik_str' not in company_info or 'ticker' not in company_info:
+                continue
+            # CIKs are typically 10 digits and might be padded with leading zeros
+            ciks.setdefault(company_info['ticker'].upper(), str(company_info['cik_str']).zfill(10))
+        return ciks
+
+
+# Process-wide index shared by the XBRL processors and sec_edgar_endpoint
+ticker_index = TickerIndex(
+    cache_path=os.environ.get('TICKER_INDEX_PATH'),
+    ttl_seconds=float(os.environ.get('TICKER_INDEX_TTL_SECONDS', 24 * 3600)),
+    seed_path=os.environ.get('TICKER_INDEX_SEED'),
+)
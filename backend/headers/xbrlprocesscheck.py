@@ -1,37 +1,36 @@
 import requests
 import pandas as pd
 import os
-import sys
 from tqdm import tqdm
 import logging
 from xbrl.cache import HttpCache
-from xbrl.instance import XbrlParser, XbrlInstance
+from xbrl.instance import XbrlParser
 import json
 import re
 from datetime import datetime, timedelta
 from urllib.parse import urlencode
 import time
 
-# Assuming s3_utils.py is in the same directory or accessible in PYTHONPATH
-# from .s3_utils import write_json_to_s3, read_json_from_s3
-# For standalone execution without S3, we'll mock these or provide simple placeholders
 try:
-    from .s3_utils import write_json_to_s3, read_json_from_s3
+    from .ticker_index import ticker_index
+    from .sec_client import sec_client
+    from .concept_map import extended_financial_extractor
+    from .parallel_parse import parse_filings, print_parse_timings, resolve_parse_workers
+    from .financial_frame import CellProvenance, FinancialMatrix
+    from .company_facts import fetch_company_facts
+    from .fact_cache import FactCache
+    from .taxonomy_bundle import load_taxonomy_bundle
+    from .taxonomy_memo import install_taxonomy_memo
 except ImportError:
-    logging.warning("s3_utils not found. Mocking S3 functions for local testing.")
-    def write_json_to_s3(data, file_key, bucket_name):
-        print(f"Mock S3: Writing to {bucket_name}/{file_key}")
-        # Example: write to a local file for testing
-        os.makedirs(os.path.dirname(file_key), exist_ok=True)
-        with open(file_key, 'w') as f:
-            json.dump(data, f, indent=4)
-
-    def read_json_from_s3(file_key, bucket_name):
-        print(f"Mock S3: Reading from {bucket_name}/{file_key}")
-        # Example: read from a local file for testing
-        with open(file_key, 'r') as f:
-            return json.load(f)
-
+    from ticker_index import ticker_index
+    from sec_client import sec_client
+    from concept_map import extended_financial_extractor
+    from parallel_parse import parse_filings, print_parse_timings, resolve_parse_workers
+    from financial_frame import CellProvenance, FinancialMatrix
+    from company_facts import fetch_company_facts
+    from fact_cache import FactCache
+    from taxonomy_bundle import load_taxonomy_bundle
+    from taxonomy_memo import install_taxonomy_memo
 
 # Suppress InsecureRequestWarning
 import urllib3
@@ -51,81 +50,32 @@ logging.info(f"XBRL cache directory set to: {xbrl_cache_dir}")
 
 cache: HttpCache = HttpCache(xbrl_cache_dir, verify_https=False) # Keep verify=False here for SEC connections
 cache.set_headers({'User-Agent': USER_AGENT})
+# Download filings through the shared rate-limited SEC client instead of py-xbrl's fixed 500ms delay
+sec_client.attach_to_cache(cache)
+# Seed the cache with the pre-built taxonomy bundle and its namespace catalog
+load_taxonomy_bundle(cache)
+# Share parsed taxonomy schemas between all the filings parsed by this process
+install_taxonomy_memo()
 
 parser = XbrlParser(cache)
 
+# Facts already extracted from each filing, by accession number (local disk and S3)
+fact_cache = FactCache(os.path.join(xbrl_cache_dir, "facts"))
 
-# ------------------ UTILITY FUNCTIONS ------------------------------- #
-
-def create_initialized_financial_dataframe_by_date(all_extracted_facts_dict):
-    financial_accounting_variables = [
-        'Revenue', 'CostofSales', 'GrossProfit', 'OperatingExpense', 'ResearchExpense', 'Depreciation', 'Amortization', 'OperatingIncome', 'OperatingIncomeAfterInterest', 'InteresIncome', 'Interest', 'Tax', 'NetIncome',
-        'TotalAsset', 'CurrentAssets', 'Inventory', 'PPEnet', 'MinorityInterest', 'EquityIncludingMinorityInterest', 'Equity(BV)', 'ShortTermDebt(BV)', 'LongTermDebtWithLease(BV)', 'Debt(BV)', 'CurrentLiabilities', 'TotalLiability',
-        'LongTermDebtWithoutLease(BV)', 'LongTermLease(BV)', 'LeaseDueThisYear', 'LeaseDueYearOne', 'LeaseDueYearTwo', 'LeaseDueYearThree', 'LeaseDueYearFour',
-        'LeaseDueYearFive', 'LeaseDueAfterYearFive', 'Cash'
-    ]
-
-    sorted_report_dates = sorted(all_extracted_facts_dict.keys())
-    date_columns = [date.strftime('%Y-%m-%d') for date in sorted_report_dates]
-
-    columns = ["Accounting Variable"] + date_columns
-
-    new_df = pd.DataFrame(columns=columns)
-
-    for var in financial_accounting_variables:
-        row_data = {"Accounting Variable": var}
-        for col_date_str in date_columns:
-            row_data[col_date_str] = 0
-        new_df = pd.concat([new_df, pd.DataFrame([row_data])], ignore_index=True)
-
-    return new_df
-
-def find_latest_tuple_by_string(data_list, search_string_list):
-    search_string = None
-
-    for search_element in search_string_list:
-        for main_tuple in data_list:
-            if main_tuple[0] == search_element: # Directly compare the concept string
-                search_string = search_element
-                break
-        if search_string:
-                break
 
-    latest_tuple = None
-
-    if search_string is None: # If no search string found, return None
-        return None
-
-    for current_tuple in data_list:
-        str_value, num_value, dt_object = current_tuple
-
-        if str_value == search_string:
-            if latest_tuple is None:
-                latest_tuple = current_tuple
-            else:
-                _, _, latest_dt_object = latest_tuple
-                if dt_object > latest_dt_object:
-                    latest_tuple = current_tuple
+# ------------------ UTILITY FUNCTIONS ------------------------------- #
 
-    return latest_tuple
+def create_initialized_financial_matrix_by_date(all_extracted_facts_dict):
+    # One zero-filled float64 block for all variables and report dates, filled in place
+    return FinancialMatrix(extended_financial_extractor.variables, all_extracted_facts_dict.keys())
 
 def get_company_cik(ticker):
     """
-    Fetches the CIK for a given stock ticker from SEC's public mapping.
+    Returns the CIK for a given stock ticker from the shared, locally cached SEC ticker index.
     """
-    url = "https://www.sec.gov/files/company_tickers.json"
-    headers = {'User-Agent': USER_AGENT}
     try:
-        response = requests.get(url, headers=headers, verify=False)
-        response.raise_for_status() # Raise an exception for HTTP errors
-        tickers_data = response.json()
-
-        for company_info in tickers_data.values():
-            if company_info['ticker'] == ticker.upper():
-                # CIKs are typically 10 digits and might be padded with leading zeros
-                return str(company_info['cik_str']).zfill(10)
-        return None
-    except requests.exceptions.RequestException as e:
+        return ticker_index.lookup(ticker)
+    except (requests.exceptions.RequestException, ValueError) as e:
         print(f"Error fetching CIK for {ticker}: {e}")
         return None
 
@@ -168,7 +118,7 @@ def fetch_historical_10k_filings_api_get(cik, company_name):
     print(f"  Requesting URL: {search_url_with_filters}")
 
     try:
-        response = requests.get(search_url_with_filters, headers=headers, verify=False)
+        response = sec_client.get(search_url_with_filters, headers=headers)
         response.raise_for_status()
         search_results = response.json()
 
@@ -219,7 +169,6 @@ def fetch_historical_10k_filings_api_get(cik, company_name):
                 })
 
         print(f"  Fetched {len(filings_in_batch)} filings in this batch. Total collected: {len(all_filings_data)}")
-        time.sleep(0.5)
 
     except requests.exceptions.HTTPError as e:
         print(f"  HTTP Error fetching data for CIK {cik} ({company_name}): {e}")
@@ -237,50 +186,21 @@ def fetch_historical_10k_filings_api_get(cik, company_name):
 
     return pd.DataFrame(all_filings_data)
 
-def fetch_company_facts_from_sec_api(cik):
+def fetch_company_facts_from_sec_api(cik, concepts=None):
     """
-    Fetches all company facts for a given CIK from the SEC's companyfacts API.
-    Transforms the data into a list of (concept, value, date) tuples.
+    Fetches the company facts for a given CIK from the SEC's companyfacts API, streamed and
+    filtered to `concepts` (all if None) and the last 5 years while parsing.
+    Returns them as a list of (concept, value, date) tuples.
     """
     cik_padded = str(cik).zfill(10)
-    url = f"https://data.sec.gov/api/xbrl/companyfacts/CIK{cik_padded}.json"
     headers = {'User-Agent': USER_AGENT}
-    all_facts = []
     print(f"  Attempting to fetch company facts from SEC API for CIK: {cik_padded}")
 
     try:
-        response = requests.get(url, headers=headers, verify=False)
-        response.raise_for_status()
-        company_facts_data = response.json()
-
         # Calculate the 5-year lookback date from today
-        today = datetime.now().date()
-        five_years_ago = today - timedelta(days=5 * 365) # Approximate 5 years
-
-        for taxonomy_type in ['us-gaap', 'dei']:
-            if taxonomy_type in company_facts_data.get('facts', {}):
-                for concept, concept_data in company_facts_data['facts'][taxonomy_type].items():
-                    for unit, unit_data_list in concept_data.get('units', {}).items():
-                        for fact_entry in unit_data_list:
-                            try:
-                                date_str = fact_entry.get('end')
-                                if not date_str:
-                                    continue
-                                period_datetime = datetime.fromisoformat(date_str)
-
-                                # Filter facts to only include those within the last 5 years
-                                if period_datetime.date() >= five_years_ago: # Compare date parts only
-                                    value = fact_entry.get('val')
-                                    if value is not None:
-                                        all_facts.append((concept, value, period_datetime))
-                                else:
-                                    pass # Fact is older than 5 years, skip it
-                            except ValueError as ve:
-                                logging.warning(f"  Could not parse date or value for concept '{concept}' from SEC API: {ve}. Skipping fact.")
-                                continue
-                            except Exception as ex:
-                                logging.warning(f"  Error processing fact for concept '{concept}' from SEC API: {ex}. Skipping fact.")
-                                continue
+        five_years_ago = datetime.now().date() - timedelta(days=5 * 365) # Approximate 5 years
+        company_facts = fetch_company_facts(cik, concepts=concepts, since=five_years_ago, headers=headers)
+        all_facts = company_facts.facts()
         print(f"  Successfully fetched and processed {len(all_facts)} facts (filtered to last 5 years) from SEC Company Facts API.")
         return all_facts
     except requests.exceptions.HTTPError as e:
@@ -288,7 +208,7 @@ def fetch_company_facts_from_sec_api(cik):
         if e.response.status_code == 404:
             print(f"  (404 Not Found: Company facts might not be available for CIK {cik_padded} or API path is incorrect).")
         print(f"  Response content: {e.response.text}")
-    except json.JSONDecodeError:
+    except ValueError:
         print(f"  Error decoding JSON response from SEC Company Facts API for CIK {cik_padded}.")
     except requests.exceptions.RequestException as e:
         print(f"  Network error fetching company facts for CIK {cik_padded}: {e}")
@@ -297,9 +217,177 @@ def fetch_company_facts_from_sec_api(cik):
     return []
 
 
+EXTRACTION_STRATEGIES = ('companyfacts', 'xbrl')
+
+# Rows worth parsing a filing's XBRL instance for when companyfacts has no value for them.
+# Other rows left at their default are taken as not reported by the company.
+GAP_FILL_VARIABLES = ('Revenue', 'NetIncome', 'TotalAsset', 'CurrentAssets', 'CurrentLiabilities', 'Equity(BV)', 'Cash')
+
+
+def resolve_extraction_strategy(strategy=None):
+    """
+    'companyfacts' (companyfacts API first, XBRL parsing only for the gaps) or 'xbrl' (parse
+    every filing, companyfacts only as a global fallback). Read from XBRL_EXTRACTION_STRATEGY
+    if None, default 'companyfacts'.
+    """
+    if strategy is None:
+        strategy = os.environ.get('XBRL_EXTRACTION_STRATEGY', 'companyfacts')
+    if strategy not in EXTRACTION_STRATEGIES:
+        raise ValueError(f"Unknown extraction strategy {strategy!r}, expected one of {EXTRACTION_STRATEGIES}")
+    return strategy
+
+
+def build_financial_frame(facts_by_report_date, ticker, stats, source_of):
+    """
+    Fills the financial DataFrame from {report date: facts} and records in df.attrs['extraction']
+    the `stats` of the run plus the path that served each cell: source_of(report_date, concepts)
+    names the path of a value read from `concepts`, cells left at their default are 'missing'.
+    df.attrs['extraction']['provenance'] is {date column: {variable: path}}.
+    """
+    financial_matrix = create_initialized_financial_matrix_by_date(facts_by_report_date)
+    provenance = CellProvenance(financial_matrix)
+
+    print("\n--- Populating DataFrame with extracted facts ---")
+
+    for report_date_dt, company_main_list in facts_by_report_date.items():
+        report_date_str = report_date_dt.strftime('%Y-%m-%d')
+
+        if financial_matrix.has_date(report_date_str):
+            # One pass over the facts, then the derived variables in dependency order
+            sources = extended_financial_extractor.fill(financial_matrix, report_date_str, company_main_list)
+            for variable, concepts in sources.items():
+                if concepts:
+                    provenance.set(variable, report_date_str, source_of(report_date_dt, concepts))
+
+    initialized_financial_df = financial_matrix.to_frame()
+    print(initialized_financial_df)
+
+    stats = dict(stats, cells=provenance.counts())
+    print(f"  Extraction for {ticker} ({stats['strategy']}): {stats['filings']} filings, "
+          f"{stats['companyfacts_requests']} companyfacts request(s), {stats['xbrl_parsed']} XBRL instance(s) parsed "
+          f"in {stats['parse_seconds']:.2f}s, {stats['xbrl_cached']} from the fact cache; cells by source: {stats['cells']}")
+    initialized_financial_df.attrs['extraction'] = dict(stats, provenance=provenance.to_dict())
+    return initialized_financial_df
+
+
+def companyfacts_first_processor(df_filings, ticker, cik_original, parse_workers=None,
+                                 gap_fill_variables=GAP_FILL_VARIABLES):
+    """
+    Builds the financial DataFrame from one companyfacts API request, matching its facts to each
+    10-K in `df_filings` by accession number. A filing's XBRL instance is only parsed when
+    companyfacts has no facts for it (e.g. it was filed too recently) or none of the concepts
+    of some `gap_fill_variables`; its facts then only add concepts companyfacts lacks.
+    Cells are attributed to 'companyfacts' or 'xbrl' in df.attrs['extraction'].
+    """
+    extractor = extended_financial_extractor
+    stats = {'strategy': 'companyfacts', 'filings': 0, 'companyfacts_requests': 1,
+             'xbrl_parsed': 0, 'xbrl_cached': 0, 'parse_seconds': 0.0}
+
+    try:
+        company_facts = fetch_company_facts(
+            cik_original, concepts=extractor.concepts, headers={'User-Agent': USER_AGENT}
+        ).by_accession()
+        print(f"  Company facts cover {len(company_facts)} filings of CIK {cik_original}.")
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"  Could not fetch company facts for CIK {cik_original}: {e}. Parsing every filing instead.")
+        company_facts = {}
+
+    # Later rows of the same report date win, as in the XBRL strategy
+    filings_by_date = {}
+    for index, row in df_filings.iterrows():
+        if row['reporting_date'] is None or pd.isna(row['reporting_date']):
+            logging.warning(f"Skipping row {index} with invalid report date.")
+            continue
+        filings_by_date[row['reporting_date']] = row
+    stats['filings'] = len(filings_by_date)
+
+    facts_by_report_date = {}
+    filings = []
+    for report_date, row in filings_by_date.items():
+        facts = company_facts.get(row['accession_number'], [])
+        facts_by_report_date[report_date] = facts
+        if not facts:
+            reason = "no companyfacts data"
+        else:
+            _, sources = extractor.resolve(facts)
+            gaps = [variable for variable in gap_fill_variables if not sources.get(variable)]
+            if not gaps:
+                continue
+            reason = f"no companyfacts value for {', '.join(gaps)}"
+
+        if row['report_link'] == 'N/A':
+            logging.warning(f"{report_date}: {reason} and no working EDGAR link.")
+            continue
+        print(f"  {report_date}: {reason}, parsing {os.path.basename(row['report_link'])}")
+        filings.append((report_date, row['report_link'], row['accession_number']))
+
+    xbrl_concepts = {}  # report date -> concepts whose facts came from the XBRL instance
+    if filings:
+        workers = resolve_parse_workers(len(filings), parse_workers)
+        logging.info(f"Parsing {len(filings)} XBRL instances with {workers} worker(s)")
+        timings = []
+        parse_started = time.perf_counter()
+        for report_date, result in parse_filings(filings, extractor.concepts, parser, cache, workers,
+                                                 fact_cache=fact_cache):
+            if isinstance(result, Exception):
+                logging.error(f"Error processing the {report_date} filing: {result}")
+                continue
+            timings.append((report_date, result))
+            reported = {fact[0] for fact in facts_by_report_date[report_date]}
+            added = [fact for fact in result['facts'] if fact[0] not in reported]
+            facts_by_report_date[report_date] = facts_by_report_date[report_date] + added
+            xbrl_concepts[report_date] = {fact[0] for fact in added}
+
+        if timings:
+            timings.sort(key=lambda item: item[0])
+            print_parse_timings(timings, time.perf_counter() - parse_started, workers)
+        stats['xbrl_parsed'] = sum(1 for _, result in timings if result['reader'] != 'cache')
+        stats['xbrl_cached'] = len(timings) - stats['xbrl_parsed']
+        stats['parse_seconds'] = round(sum(result['download_seconds'] + result['parse_seconds'] + result['extract_seconds']
+                                           for _, result in timings), 2)
+
+    facts_by_report_date = {
+        report_date: facts for report_date, facts in sorted(facts_by_report_date.items()) if facts
+    }
+    if not facts_by_report_date:
+        print("No facts available to create financial dataframe. Returning empty DataFrame.")
+        return pd.DataFrame()
+
+    return build_financial_frame(
+        facts_by_report_date, ticker, stats,
+        lambda report_date, concepts: 'xbrl' if concepts & xbrl_concepts.get(report_date, set()) else 'companyfacts'
+    )
+
+
 # ------------ MAIN DATA PROCESSING FUNCTION ------------------------#
-def xbrl_data_processor(trailing_data, ticker, cik_original, s3_bucket_name=None):
+def xbrl_data_processor(trailing_data, ticker, cik_original, s3_bucket_name=None, parse_workers=None, strategy=None,
+                        report_dates=None):
+    """
+    Builds the financial DataFrame of the company's recent 10-K filings.
+
+    With the 'companyfacts' strategy (see resolve_extraction_strategy) the frame comes from the
+    companyfacts API and XBRL instances are only parsed for the gaps (companyfacts_first_processor).
+    With 'xbrl' every instance is parsed, falling back to the companyfacts API when they are
+    missing or too small. Either way df.attrs['extraction'] records the requests made and the
+    path that served each cell (see build_financial_frame).
+    parse_workers (an int or 'auto', default XBRL_PARSE_WORKERS) sets how many processes
+    parse the instances in parallel; see parallel_parse.parse_filings.
+    If report_dates (a set of datetime.date) is given, only the filings of those report dates
+    are processed, e.g. the ones missing from the stored dataset.
+    """
+    strategy = resolve_extraction_strategy(strategy)
     df_filings = fetch_historical_10k_filings_api_get(cik_original,ticker)
+    if report_dates is not None and not df_filings.empty:
+        df_filings = df_filings[df_filings['reporting_date'].isin(report_dates)].copy()
+        if df_filings.empty:
+            print(f"  None of the report dates to process were found among the filings of {ticker}.")
+            return pd.DataFrame()
+    if strategy == 'companyfacts' and not df_filings.empty:
+        return companyfacts_first_processor(df_filings, ticker, cik_original, parse_workers)
+
+    stats = {'strategy': 'xbrl', 'filings': len(df_filings), 'companyfacts_requests': 0,
+             'xbrl_parsed': 0, 'xbrl_cached': 0, 'parse_seconds': 0.0}
+    facts_source = 'xbrl' # Path the facts of every report date come from
 
     all_extracted_facts_from_xbrl = {} # Facts extracted directly from XBRL instance files
     MIN_FACTS_THRESHOLD = 1000 # Threshold for individual XBRL instance raw facts
@@ -322,121 +410,85 @@ def xbrl_data_processor(trailing_data, ticker, cik_original, s3_bucket_name=None
         print(df_filings.head())
 
         df = df_filings.copy()
-        df['s3_json_key'] = None
-        loop_break_flag = False
+        df['facts_extracted'] = None
+        df['parse_seconds'] = None
+        extracted_by_row = {} # Facts (or [] when unusable) of each filing, keyed by df index
 
         logging.info("--- Processing XBRL instances from EDGAR links ---")
+        filings = []
         for index, row in df.iterrows():
-            time.sleep(1)
             schema_url = row['report_link']
             report_date = row['reporting_date']
 
             # Only process if report_date is valid (not None) and in our expected list
             if report_date is None or report_date not in valid_reporting_dates:
                 logging.warning(f"Skipping row {index} with invalid or unexpected report date: {report_date}.")
-                df.at[index, 's3_json_key'] = "ERROR: Invalid or unexpected report date"
+                df.at[index, 'facts_extracted'] = "ERROR: Invalid or unexpected report date"
                 continue
 
             if schema_url == 'N/A':
                 logging.warning(f"Skipping row {index} as no valid EDGAR link was found.")
-                df.at[index, 's3_json_key'] = "ERROR: No working EDGAR link"
+                df.at[index, 'facts_extracted'] = "ERROR: No working EDGAR link"
                 # If a filing has no link, it contributes to needing fallback for its date
                 should_use_api_fallback = True # Global fallback triggered if any specific filing fails this way
-                all_extracted_facts_from_xbrl[report_date] = [] # Mark as empty for this date
+                extracted_by_row[index] = [] # Mark as empty for this date
                 continue
-
-            try:
-                logging.info(f"Processing XBRL instance from: {schema_url}")
-                inst: XbrlInstance = parser.parse_instance(schema_url)
-                xbrl_json_data = inst.json()
-                data_dict = json.loads(xbrl_json_data)
-
-                # Count facts directly from data_dict['facts'] immediately as requested
-                current_instance_raw_facts_count = len(data_dict.get("facts", {}))
-                print(f"  Raw facts found in {os.path.basename(schema_url)} (from data_dict): {current_instance_raw_facts_count}")
-
-                # **Decision Point: Check if we should proceed with original method or use SEC API**
-                if current_instance_raw_facts_count < MIN_FACTS_THRESHOLD:
-                    logging.warning(f"  Raw facts ({current_instance_raw_facts_count}) for {os.path.basename(schema_url)} are below threshold ({MIN_FACTS_THRESHOLD}). This will trigger global API fallback.")
-                    should_use_api_fallback = True
-                    # Do NOT extract or filter facts for this report here.
-                    all_extracted_facts_from_xbrl[report_date] = [] # Mark as empty or discard these insufficient facts
-                    df.at[index, 's3_json_key'] = f"facts below threshold ({current_instance_raw_facts_count}), using companyfacts API json" # Mark in DF
-                    
-                    # Continue to the next filing, but don't populate detailed facts from this one
-                    s3_key = f"xbrl_json_data/{os.path.basename(schema_url).replace('.htm', '.json')}"
-                    write_json_to_s3(
-                        data=data_dict,
-                        file_key=s3_key,
-                        bucket_name=s3_bucket_name
-                    )
-                    logging.info(f"Successfully uploaded raw XBRL JSON to s3://{s3_bucket_name}/{s3_key}")
-                    continue # Skip to the next iteration of the loop
-                
-                # IF we reach here, it means current_instance_raw_facts_count >= MIN_FACTS_THRESHOLD
-                # So, proceed with extracting and filtering facts for this report
-                company_main_list_for_report = []
-                if "facts" in data_dict:
-                    for fact_key, fact_data in data_dict["facts"].items():
-                        if ("dimensions" in fact_data and "concept" in fact_data["dimensions"] and
-                                "period" in fact_data["dimensions"] and "value" in fact_data):
-
-                            if len(fact_data["dimensions"]) != 5:
-                                continue
-
-                            concept_value = fact_data["dimensions"]["concept"]
-                            period_value = fact_data["dimensions"]["period"]
-                            actual_value = fact_data["value"]
-
-                            date_str = ""
-                            if '/' in period_value:
-                                parts = period_value.split('/')
-                                date_str = parts[1] if len(parts) > 1 else period_value
-                            else:
-                                date_str = period_value
-
-                            try:
-                                period_datetime = datetime.fromisoformat(date_str)
-                                # Ensure the extracted fact's date is relevant to the current report_date
-                                # For XBRL instances, the fact's period_datetime should ideally match the report_date
-                                # or be the end date of the reporting period. We will still add it.
-                                company_main_list_for_report.append((concept_value, actual_value, period_datetime))
-                            except ValueError as ve:
-                                logging.warning(f"  Could not parse date '{date_str}' for concept '{concept_value}' in {schema_url}: {ve}. Skipping this fact for report {report_date}.")
-                                continue
-                
-                all_extracted_facts_from_xbrl[report_date] = company_main_list_for_report
-
-                # Always attempt to upload the raw JSON to S3 for debugging/archiving
-                s3_key = f"xbrl_json_data/{os.path.basename(schema_url).replace('.htm', '.json')}"
-                write_json_to_s3(
-                    data=data_dict,
-                    file_key=s3_key,
-                    bucket_name=s3_bucket_name
-                )
-                logging.info(f"Successfully uploaded XBRL JSON to s3://{s3_bucket_name}/{s3_key}")
-                df.at[index, 's3_json_key'] = s3_key # Record success of S3 upload
-
-            except Exception as e:
-                logging.error(f"Error processing {schema_url}: {e}")
-                df.at[index, 's3_json_key'] = f"ERROR {e}"
-                all_extracted_facts_from_xbrl[report_date] = [] # Mark as empty due to error
+            filings.append((index, schema_url, row['accession_number']))
+
+        workers = resolve_parse_workers(len(filings), parse_workers)
+        logging.info(f"Parsing {len(filings)} XBRL instances with {workers} worker(s)")
+        timings = []
+        parse_started = time.perf_counter()
+        for index, result in parse_filings(filings, extended_financial_extractor.concepts, parser, cache, workers,
+                                           fact_cache=fact_cache):
+            schema_url = df.at[index, 'report_link']
+            if isinstance(result, Exception):
+                logging.error(f"Error processing {schema_url}: {result}")
+                df.at[index, 'facts_extracted'] = f"ERROR {result}"
+                extracted_by_row[index] = [] # Mark as empty due to error
                 should_use_api_fallback = True # An error processing an XBRL also triggers fallback
-                if "The taxonomy with namespace http://xbrl.sec.gov/cyd/2024 could not be found" in str(e):
-                    print("Ending loop due to missing CYD taxonomy (critical error).")
-                    loop_break_flag = True
-                    break
+                continue
+
+            timings.append((df.at[index, 'reporting_date'], result))
+            df.at[index, 'parse_seconds'] = round(result['parse_seconds'], 2)
+            # Every fact of the instance, before any filtering
+            current_instance_raw_facts_count = result['fact_count']
+            print(f"  Raw facts found in {os.path.basename(schema_url)}: {current_instance_raw_facts_count}")
+
+            # **Decision Point: Check if we should proceed with original method or use SEC API**
+            if current_instance_raw_facts_count < MIN_FACTS_THRESHOLD:
+                logging.warning(f"  Raw facts ({current_instance_raw_facts_count}) for {os.path.basename(schema_url)} are below threshold ({MIN_FACTS_THRESHOLD}). This will trigger global API fallback.")
+                should_use_api_fallback = True
+                # Do NOT use the facts of this report.
+                extracted_by_row[index] = [] # Mark as empty or discard these insufficient facts
+                df.at[index, 'facts_extracted'] = f"facts below threshold ({current_instance_raw_facts_count}), using companyfacts API json" # Mark in DF
+                continue
+
+            # IF we reach here, it means current_instance_raw_facts_count >= MIN_FACTS_THRESHOLD
+            # So, keep the non-dimensional numeric facts of the mapped concepts for this report
+            extracted_by_row[index] = result['facts']
+            df.at[index, 'facts_extracted'] = len(result['facts'])
+
+        if timings:
+            timings.sort(key=lambda item: item[0])
+            print_parse_timings(timings, time.perf_counter() - parse_started, workers)
+        stats['xbrl_parsed'] = sum(1 for _, result in timings if result['reader'] != 'cache')
+        stats['xbrl_cached'] = len(timings) - stats['xbrl_parsed']
+        stats['parse_seconds'] = round(sum(result['download_seconds'] + result['parse_seconds'] + result['extract_seconds']
+                                           for _, result in timings), 2)
+
+        # Merge in report date order, independent of the order the parsers finished in
+        for index in sorted(extracted_by_row, key=lambda index: (df.at[index, 'reporting_date'], index)):
+            all_extracted_facts_from_xbrl[df.at[index, 'reporting_date']] = extracted_by_row[index]
 
         print(df)
-        if loop_break_flag:
-            print("Exiting XBRL parsing loop early.")
-            sys.exit(1)
     # else: condition for should_use_api_fallback already handled at the top
 
     final_facts_for_processing = {}
     if should_use_api_fallback:
         print(f"\n--- Initiating global fallback to SEC Company Facts API for CIK {cik_original} (filtering for last 5 years and filing dates) ---")
-        sec_api_facts = fetch_company_facts_from_sec_api(cik_original) # This function already filters for last 5 years
+        sec_api_facts = fetch_company_facts_from_sec_api(cik_original, extended_financial_extractor.concepts) # This function already filters for last 5 years
+        stats['companyfacts_requests'] = 1
         
         if sec_api_facts:
             # Filter API facts to only include those relevant to the dates found in df_filings
@@ -454,6 +506,7 @@ def xbrl_data_processor(trailing_data, ticker, cik_original, s3_bucket_name=None
                     if date_key not in final_facts_for_processing:
                         final_facts_for_processing[date_key] = []
                     final_facts_for_processing[date_key].append((concept, value, date_obj))
+                facts_source = 'companyfacts'
                 print(f"Successfully collected {len(api_facts_for_filing_dates)} facts from SEC Company Facts API (filtered by filing dates) for processing.")
             else:
                 print("  Filtered SEC Company Facts API data did not yield any facts matching filing dates.")
@@ -486,398 +539,5 @@ def xbrl_data_processor(trailing_data, ticker, cik_original, s3_bucket_name=None
         return pd.DataFrame()
 
 
-    initialized_financial_df = create_initialized_financial_dataframe_by_date(final_facts_for_processing)
-
-    print("\n--- Populating DataFrame with extracted facts ---")
-
-    for report_date_dt, company_main_list in final_facts_for_processing.items():
-        report_date_str = report_date_dt.strftime('%Y-%m-%d')
-
-        if report_date_str in initialized_financial_df.columns:
-            # Revenue Filling
-            revenue = find_latest_tuple_by_string(company_main_list, ["Revenues", "RevenueFromContractWithCustomerExcludingAssessedTax"])
-            if revenue is not None:
-               revenue = revenue[1]
-            else:
-                revenue = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'Revenue'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = revenue
-
-            # Operating Income Filling
-            operating_income = find_latest_tuple_by_string(company_main_list, ["OperatingIncomeLoss"])
-            if operating_income is not None:
-                operating_income = operating_income[1]
-            else:
-                operating_income = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'OperatingIncome'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = operating_income
-
-            # Equity(Book Value) Filling
-            book_value_equity = find_latest_tuple_by_string(company_main_list, ["StockholdersEquity"])
-            if book_value_equity is not None:
-                book_value_equity = book_value_equity[1]
-            else:
-                book_value_equity = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'Equity(BV)'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = book_value_equity
-
-            # ShortTermDebt(Book Value) Filling
-            book_value_shortterm_debt = find_latest_tuple_by_string(company_main_list, ["DebtCurrent"])
-            if book_value_shortterm_debt is not None:
-                book_value_shortterm_debt = book_value_shortterm_debt[1]
-            else:
-                book_value_shortterm_debt = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'ShortTermDebt(BV)'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = book_value_shortterm_debt
-
-            # LongTermDebt without lease (Book Value) Filling
-            book_value_longtermdebt_withoutlease = find_latest_tuple_by_string(company_main_list, ["LongTermDebtNoncurrent", "LongTermDebt"])
-            if book_value_longtermdebt_withoutlease is not None:
-                book_value_longtermdebt_withoutlease = book_value_longtermdebt_withoutlease[1]
-            else:
-                book_value_longtermdebt_withoutlease = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'LongTermDebtWithoutLease(BV)'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = book_value_longtermdebt_withoutlease
-
-            # LongTermLease(Book Value) Filling
-            book_value_longterm_lease = find_latest_tuple_by_string(company_main_list, ["LongTermLeaseLiabilityNoncurrentNet"])
-            if book_value_longterm_lease is not None:
-                book_value_longterm_lease = book_value_longterm_lease[1]
-            else:
-                book_value_longterm_lease = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'LongTermLease(BV)'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = book_value_longterm_lease
-
-            # LongTerm Debt(BV) Filling
-            book_value_longtermdebt = find_latest_tuple_by_string(company_main_list, ["LongTermDebtAndCapitalLeaseObligations", "LongTermDebtAndCapitalLeaseObligationsIncludingCurrentMaturities", "DebtAndCapitalLeaseObligations"])
-            if book_value_longtermdebt is not None:
-                book_value_longtermdebt = book_value_longtermdebt[1]
-            else:
-                book_value_longtermdebt = book_value_longtermdebt_withoutlease + book_value_longterm_lease
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'LongTermDebtWithLease(BV)'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = book_value_longtermdebt
-
-            # Debt(BV) Filling
-            book_value_debt = book_value_longtermdebt + book_value_shortterm_debt
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'Debt(BV)'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = book_value_debt
-
-            # Cash Filling
-            cash = find_latest_tuple_by_string(company_main_list, ["CashAndCashEquivalentsAtCarryingValue", "CashCashEquivalentsRestrictedCashAndRestrictedCashEquivalents"])
-            if cash is not None:
-                cash = cash[1]
-            else:
-                cash = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'Cash'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = cash
-
-            # Tax Filling
-            tax = find_latest_tuple_by_string(company_main_list, ["IncomeTaxExpenseBenefit"])
-            if tax is not None:
-                tax = tax[1]
-            else:
-                tax = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'Tax'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = tax
-
-            # Lease Values
-            # This Year
-            lease_thisyear = find_latest_tuple_by_string(company_main_list, ["CurrentLeaseLiabilityNet"])
-            if lease_thisyear is not None:
-                lease_thisyear = lease_thisyear[1]
-            else:
-                lease_thisyear = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'LeaseDueThisYear'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = lease_thisyear
-
-            # Year One (Lease)
-            lease_yearone = find_latest_tuple_by_string(company_main_list, ["LesseeOperatingLeaseLiabilityPaymentsDueNextTwelveMonths"])
-            if lease_yearone is not None:
-                lease_yearone = lease_yearone[1]
-            else:
-                lease_yearone = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'LeaseDueYearOne'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = lease_yearone
-
-            # Year Two (Lease)
-            lease_yeartwo = find_latest_tuple_by_string(company_main_list, ["LesseeOperatingLeaseLiabilityPaymentsDueYearTwo"])
-            if lease_yeartwo is not None:
-                lease_yeartwo = lease_yeartwo[1]
-            else:
-                lease_yeartwo = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'LeaseDueYearTwo'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = lease_yeartwo
-
-            # Year Three (Lease)
-            lease_yearthree = find_latest_tuple_by_string(company_main_list, ["LesseeOperatingLeaseLiabilityPaymentsDueYearThree"])
-            if lease_yearthree is not None:
-                lease_yearthree = lease_yearthree[1]
-            else:
-                lease_yearthree = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'LeaseDueYearThree'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = lease_yearthree
-
-            # Year Four (Lease)
-            lease_yearfour = find_latest_tuple_by_string(company_main_list, ["LesseeOperatingLeaseLiabilityPaymentsDueYearFour"])
-            if lease_yearfour is not None:
-                lease_yearfour = lease_yearfour[1]
-            else:
-                lease_yearfour = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'LeaseDueYearFour'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = lease_yearfour
-
-            # Year Five (Lease)
-            lease_yearfive = find_latest_tuple_by_string(company_main_list, ["LesseeOperatingLeaseLiabilityPaymentsDueYearFive"])
-            if lease_yearfive is not None:
-                lease_yearfive = lease_yearfive[1]
-            else:
-                lease_yearfive = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'LeaseDueYearFive'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = lease_yearfive
-
-            # Year After Five (Lease)
-            lease_afteryearfive = find_latest_tuple_by_string(company_main_list, ["LesseeOperatingLeaseLiabilityPaymentsDueAfterYearFive"])
-            if lease_afteryearfive is not None:
-                lease_afteryearfive = lease_afteryearfive[1]
-            else:
-                lease_afteryearfive = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'LeaseDueAfterYearFive'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = lease_afteryearfive
-
-
-            # Net Income Filling
-            netincome = find_latest_tuple_by_string(company_main_list, ["NetIncomeLoss", "ProfitLoss", "NetIncomeLossAvailableToCommonStockholdersBasic"])
-            if netincome is not None:
-                netincome = netincome[1]
-            else:
-                netincome = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'NetIncome'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = netincome
-
-            # Current Assets Filling
-            currentasset = find_latest_tuple_by_string(company_main_list, ["AssetsCurrent"])
-            if currentasset is not None:
-                currentasset = currentasset[1]
-            else:
-                currentasset = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'CurrentAssets'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = currentasset
-
-            # Current Liabilities Filling
-            currentliability = find_latest_tuple_by_string(company_main_list, ["LiabilitiesCurrent"])
-            if currentliability is not None:
-                currentliability = currentliability[1]
-            else:
-                currentliability = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'CurrentLiabilities'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = currentliability
-
-            # Total Liability Filling
-            totalliabilityplus_equitybv = find_latest_tuple_by_string(company_main_list, ["LiabilitiesAndStockholdersEquity"])
-            if totalliabilityplus_equitybv is not None:
-                totalliabilityplus_equitybv = totalliabilityplus_equitybv[1]
-            else:
-                totalliabilityplus_equitybv = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'TotalLiability'].index
-
-            if not row_index.empty:
-                # Ensure book_value_equity is available for this calculation, if not, use 0.0
-                equity_for_calc = book_value_equity if book_value_equity is not None else 0.0
-                initialized_financial_df.at[row_index[0], report_date_str] = totalliabilityplus_equitybv - equity_for_calc
-
-            # Total Assets Filling
-            totalassets = find_latest_tuple_by_string(company_main_list, ["Assets"])
-            if totalassets is not None:
-                totalassets = totalassets[1]
-            else:
-                totalassets = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'TotalAsset'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = totalassets
-
-            # Inventory Filling
-            inventory = find_latest_tuple_by_string(company_main_list, ["InventoryNet"])
-            if inventory is not None:
-                inventory = inventory[1]
-            else:
-                inventory = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'Inventory'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = inventory
-
-            # CostOfSales Filling
-            cogs = find_latest_tuple_by_string(company_main_list, ["CostOfRevenue", "CostOfGoodsAndServicesSold"])
-            if cogs is not None:
-                cogs = cogs[1]
-            else:
-                cogs = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'CostofSales'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = cogs
-
-            # GrossProfit Filling
-            grossprofit = find_latest_tuple_by_string(company_main_list, ["GrossProfit"])
-            if grossprofit is not None:
-                grossprofit = grossprofit[1]
-            else:
-                grossprofit = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'GrossProfit'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = grossprofit
-
-            # OperatingExpense Filling
-            operatingexpense = find_latest_tuple_by_string(company_main_list, ["CostsAndExpenses"])
-            if operatingexpense is not None:
-                operatingexpense = operatingexpense[1]
-            else:
-                operatingexpense = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'OperatingExpense'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = operatingexpense
-
-            # ResearchExpense Filling
-            researchexpense = find_latest_tuple_by_string(company_main_list, ["ResearchAndDevelopmentExpense"])
-            if researchexpense is not None:
-                researchexpense = researchexpense[1]
-            else:
-                researchexpense = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'ResearchExpense'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = researchexpense
-
-            # InterestExpense Filling
-            interestexpense = find_latest_tuple_by_string(company_main_list, ["InterestExpense", "InterestExpenseNonoperating", "InterestAndDebtExpense", "InterestIncomeExpenseNet"])
-            if interestexpense is not None:
-                interestexpense = interestexpense[1]
-            else:
-                interestexpense = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'Interest'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = interestexpense
-
-            # PPE-net Filling
-            ppenet = find_latest_tuple_by_string(company_main_list, ["PropertyPlantAndEquipmentNet"])
-            if ppenet is not None:
-                ppenet = ppenet[1]
-            else:
-                ppenet = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'PPEnet'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = ppenet
-
-            # Depreciation Filling
-            depreciation = find_latest_tuple_by_string(company_main_list, ["Depreciation", "DepreciationDepletionAndAmortization", "DepreciationAmortizationAndOther", "DepreciationAmortizationAndAccretionNet"])
-            if depreciation is not None:
-                depreciation = depreciation[1]
-            else:
-                depreciation = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'Depreciation'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = depreciation
-
-            # Amortization Filling
-            amortization = find_latest_tuple_by_string(company_main_list, ["AmortizationOfIntangibleAssets"])
-            if amortization is not None:
-                amortization = amortization[1]
-            else:
-                amortization = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'Amortization'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = amortization
-
-            # OperatingIncomeAfterINterestExpense Filling
-            incomeafterinterest = find_latest_tuple_by_string(company_main_list, ["IncomeLossFromContinuingOperationsBeforeIncomeTaxesMinorityInterestAndIncomeLossFromEquityMethodInvestments", "IncomeLossFromContinuingOperationsBeforeIncomeTaxesExtraordinaryItemsNoncontrollingInterest"])
-            if incomeafterinterest is not None:
-                incomeafterinterest = incomeafterinterest[1]
-            else:
-                incomeafterinterest = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'OperatingIncomeAfterInterest'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = incomeafterinterest
-
-            # MinorityInterest Filling
-            miniorityinterest = find_latest_tuple_by_string(company_main_list, ["MinorityInterest"])
-            if miniorityinterest is not None:
-                miniorityinterest = miniorityinterest[1]
-            else:
-                miniorityinterest = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'MinorityInterest'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = miniorityinterest
-
-            # EquityIncludingMinorityInterest Filling
-            equitywithminiorityinterest = find_latest_tuple_by_string(company_main_list, ["StockholdersEquityIncludingPortionAttributableToNoncontrollingInterest"])
-            if equitywithminiorityinterest is not None:
-                equitywithminiorityinterest = equitywithminiorityinterest[1]
-            else:
-                equitywithminiorityinterest = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'EquityIncludingMinorityInterest'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = equitywithminiorityinterest
-
-            # InterestIncome Filling
-            interestincome = find_latest_tuple_by_string(company_main_list, ["InvestmentIncomeInterest"])
-            if interestincome is not None:
-                interestincome = interestincome[1]
-            else:
-                interestincome = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'InterestIncome'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = interestincome
-
-    print(initialized_financial_df)
-    return initialized_financial_df
\ No newline at end of file
+    return build_financial_frame(final_facts_for_processing, ticker, stats,
+                                 lambda report_date, concepts: facts_source)
\ No newline at end of file
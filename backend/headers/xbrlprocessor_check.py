@@ -1,18 +1,23 @@
 import requests
 import pandas as pd
 import os
-import sys
 from tqdm import tqdm
 import logging
 from xbrl.cache import HttpCache
-from xbrl.instance import XbrlParser, XbrlInstance
+from xbrl.instance import XbrlParser
 import json
-import re
 from datetime import datetime, timedelta
 from urllib.parse import urlencode
 import time
 
-from .s3_utils import write_json_to_s3, read_json_from_s3
+from .ticker_index import ticker_index
+from .sec_client import sec_client
+from .concept_map import financial_extractor
+from .parallel_parse import parse_filings, print_parse_timings, resolve_parse_workers
+from .financial_frame import FinancialMatrix
+from .fact_cache import FactCache
+from .taxonomy_bundle import load_taxonomy_bundle
+from .taxonomy_memo import install_taxonomy_memo
 
 # Suppress InsecureRequestWarning
 import urllib3
@@ -32,101 +37,36 @@ logging.info(f"XBRL cache directory set to: {xbrl_cache_dir}")
 
 cache: HttpCache = HttpCache(xbrl_cache_dir, verify_https=False) # Keep verify=False here for SEC connections
 cache.set_headers({'User-Agent': USER_AGENT})
+# Download filings through the shared rate-limited SEC client instead of py-xbrl's fixed 500ms delay
+sec_client.attach_to_cache(cache)
 
-'''
-# --- ADD THIS SECTION FOR TAXONOMY CATALOG MAPPING ---
-cyd_namespace = "http://xbrl.sec.gov/cyd/2024"
-# Assuming you extracted the cyd-2024.zip into xbrl_caches/cyd/2024/
-cyd_local_path = os.path.join(xbrl_cache_dir, "cyd", "2024", "cyd-2024.xsd") 
-
-# Check if the local file exists before adding to catalog (optional, but good for debugging)
-if os.path.exists(cyd_local_path):
-    logging.info(f"Adding XBRL taxonomy catalog entry: {cyd_namespace} -> {cyd_local_path}")
-    cache.add_catalog_entry(cyd_namespace, cyd_local_path)
-else:
-    logging.warning(f"Local CYD 2024 taxonomy not found at {cyd_local_path}. "
-                    "XBRL parser will try to fetch it from the internet, which might cause errors.")
-    # As a fallback, if you want it to always try the online version first, 
-    # you could explicitly add it here, though the cache handles this by default.
-    # cache.add_catalog_entry(cyd_namespace, "https://xbrl.sec.gov/cyd/2024/cyd-2024.xsd")
-# --- END ADDITION ---
-'''
-parser = XbrlParser(cache)
-
-
-# ------------------ UTILITY FUNCTIONS ------------------------------- #
-
-def create_initialized_financial_dataframe_by_date(all_extracted_facts_dict):
-    # ... (no change, already in your code) ...
-    financial_accounting_variables = [
-        'Revenue', 'CostofSales', 'GrossProfit', 'OperatingExpense', 'ResearchExpense', 'Depreciation', 'Amortization', 'OperatingIncome', 'Interest', 'Tax', 'NetIncome',
-        'TotalAsset', 'CurrentAssets', 'Inventory', 'PPEnet', 'Equity(BV)', 'ShortTermDebt(BV)', 'LongTermDebt(BV)', 'Debt(BV)', 'CurrentLiabilities', 'TotalLiability', 
-        'LongTermDebtWithoutLease(BV)', 'LongTermLease(BV)', 'LeaseDueThisYear', 'LeaseDueYearOne', 'LeaseDueYearTwo', 'LeaseDueYearThree', 'LeaseDueYearFour', 
-        'LeaseDueYearFive', 'LeaseDueAfterYearFive', 'Cash'
-    ]
+# Seed the cache with the pre-built taxonomy bundle (us-gaap, dei, srt, cyd...) and its namespace catalog
+load_taxonomy_bundle(cache)
+# Share parsed taxonomy schemas between all the filings parsed by this process
+install_taxonomy_memo()
 
-    sorted_report_dates = sorted(all_extracted_facts_dict.keys())
-    date_columns = [date.strftime('%Y-%m-%d') for date in sorted_report_dates]
-
-    columns = ["Accounting Variable"] + date_columns
-
-    new_df = pd.DataFrame(columns=columns)
-
-    for var in financial_accounting_variables:
-        row_data = {"Accounting Variable": var}
-        for col_date_str in date_columns:
-            row_data[col_date_str] = 0
-        new_df = pd.concat([new_df, pd.DataFrame([row_data])], ignore_index=True)
+parser = XbrlParser(cache)
 
-    return new_df
+# Facts already extracted from each filing, by accession number (local disk and S3)
+fact_cache = FactCache(os.path.join(xbrl_cache_dir, "facts"))
 
-def find_latest_tuple_by_string(data_list, search_string_list):
-    # ... (no change, already in your code) ...
-    search_string = None
 
-    for search_element in search_string_list:
-        for main_tuple in data_list:
-            if search_element == main_tuple[0]:
-                search_string = search_element
-                break
-        if search_string:
-                break
+# ------------------ UTILITY FUNCTIONS ------------------------------- #
 
-    latest_tuple = None
-    
-    for current_tuple in data_list:
-        str_value, num_value, dt_object = current_tuple
-
-        if str_value == search_string:
-            if latest_tuple is None:
-                latest_tuple = current_tuple
-            else:
-                _, _, latest_dt_object = latest_tuple 
-                if dt_object > latest_dt_object:
-                    latest_tuple = current_tuple
-                    
-    return latest_tuple
+def create_initialized_financial_matrix_by_date(all_extracted_facts_dict):
+    # One zero-filled float64 block for all variables and report dates, filled in place
+    return FinancialMatrix(financial_extractor.variables, all_extracted_facts_dict.keys())
 
 def get_company_cik(ticker):
     """
-    Fetches the CIK for a given stock ticker from SEC's public mapping.
+    Returns the CIK for a given stock ticker from the shared, locally cached SEC ticker index.
     """
-    url = "https://www.sec.gov/files/company_tickers.json"
-    headers = {'User-Agent': USER_AGENT}
     try:
-        response = requests.get(url, headers=headers, verify=False)
-        response.raise_for_status() # Raise an exception for HTTP errors
-        tickers_data = response.json()
-        
-        for company_info in tickers_data.values():
-            if company_info['ticker'] == ticker.upper():
-                # CIKs are typically 10 digits and might be padded with leading zeros
-                return str(company_info['cik_str']).zfill(10)
-        return None
-    except requests.exceptions.RequestException as e:
+        return ticker_index.lookup(ticker)
+    except (requests.exceptions.RequestException, ValueError) as e:
         print(f"Error fetching CIK for {ticker}: {e}")
         return None
-    
+
 
 def fetch_historical_10k_filings_api_get(cik, company_name):
     """
@@ -169,7 +109,7 @@ def fetch_historical_10k_filings_api_get(cik, company_name):
 
     try:
         # Send a GET request with the full parameterized URL
-        response = requests.get(search_url_with_filters, headers=headers, verify=False)
+        response = sec_client.get(search_url_with_filters, headers=headers)
         response.raise_for_status() # Raise an exception for HTTP errors
         search_results = response.json()
 
@@ -231,9 +171,6 @@ def fetch_historical_10k_filings_api_get(cik, company_name):
                 })
         
         print(f"  Fetched {len(filings_in_batch)} filings in this batch. Total collected: {len(all_filings_data)}")
-        
-        # A small sleep after the single request to be polite
-        time.sleep(0.5) 
 
     except requests.exceptions.HTTPError as e:
         print(f"  HTTP Error fetching data for CIK {cik} ({company_name}): {e}")
@@ -252,9 +189,25 @@ def fetch_historical_10k_filings_api_get(cik, company_name):
     return pd.DataFrame(all_filings_data)
 
 # ------------ MAIN DATA PROCESSING FUNCTION ------------------------#
-def xbrl_data_processor(trailing_data, ticker, cik_original, s3_bucket_name=None):
+def xbrl_data_processor(trailing_data, ticker, cik_original, s3_bucket_name=None, progress_callback=None,
+                        parse_workers=None, report_dates=None):
+    """
+    Parses the company's recent 10-K XBRL instances and builds the financial DataFrame.
+    If report_dates (a set of datetime.date) is given, only the filings of those report dates
+    are processed, e.g. the ones missing from the stored dataset (see company_ingestion).
+    If given, progress_callback(accession_number, reporting_date, status, detail=None) is
+    called as each filing moves through 'pending', 'processing', 'done' or 'failed'.
+    parse_workers (an int or 'auto', default XBRL_PARSE_WORKERS) sets how many processes
+    parse the instances in parallel; see parallel_parse.parse_filings.
+    """
+    def report_progress(row, status, detail=None):
+        if progress_callback is not None:
+            progress_callback(row.get('accession_number'), row.get('reporting_date'), status, detail)
+
     # Call the GET API function which now fetches only the first page with max 10 rows
     df_filings = fetch_historical_10k_filings_api_get(cik_original,ticker) 
+    if report_dates is not None and not df_filings.empty:
+        df_filings = df_filings[df_filings['reporting_date'].isin(report_dates)].copy()
 
     if not df_filings.empty:
         print(f"  SUCCESS: Fetched {len(df_filings)} historical 10-K filings for {ticker} in the last 5 years.")
@@ -266,117 +219,64 @@ def xbrl_data_processor(trailing_data, ticker, cik_original, s3_bucket_name=None
 
     df = df_filings
 
-    df['s3_json_key'] = None
+    df['facts_extracted'] = None
+    df['parse_seconds'] = None
+    extracted_by_row = {}
+
+    for _, row in df.iterrows():
+        report_progress(row, 'pending')
 
-    loop_break_flag = False
-    # Iterate over each row in the DataFrame
+    filings = []
     for index, row in df.iterrows():
-        time.sleep(1)
         schema_url = row['report_link'] # this is now guaranteed to be a working link (or skipped)
 
         if schema_url is None: # Double check, though the filter above should handle it
             logging.warning(f"Skipping row {index} as no working EDGAR link was found.")
-            df.at[index, 's3_json_key'] = "ERROR: No working EDGAR link"
+            df.at[index, 'facts_extracted'] = "ERROR: No working EDGAR link"
+            report_progress(row, 'failed', "No working EDGAR link")
+            continue
+        filings.append((index, schema_url, row['accession_number']))
+
+    workers = resolve_parse_workers(len(filings), parse_workers)
+    logging.info(f"Parsing {len(filings)} XBRL instances with {workers} worker(s)")
+    for index, _, _ in filings:
+        report_progress(df.loc[index], 'processing')
+
+    timings = []
+    parse_started = time.perf_counter()
+    # Only the non-dimensional numeric facts of the mapped concepts are sent back from the parser
+    for index, result in parse_filings(filings, financial_extractor.concepts, parser, cache, workers,
+                                       fact_cache=fact_cache):
+        row = df.loc[index]
+        if isinstance(result, Exception):
+            logging.error(f"Error processing {row['report_link']}: {result}")
+            df.at[index, 'facts_extracted'] = f"ERROR: {result}"
+            report_progress(row, 'failed', str(result))
             continue
 
-        try:
-            logging.info(f"Processing XBRL instance from: {schema_url}")
-            inst: XbrlInstance = parser.parse_instance(schema_url)
-
-            match = re.search(r'/([^/]+)\.htm$', schema_url)
-            if match:
-                base_filename = match.group(1)
-            else:
-                base_filename = f"unknown_file_{index}"
-                logging.warning(f"Could not extract base filename from URL: {schema_url}. Using '{base_filename}'.")
-
-            s3_key = f"xbrl_json_data/{base_filename}.json" 
-
-            xbrl_json_data = inst.json()
-            data_dict = json.loads(xbrl_json_data)
-
-            write_json_to_s3(
-                data=data_dict,
-                file_key=s3_key,
-                bucket_name=s3_bucket_name
-            )
-            logging.info(f"Successfully uploaded XBRL JSON to s3://{s3_bucket_name}/{s3_key}")
-
-            df.at[index, 's3_json_key'] = s3_key
-
-        except Exception as e:
-            logging.error(f"Error processing and uploading {schema_url}: {e}")
-            df.at[index, 's3_json_key'] = f"ERROR: {e}"
-            if str(e) == "The taxonomy with namespace http://xbrl.sec.gov/cyd/2024 could not be found. Please check if it is imported in the schema file": 
-                print("Ending loop now")
-                loop_break_flag = True
-                break
-
-    if loop_break_flag:
-        print("Exiting")
-        sys.exit()
-
-    print(f"\nAll XBRL instances processed. JSON files are uploaded to S3.")
-    print("\nUpdated DataFrame with S3 JSON keys:")
-    print(df)
+        extracted_by_row[index] = result['facts']
+        timings.append((row['reporting_date'], result))
+        logging.info(f"Extracted {len(result['facts'])} of {result['fact_count']} facts from {row['report_link']}")
+        df.at[index, 'facts_extracted'] = len(result['facts'])
+        df.at[index, 'parse_seconds'] = round(result['parse_seconds'], 2)
+        report_progress(row, 'done', "loaded from the fact cache" if result['reader'] == 'cache'
+                        else f"parsed in {result['parse_seconds']:.1f}s")
 
-    all_extracted_facts = {}
+    if timings:
+        timings.sort(key=lambda item: item[0])
+        print_parse_timings(timings, time.perf_counter() - parse_started, workers)
 
-    logging.info("--- Extracting facts from S3-backed JSON files ---")
-    for index, row in df.iterrows():
-        company_main_list = []
-        current_s3_json_key = row['s3_json_key'] 
-        report_date = row['reporting_date']
-
-        if not current_s3_json_key or "ERROR" in current_s3_json_key:
-            logging.warning(f"Skipping row {index} due to invalid JSON filepath: {current_s3_json_key}")
-            continue
+    # Merge in report date order, independent of the order the parsers finished in
+    all_extracted_facts = {}
+    for index in sorted(extracted_by_row, key=lambda index: (df.at[index, 'reporting_date'], index)):
+        all_extracted_facts[df.at[index, 'reporting_date']] = extracted_by_row[index]
 
-        try:
-            data = read_json_from_s3(file_key=current_s3_json_key, bucket_name=s3_bucket_name)
-
-            if "facts" not in data:
-                logging.warning(f"No 'facts' key found in JSON file: {current_s3_json_key}")
-                continue
-
-            for fact_key, fact_data in data["facts"].items():
-                if ("dimensions" in fact_data and "concept" in fact_data["dimensions"] and
-                        "period" in fact_data["dimensions"] and "value" in fact_data):
-                    
-                    if len(fact_data["dimensions"]) != 5:
-                        continue
-
-                    concept_value = fact_data["dimensions"]["concept"]
-                    period_value = fact_data["dimensions"]["period"]
-                    actual_value = fact_data["value"]
-
-                    date_str = ""
-                    if '/' in period_value:
-                        parts = period_value.split('/')
-                        if len(parts) != 2:
-                            raise ValueError(f"Invalid range format for period '{period_value}' in '{current_s3_json_key}'. Expected 'start/end'.")
-                        date_str = parts[1]
-                    else:
-                        date_str = period_value
-                
-                    try:
-                        period_datetime = datetime.fromisoformat(date_str)
-                    except ValueError as ve:
-                        logging.warning(f"Could not parse date '{date_str}' from '{current_s3_json_key}' for concept '{concept_value}': {ve}. Skipping this fact.")
-                        continue
-
-                    company_main_list.append((concept_value, actual_value, datetime.fromisoformat(date_str)))
-            all_extracted_facts[report_date] = company_main_list
-
-        except FileNotFoundError:
-            logging.error(f"JSON file not found: {current_s3_json_key}. Skipping.")
-        except json.JSONDecodeError as e:
-            logging.error(f"Error decoding JSON from file: {current_s3_json_key}: {e}. Skipping.")
-        except Exception as e:
-            logging.error(f"An unexpected error occurred while processing {current_s3_json_key}: {e}. Skipping.")
+    print(f"\nAll XBRL instances processed.")
+    print("\nUpdated DataFrame with extracted fact counts:")
+    print(df)
 
     print(f"\n--- Fact Extraction Complete ---")
-    print(f"Total facts extracted from all JSON files: {len(all_extracted_facts)}")
+    print(f"Total facts extracted from all XBRL instances: {len(all_extracted_facts)}")
 
     keys_view = all_extracted_facts.keys()
     #print(f"Using .keys(): {keys_view}")
@@ -384,7 +284,7 @@ def xbrl_data_processor(trailing_data, ticker, cik_original, s3_bucket_name=None
 
 # ----------- Creating Financial Company Database --------------# 
 
-    initialized_financial_df = create_initialized_financial_dataframe_by_date(all_extracted_facts)
+    financial_matrix = create_initialized_financial_matrix_by_date(all_extracted_facts)
 
     #print("\nNew Initialized Financial DataFrame:")
     #print(initialized_financial_df)
@@ -394,342 +294,11 @@ def xbrl_data_processor(trailing_data, ticker, cik_original, s3_bucket_name=None
     for report_date_dt, company_main_list in all_extracted_facts.items():
         report_date_str = report_date_dt.strftime('%Y-%m-%d')
 
-        if report_date_str in initialized_financial_df.columns:
-            # Revenue Filling 
-            revenue = find_latest_tuple_by_string(company_main_list, ["Revenues", "RevenueFromContractWithCustomerExcludingAssessedTax"])
-            if revenue is not None:
-               revenue = find_latest_tuple_by_string(company_main_list, ["Revenues", "RevenueFromContractWithCustomerExcludingAssessedTax"])[1]
-            else:
-                revenue = 0.0 
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'Revenue'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = revenue
-            
-            # Operating Income Filling 
-            operating_income = find_latest_tuple_by_string(company_main_list, ["OperatingIncomeLoss"])
-            if operating_income is not None:
-                operating_income = find_latest_tuple_by_string(company_main_list, ["OperatingIncomeLoss"])[1]
-            else:
-                operating_income = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'OperatingIncome'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = operating_income
-
-            # Equity(Book Value) Filling 
-            book_value_equity = find_latest_tuple_by_string(company_main_list, ["StockholdersEquity"])
-            if book_value_equity is not None:
-                book_value_equity = find_latest_tuple_by_string(company_main_list, ["StockholdersEquity"])[1]
-            else:
-                book_value_equity = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'Equity(BV)'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = book_value_equity
-
-            # ShortTermDebt(Book Value) Filling
-            book_value_shortterm_debt = find_latest_tuple_by_string(company_main_list, ["DebtCurrent"])
-            if book_value_shortterm_debt is not None:
-                book_value_shortterm_debt = find_latest_tuple_by_string(company_main_list, ["DebtCurrent"])[1]
-            else:
-                book_value_shortterm_debt = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'ShortTermDebt(BV)'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = book_value_shortterm_debt
-
-            # LongTermDebt without lease (Book Value) Filling
-            book_value_longtermdebt_withoutlease = find_latest_tuple_by_string(company_main_list, ["LongTermDebtNoncurrent"])
-            if book_value_longtermdebt_withoutlease is not None:
-                book_value_longtermdebt_withoutlease = find_latest_tuple_by_string(company_main_list, ["LongTermDebtNoncurrent"])[1]
-            else:
-                book_value_longtermdebt_withoutlease = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'LongTermDebtWithoutLease(BV)'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = book_value_longtermdebt_withoutlease
-
-            # LongTermLease(Book Value) Filling
-            book_value_longterm_lease = find_latest_tuple_by_string(company_main_list, ["LongTermLeaseLiabilityNoncurrentNet"])
-            if book_value_longterm_lease is not None:
-                book_value_longterm_lease = find_latest_tuple_by_string(company_main_list, ["LongTermLeaseLiabilityNoncurrentNet"])[1]
-            else:
-                book_value_longterm_lease = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'LongTermLease(BV)'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = book_value_longterm_lease
-
-            # LongTerm Debt(BV) Filling
-            book_value_longtermdebt = book_value_longtermdebt_withoutlease + book_value_longterm_lease
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'LongTermDebt(BV)'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = book_value_longtermdebt
-
-            # Debt(BV) Filling
-            book_value_debt = book_value_longtermdebt + book_value_shortterm_debt
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'Debt(BV)'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = book_value_debt
-
-            # Cash Filling
-            cash = find_latest_tuple_by_string(company_main_list, ["CashAndCashEquivalentsAtCarryingValue"])
-            if cash is not None:
-                cash = find_latest_tuple_by_string(company_main_list, ["CashAndCashEquivalentsAtCarryingValue"])[1]
-            else:
-                cash = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'Cash'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = cash
-
-            # Tax Filling
-            tax = find_latest_tuple_by_string(company_main_list, ["IncomeTaxExpenseBenefit"])
-            if tax is not None:
-                tax = find_latest_tuple_by_string(company_main_list, ["IncomeTaxExpenseBenefit"])[1]
-            else:
-                tax = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'Tax'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = tax
-
-            # Lease Values
-            # This Year
-            lease_thisyear = find_latest_tuple_by_string(company_main_list, ["CurrentLeaseLiabilityNet"])
-            if lease_thisyear is not None:
-                lease_thisyear = find_latest_tuple_by_string(company_main_list, ["CurrentLeaseLiabilityNet"])[1]
-            else:
-                lease_thisyear = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'LeaseDueThisYear'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = lease_thisyear
-
-            # Year One (Lease)
-            lease_yearone = find_latest_tuple_by_string(company_main_list, ["LesseeOperatingLeaseLiabilityPaymentsDueNextTwelveMonths"])
-            if lease_yearone is not None:
-                lease_yearone = find_latest_tuple_by_string(company_main_list, ["LesseeOperatingLeaseLiabilityPaymentsDueNextTwelveMonths"])[1]
-            else:
-                lease_yearone = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'LeaseDueYearOne'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = lease_yearone
-
-            # Year Two (Lease)
-            lease_yeartwo = find_latest_tuple_by_string(company_main_list, ["LesseeOperatingLeaseLiabilityPaymentsDueYearTwo"])
-            if lease_yeartwo is not None:
-                lease_yeartwo = find_latest_tuple_by_string(company_main_list, ["LesseeOperatingLeaseLiabilityPaymentsDueYearTwo"])[1]
-            else:
-                lease_yeartwo = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'LeaseDueYearTwo'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = lease_yeartwo
-
-            # Year Three (Lease)
-            lease_yearthree = find_latest_tuple_by_string(company_main_list, ["LesseeOperatingLeaseLiabilityPaymentsDueYearThree"])
-            if lease_yearthree is not None:
-                lease_yearthree = find_latest_tuple_by_string(company_main_list, ["LesseeOperatingLeaseLiabilityPaymentsDueYearThree"])[1]
-            else:
-                lease_yearthree = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'LeaseDueYearThree'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = lease_yearthree
-
-            # Year Four (Lease)
-            lease_yearfour = find_latest_tuple_by_string(company_main_list, ["LesseeOperatingLeaseLiabilityPaymentsDueYearFour"])
-            if lease_yearfour is not None:
-                lease_yearfour = find_latest_tuple_by_string(company_main_list, ["LesseeOperatingLeaseLiabilityPaymentsDueYearFour"])[1]
-            else:
-                lease_yearfour = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'LeaseDueYearFour'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = lease_yearfour
-
-            # Year Five (Lease)
-            lease_yearfive = find_latest_tuple_by_string(company_main_list, ["LesseeOperatingLeaseLiabilityPaymentsDueYearFive"])
-            if lease_yearfive is not None:
-                lease_yearfive = find_latest_tuple_by_string(company_main_list, ["LesseeOperatingLeaseLiabilityPaymentsDueYearFive"])[1]
-            else:
-                lease_yearfive = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'LeaseDueYearFive'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = lease_yearfive
-
-            # Year After Five (Lease)
-            lease_afteryearfive = find_latest_tuple_by_string(company_main_list, ["LesseeOperatingLeaseLiabilityPaymentsDueAfterYearFive"])
-            if lease_afteryearfive is not None:
-                lease_afteryearfive = find_latest_tuple_by_string(company_main_list, ["LesseeOperatingLeaseLiabilityPaymentsDueAfterYearFive"])[1]
-            else:
-                lease_afteryearfive = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'LeaseDueAfterYearFive'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = lease_afteryearfive
-
-
-            # Net Income Filling
-            netincome = find_latest_tuple_by_string(company_main_list, ["NetIncomeLoss"])
-            if netincome is not None:
-                netincome = find_latest_tuple_by_string(company_main_list, ["NetIncomeLoss"])[1]
-            else:
-                netincome = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'NetIncome'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = netincome
-
-            # Current Assets Filling
-            currentasset = find_latest_tuple_by_string(company_main_list, ["AssetsCurrent"])
-            if currentasset is not None:
-                currentasset = find_latest_tuple_by_string(company_main_list, ["AssetsCurrent"])[1]
-            else:
-                currentasset = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'CurrentAssets'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = currentasset
-
-            # Current Liabilities Filling
-            currentliability = find_latest_tuple_by_string(company_main_list, ["LiabilitiesCurrent"])
-            if currentliability is not None:
-                currentliability = find_latest_tuple_by_string(company_main_list, ["LiabilitiesCurrent"])[1]
-            else:
-                currentliability = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'CurrentLiabilities'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = currentliability
-
-            # Total Liability Filling
-            totalliabilityplus_equitybv = find_latest_tuple_by_string(company_main_list, ["LiabilitiesAndStockholdersEquity"])
-            if totalliabilityplus_equitybv is not None:
-                totalliabilityplus_equitybv = find_latest_tuple_by_string(company_main_list, ["LiabilitiesAndStockholdersEquity"])[1]
-            else:
-                totalliabilityplus_equitybv = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'TotalLiability'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = totalliabilityplus_equitybv - book_value_equity
-
-            # Total Assets Filling
-            totalassets = find_latest_tuple_by_string(company_main_list, ["Assets"])
-            if totalassets is not None:
-                totalassets = find_latest_tuple_by_string(company_main_list, ["Assets"])[1]
-            else:
-                totalassets = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'TotalAsset'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = totalassets
-
-            # Inventory Filling
-            inventory = find_latest_tuple_by_string(company_main_list, ["InventoryNet"])
-            if inventory is not None:
-                inventory = find_latest_tuple_by_string(company_main_list, ["InventoryNet"])[1]
-            else:
-                inventory = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'Inventory'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = inventory
-
-            # CostOfSales Filling
-            cogs = find_latest_tuple_by_string(company_main_list, ["CostOfRevenue", "CostOfGoodsAndServicesSold"])
-            if cogs is not None:
-                cogs = find_latest_tuple_by_string(company_main_list, ["CostOfRevenue", "CostOfGoodsAndServicesSold"])[1]
-            else:
-                cogs = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'CostofSales'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = cogs
-
-            # GrossProfit Filling
-            grossprofit = find_latest_tuple_by_string(company_main_list, ["GrossProfit"])
-            if grossprofit is not None:
-                grossprofit = find_latest_tuple_by_string(company_main_list, ["GrossProfit"])[1]
-            else:
-                grossprofit = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'GrossProfit'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = grossprofit
-
-            # OperatingExpense Filling
-            operatingexpense = find_latest_tuple_by_string(company_main_list, ["CostsAndExpenses"])
-            if operatingexpense is not None:
-                operatingexpense = find_latest_tuple_by_string(company_main_list, ["CostsAndExpenses"])[1]
-            else:
-                operatingexpense = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'OperatingExpense'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = operatingexpense
-
-            # ResearchExpense Filling
-            researchexpense = find_latest_tuple_by_string(company_main_list, ["ResearchAndDevelopmentExpense"])
-            if researchexpense is not None:
-                researchexpense = find_latest_tuple_by_string(company_main_list, ["ResearchAndDevelopmentExpense"])[1]
-            else:
-                researchexpense = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'ResearchExpense'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = researchexpense
-
-            # InterestExpense Filling
-            interestexpense = find_latest_tuple_by_string(company_main_list, ["InterestExpense"])
-            if interestexpense is not None:
-                interestexpense = find_latest_tuple_by_string(company_main_list, ["InterestExpense"])[1]
-            else:
-                interestexpense = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'Interest'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = interestexpense
-
-            # PPE-net Filling
-            ppenet = find_latest_tuple_by_string(company_main_list, ["PropertyPlantAndEquipmentNet"])
-            if ppenet is not None:
-                ppenet = find_latest_tuple_by_string(company_main_list, ["PropertyPlantAndEquipmentNet"])[1]
-            else:
-                ppenet = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'PPEnet'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = ppenet
-
-            # Depreciation Filling
-            depreciation = find_latest_tuple_by_string(company_main_list, ["Depreciation", "DepreciationDepletionAndAmortization", "DepreciationAmortizationAndOther", "DepreciationAmortizationAndAccretionNet"])
-            if depreciation is not None:
-                depreciation = find_latest_tuple_by_string(company_main_list, ["Depreciation", "DepreciationDepletionAndAmortization", "DepreciationAmortizationAndOther", "DepreciationAmortizationAndAccretionNet"])[1]
-            else:
-                ppenet = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'Depreciation'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = depreciation
-            
-            # Amortization Filling
-            amortization = find_latest_tuple_by_string(company_main_list, ["AmortizationOfIntangibleAssets"])
-            if amortization is not None:
-                amortization = find_latest_tuple_by_string(company_main_list, ["AmortizationOfIntangibleAssets"])[1]
-            else:
-                amortization = 0.0
-            row_index = initialized_financial_df[initialized_financial_df['Accounting Variable'] == 'Amortization'].index
-
-            if not row_index.empty:
-                initialized_financial_df.at[row_index[0], report_date_str] = amortization
+        if financial_matrix.has_date(report_date_str):
+            # One pass over the facts, then the derived variables in dependency order
+            financial_extractor.fill(financial_matrix, report_date_str, company_main_list)
 
+    initialized_financial_df = financial_matrix.to_frame()
     print(initialized_financial_df)
     return initialized_financial_df
     #initialized_financial_df.to_csv('company_data.csv', index=False)
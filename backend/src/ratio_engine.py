@@ -0,0 +1,152 @@
+import warnings
+from itertools import compress
+
+import numpy as np
+import pandas as pd
+
+
+def extract_rows(df, row_names):
+    """
+    Pulls the given 'Accounting Variable' rows out of a company frame as float arrays.
+
+    Returns (dates, rows) where dates is the sorted list of date columns and rows maps
+    each requested row name found in the frame to a float64 array aligned with dates
+    (non-numeric cells become NaN). Missing rows are simply absent from rows.
+    """
+    labels = df['Accounting Variable'].to_numpy()
+    date_columns = sorted(
+        (column, position) for position, column in enumerate(df.columns) if column != 'Accounting Variable'
+    )
+    dates = [column for column, _ in date_columns]
+
+    found_names = []
+    positions = []
+    for name in dict.fromkeys(row_names):
+        matches = np.flatnonzero(labels == name)
+        if matches.size:
+            found_names.append(name)
+            positions.append(matches[0])  # first occurrence wins, as with .iloc[0]
+    if not positions:
+        return dates, {}
+
+    # A single positional take of the needed rows, with columns in date order
+    block = df.iloc[positions, [position for _, position in date_columns]]
+    if all(pd.api.types.is_numeric_dtype(dtype) for dtype in block.dtypes):
+        values = block.to_numpy(dtype=float)
+    else:
+        values = block.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+
+    return dates, dict(zip(found_names, values))
+
+
+def masked_ratio(numerator, denominator, scale=1.0):
+    """
+    Element-wise numerator / denominator * scale.
+
+    Returns (emitted, ratio): emitted marks the periods where both inputs are numeric,
+    and ratio is 0.0 wherever the denominator is zero.
+    """
+    emitted = ~(np.isnan(numerator) | np.isnan(denominator))
+    ratio = np.zeros_like(numerator)
+    np.divide(numerator, denominator, out=ratio, where=emitted & (denominator != 0))
+    if scale != 1.0:
+        ratio *= scale
+    return emitted, ratio
+
+
+def shifted_denominator_ratio(numerator, denominator, mode):
+    """
+    Element-wise ratio against a denominator built from the previous period:
+    'average' divides by (previous + current) / 2, as the turnover ratios do,
+    'lag' divides by the previous period's value. The first period has no previous
+    value and is never emitted.
+
+    Returns (emitted, ratio) with the same conventions as masked_ratio.
+    """
+    emitted = ~(np.isnan(numerator) | np.isnan(denominator))
+    emitted[:1] = False
+
+    divisor = np.full_like(denominator, np.nan)
+    if mode == 'average':
+        divisor[1:] = (denominator[:-1] + denominator[1:]) / 2
+    elif mode == 'lag':
+        divisor[1:] = denominator[:-1]
+    else:
+        raise ValueError(f"Unknown denominator mode '{mode}'")
+
+    ratio = np.zeros_like(numerator)
+    np.divide(numerator, divisor, out=ratio, where=emitted & (divisor != 0))
+    return emitted, ratio
+
+
+def summarize(values):
+    """
+    Mean and sample standard deviation of the emitted ratio values, skipping NaN.
+    Mirrors the previous pd.Series(...).mean()/.std() behaviour, including the
+    integer 0 returned for empty or single-value series.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        average = np.nanmean(values) if values.size else 0
+        std_dev = np.nanstd(values, ddof=1) if values.size > 1 else 0
+    return average, std_dev
+
+
+def ratio_payload(metric_name, dates, emitted, ratio):
+    """
+    Builds the success payload shared by every ratio endpoint.
+    """
+    values = ratio[emitted]
+    average, std_dev = summarize(values)
+    graph_data = [
+        {'date': date, 'value': value}
+        for date, value in zip(compress(dates, emitted), values.tolist())
+    ]
+    return {
+        "status": "success",
+        "data": {
+            "metric_name": metric_name,
+            "graph_data": graph_data,
+            "statistics": {
+                "average_margin": round(average, 2),
+                "std_dev_margin": round(std_dev, 2)
+            }
+        }
+    }
+
+
+def _evaluate(definition, dates, rows):
+    if definition.numerator not in rows or definition.denominator not in rows:
+        return {"status": "error", "message": definition.missing_message}, 404
+
+    numerator = rows[definition.numerator]
+    denominator = rows[definition.denominator]
+    if definition.denominator_mode:
+        emitted, ratio = shifted_denominator_ratio(numerator, denominator, definition.denominator_mode)
+        if definition.scale != 1.0:
+            ratio *= definition.scale
+    else:
+        emitted, ratio = masked_ratio(numerator, denominator, definition.scale)
+
+    return ratio_payload(definition.display_name, dates, emitted, ratio), 200
+
+
+def evaluate_ratio(df, definition):
+    """
+    Evaluates one RatioDefinition (see src/ratio_registry.py) against a company frame.
+
+    Returns (payload, status_code): the success payload with 200, or an error payload
+    with 404 if a row the ratio needs is missing from the frame.
+    """
+    dates, rows = extract_rows(df, [definition.numerator, definition.denominator])
+    return _evaluate(definition, dates, rows)
+
+
+def evaluate_ratios(df, definitions):
+    """
+    Evaluates several RatioDefinitions against a company frame, extracting every
+    needed row in a single pass. Returns {definition.name: (payload, status_code)}.
+    """
+    needed_rows = [row for definition in definitions for row in (definition.numerator, definition.denominator)]
+    dates, rows = extract_rows(df, needed_rows)
+    return {definition.name: _evaluate(definition, dates, rows) for definition in definitions}
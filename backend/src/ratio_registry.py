@@ -0,0 +1,63 @@
+from dataclasses import dataclass
+
+# Bump whenever a definition below changes, so cached ratio responses are invalidated
+RATIO_REGISTRY_VERSION = 2
+
+
+@dataclass(frozen=True)
+class RatioDefinition:
+    """
+    Declarative description of a ratio between two 'Accounting Variable' rows.
+
+    name:              URL slug used by the ratio routes.
+    display_name:      'metric_name' reported in the response payload.
+    numerator:         Accounting Variable row used as numerator.
+    denominator:       Accounting Variable row used as denominator.
+    scale:             Multiplier applied to the ratio (100 for percentages).
+    denominator_mode:  None to use the same period's denominator, 'average' for the mean of
+                       the previous and current period, 'lag' for the previous period only.
+    missing_message:   Error message returned when a needed row is not in the company data.
+    """
+    name: str
+    display_name: str
+    numerator: str
+    denominator: str
+    scale: float = 1.0
+    denominator_mode: str = None
+    missing_message: str = None
+
+
+RATIO_DEFINITIONS = [
+    # Profitability
+    RatioDefinition('net-margin', "Net Profit Margin", 'NetIncome', 'Revenue', scale=100,
+                    missing_message="NetIncome or Revenue data not found in company_data.csv."),
+    RatioDefinition('operating-margin', "Operating Margin", 'OperatingIncome', 'Revenue', scale=100,
+                    missing_message="OperatingIncome or Revenue data not found in company_data.csv."),
+    RatioDefinition('gross-margin', "Gross Margin", 'GrossProfit', 'Revenue', scale=100,
+                    missing_message="GrossProfit or Revenue data not found in company_data.csv."),
+    RatioDefinition('roa', "Return on Assets", 'NetIncome', 'TotalAsset', scale=100,
+                    missing_message="NetIncome or Total Asset data not found in company_data.csv."),
+    RatioDefinition('roe', "Return on Equity", 'NetIncome', 'Equity(BV)', scale=100,
+                    missing_message="NetIncome or Equity(BV) data not found in company_data.csv."),
+    # Liquidity
+    RatioDefinition('current-ratio', "Current Ratio", 'CurrentAssets', 'CurrentLiabilities',
+                    missing_message="CurrentAssets or CurrentLiabilities data not found in company_data.csv."),
+    RatioDefinition('cash-ratio', "Cash Ratio", 'Cash', 'CurrentLiabilities',
+                    missing_message="Cash or Current Liability data not found in company_data.csv."),
+    # Solvency
+    RatioDefinition('debtequity-ratio', "Debt Equity Ratio", 'TotalLiability', 'Equity(BV)',
+                    missing_message="Total Liability or Equity(BV) data not found in company_data.csv."),
+    RatioDefinition('debtasset-ratio', "Debt Asset Ratio", 'TotalLiability', 'TotalAsset',
+                    missing_message="Total Liability or Equity(BV) data not found in company_data.csv."),
+    RatioDefinition('interest-coverage', "Interest Coverage Ratio", 'OperatingIncome', 'Interest',
+                    missing_message="OperatingIncome or Interest data not found in company_data.csv."),
+    # Efficiency
+    RatioDefinition('inventoryturnover-ratio', "Inventory Turnover Ratio", 'Revenue', 'Inventory',
+                    denominator_mode='average',
+                    missing_message="Revenue or Inventory data not found in company_data.csv."),
+    RatioDefinition('assetturnover-ratio', "Asset Turnover Ratio", 'Revenue', 'TotalAsset',
+                    denominator_mode='average',
+                    missing_message="Revenue or Asset data not found in company_data.csv."),
+]
+
+RATIO_REGISTRY = {definition.name: definition for definition in RATIO_DEFINITIONS}
@@ -4,7 +4,6 @@ import pandas as pd
 from datetime import datetime
 import os
 import sys
-import time
 import argparse
 import logging
 
@@ -36,6 +35,9 @@ logger.addHandler(console_handler)
 try:
     from backend.headers.xbrlprocesscheck import xbrl_data_processor, get_company_cik, fetch_historical_10k_filings_api_get
     from backend.headers.s3_utils import read_csv_from_s3, write_df_to_csv_s3
+    from backend.headers.dataset_metadata import build_dataset_metadata, latest_stored_report_date, plan_incremental_update
+    from backend.headers.financial_frame import merge_report_columns
+    from backend.headers.concept_map import extended_financial_extractor
 except ImportError as e:
     logger.error(f"Error importing modules: {e}")
     logger.error("Please ensure your PYTHONPATH is configured correctly or that files are in expected locations.")
@@ -47,6 +49,8 @@ if not S3_BUCKET_NAME:
     raise ValueError("S3_BUCKET_NAME environment variable is not set.")
 
 S3_COMPANY_CSV_PREFIX = 'company-csv-data/'
+# Which extraction path (companyfacts / xbrl / missing) served each cell of a company CSV
+S3_PROVENANCE_PREFIX = 'company-provenance/'
 
 # REMOVE or comment out the original get_sec_tickers function as it will no longer be used.
 # def get_sec_tickers():
@@ -105,6 +109,7 @@ def get_company_info(ticker, update_all):
     Receives a company ticker, fetches EDGAR data, processes XBRL,
     saves it to S3, and returns a success message.
     Only processes data if new data is more recent than existing data or if no existing data.
+    Unless update_all is set, an existing dataset is updated with only the filings it lacks.
     """
     logger.info(f"Get company info received request for ticker: {ticker}")
 
@@ -131,15 +136,12 @@ def get_company_info(ticker, update_all):
         latest_stored_date = None
 
         try:
-            existing_df = read_csv_from_s3(file_key=s3_file_key, bucket_name=S3_BUCKET_NAME)
+            latest_stored_date = latest_stored_report_date(s3_file_key, bucket_name=S3_BUCKET_NAME)
 
-            date_columns = [col for col in existing_df.columns if col != 'Accounting Variable']
-
-            if date_columns:
-                latest_stored_date = pd.to_datetime(date_columns).max()
+            if latest_stored_date is not None:
                 logger.info(f"Latest stored report date for {ticker} in S3: {latest_stored_date}")
             else:
-                logger.info(f"No date columns found in existing S3 file {s3_file_key}. Will process new data.")
+                logger.info(f"No usable report date for existing S3 file {s3_file_key}. Will process new data.")
 
         except FileNotFoundError:
             logger.info(f"No existing data file found for {ticker} in S3: {s3_file_key}")
@@ -150,16 +152,38 @@ def get_company_info(ticker, update_all):
 
         if latest_stored_date is None or latest_fetched_date > latest_stored_date or update_all == True:
             logger.info("Newer data available or no existing data. Processing financial data...")
-            processed_financial_data = xbrl_data_processor(reportings_data, ticker, cik)
+            existing_df, report_dates = None, None
+            if latest_stored_date is not None and not update_all:
+                try:
+                    existing_df = read_csv_from_s3(file_key=s3_file_key, bucket_name=S3_BUCKET_NAME)
+                    report_dates = plan_incremental_update(existing_df, reportings_data, extended_financial_extractor.variables)
+                except Exception as e:
+                    logger.error(f"Could not load stored data of {ticker} for an incremental update: {e}. Rebuilding it.")
+                if report_dates is None:
+                    existing_df = None
+                else:
+                    logger.info(f"Incremental update of {ticker}: processing {len(report_dates)} new report date(s) "
+                                f"{sorted(str(date) for date in report_dates)}")
+
+            processed_financial_data = xbrl_data_processor(reportings_data, ticker, cik, report_dates=report_dates)
 
             if processed_financial_data.empty:
                 logger.info(f"No financial data processed for {ticker}. Skipping S3 write.")
                 return
 
+            extraction = processed_financial_data.attrs.get('extraction')
+            if existing_df is not None:
+                processed_financial_data = merge_report_columns(
+                    existing_df, processed_financial_data, reportings_data['reporting_date'].dropna()
+                )
+
             logger.info(f"Processed financial data for {ticker}:\n{processed_financial_data.head()}")
 
-            write_df_to_csv_s3(processed_financial_data, file_key=s3_file_key, bucket_name=S3_BUCKET_NAME)
+            write_df_to_csv_s3(processed_financial_data, file_key=s3_file_key, bucket_name=S3_BUCKET_NAME,
+                               metadata=build_dataset_metadata(processed_financial_data, reportings_data))
             logger.info(f"Data for {ticker} saved to s3://{S3_BUCKET_NAME}/{s3_file_key}")
+            save_extraction_provenance(ticker, extraction,
+                                       reportings_data['reporting_date'].dropna() if existing_df is not None else None)
 
             message = "Company's Latest Financial data obtained and saved to S3!"
             if latest_stored_date is None:
@@ -179,6 +203,36 @@ def get_company_info(ticker, update_all):
         logger.error(f"Unexpected error in get_company_info: {e}")
         sys.exit(1)
 
+def save_extraction_provenance(ticker, extraction, report_dates=None):
+    """
+    Logs the request/parse counts of an extraction (df.attrs['extraction'] of
+    xbrl_data_processor) and saves its per-cell provenance to <S3_PROVENANCE_PREFIX><ticker>.csv,
+    laid out like the company CSV. After an incremental update, the stored provenance of the
+    other `report_dates` is kept.
+    """
+    if not extraction:
+        return
+    logger.info(f"Extraction for {ticker} ({extraction['strategy']}): {extraction['filings']} filings, "
+                f"{extraction['companyfacts_requests']} companyfacts request(s), "
+                f"{extraction['xbrl_parsed']} XBRL instance(s) parsed in {extraction['parse_seconds']:.2f}s, "
+                f"{extraction.get('xbrl_cached', 0)} from the fact cache, "
+                f"cells by source: {extraction['cells']}")
+    provenance_file_key = f"{S3_PROVENANCE_PREFIX}{ticker.lower()}.csv"
+    provenance_df = pd.DataFrame(extraction['provenance'])
+    provenance_df.insert(0, 'Accounting Variable', provenance_df.index)
+    try:
+        if report_dates is not None:
+            try:
+                stored_df = read_csv_from_s3(file_key=provenance_file_key, bucket_name=S3_BUCKET_NAME)
+                if list(stored_df['Accounting Variable']) == list(provenance_df['Accounting Variable']):
+                    provenance_df = merge_report_columns(stored_df, provenance_df, report_dates)
+            except FileNotFoundError:
+                pass
+        write_df_to_csv_s3(provenance_df, file_key=provenance_file_key, bucket_name=S3_BUCKET_NAME)
+    except Exception as e:
+        logger.error(f"Could not save extraction provenance for {ticker}: {e}")
+
+
 def run_dataloader(start_index, end_index): # Removed json_file argument
     """
     Fetches all US company tickers and processes them in batches.
@@ -207,8 +261,8 @@ def run_dataloader(start_index, end_index): # Removed json_file argument
     logger.info(f"Successfully loaded {len(all_companies)} companies. Processing batch from index {start} to {end-1}.")
     logger.info("--------------------------------------------------")
 
+    # SEC requests are paced by the shared rate-limited client, no need to sleep between tickers
     for iter_company in companies_to_process:
-        time.sleep(1)
         ticker = iter_company['ticker']
         logger.info(f" --------- Starting loading for {ticker} ---------------")
         get_company_info(ticker, update_all=False)
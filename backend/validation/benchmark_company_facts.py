@@ -0,0 +1,91 @@
+"""
+Benchmark of companyfacts parsing: the previous response.json() + full walk over every
+us-gaap/dei concept against load_company_facts (headers/company_facts.py), which streams the
+document with ijson, keeping only the concepts of the concept map and the last five years.
+Reports parse time and peak Python memory (tracemalloc) of each.
+
+The document is a companyfacts JSON on disk, e.g. saved from
+https://data.sec.gov/api/xbrl/companyfacts/CIK0000320193.json (large filers are 5-20 MB).
+
+Usage (from the backend/ directory):
+    python -m validation.benchmark_company_facts --json CIK0000320193.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '..'))
+
+from headers import company_facts
+from headers.concept_map import extended_financial_extractor
+
+
+def load_legacy(path, since):
+    """The whole-document parse previously done by fetch_company_facts_from_sec_api, kept here as the baseline."""
+    with open(path, 'rb') as f:
+        company_facts_data = json.load(f)
+    all_facts = []
+    for taxonomy_type in ['us-gaap', 'dei']:
+        for concept, concept_data in company_facts_data.get('facts', {}).get(taxonomy_type, {}).items():
+            for unit_data_list in concept_data.get('units', {}).values():
+                for fact_entry in unit_data_list:
+                    period_datetime = datetime.fromisoformat(fact_entry['end'])
+                    if period_datetime.date() >= since and fact_entry.get('val') is not None:
+                        all_facts.append((concept, fact_entry['val'], period_datetime))
+    return all_facts
+
+
+def load_streamed(path, since):
+    with open(path, 'rb') as f:
+        return company_facts.load_company_facts(f, extended_financial_extractor.concepts, since).facts()
+
+
+def measure(load, path, since):
+    """(facts, seconds, peak MB); the time is taken without tracemalloc, which slows parsing down."""
+    started = time.perf_counter()
+    facts = load(path, since)
+    seconds = time.perf_counter() - started
+
+    tracemalloc.start()
+    load(path, since)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return facts, seconds, peak / 1e6
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--json', required=True, help="Path of a companyfacts JSON document")
+    arg_parser.add_argument('--years', type=int, default=5, help="Only keep periods ending in the last N years")
+    args = arg_parser.parse_args()
+
+    since = datetime.now().date() - timedelta(days=args.years * 365)
+    parsers = [('json + walk', load_legacy)]
+    if company_facts.ijson is not None:
+        parsers.append((f'ijson ({company_facts.ijson.backend})', load_streamed))
+    else:
+        print("ijson is not installed: load_company_facts falls back to json.load")
+        parsers.append(('json fallback', load_streamed))
+
+    print(f"{os.path.basename(args.json)}: {os.path.getsize(args.json) / 1e6:.1f} MB")
+    print(f"{'parser':<24} {'facts kept':>10} {'parse s':>8} {'peak MB':>8}")
+    results = {}
+    for name, load in parsers:
+        facts, seconds, peak = measure(load, args.json, since)
+        results[name] = facts
+        print(f"{name:<24} {len(facts):>10} {seconds:>8.2f} {peak:>8.1f}")
+
+    legacy = sorted((concept, float(value), end) for concept, value, end in results['json + walk']
+                    if concept in extended_financial_extractor.concepts)
+    streamed = sorted(results[parsers[1][0]])
+    if legacy != streamed:
+        raise SystemExit("Streamed facts differ from the concept-map facts of the full parse")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+"""
+Micro-benchmark of the one-pass concept index (headers/concept_index.py) against the
+find_latest_tuple_by_string scans it replaced, filling one report date's variables, and of
+the compiled concept mapping extractor (headers/concept_map.py) that now does the filling.
+
+The fact set is taken from a real 10-K: either an XBRL instance (URL or local path, parsed
+with py-xbrl) or an instance JSON saved with XbrlInstance.json() (e.g. an old xbrl_json_data/<filing>.json).
+Without either, a synthetic fact list of --facts entries is used.
+
+Usage (from the backend/ directory):
+    python -m validation.benchmark_concept_index --instance https://www.sec.gov/Archives/edgar/data/320193/000032019324000123/aapl-20240928.htm
+    python -m validation.benchmark_concept_index --json aapl-20240928.json --repeat 200
+    python -m validation.benchmark_concept_index --facts 3000 6000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '..'))
+
+from headers.concept_index import build_concept_index, find_latest_in_index
+from headers.concept_map import financial_extractor
+
+# The concept fallback lists looked up for every report date by xbrl_data_processor
+CONCEPT_LOOKUPS = [
+    ["Revenues", "RevenueFromContractWithCustomerExcludingAssessedTax"],
+    ["OperatingIncomeLoss"],
+    ["StockholdersEquity"],
+    ["DebtCurrent"],
+    ["LongTermDebtNoncurrent"],
+    ["LongTermLeaseLiabilityNoncurrentNet"],
+    ["CashAndCashEquivalentsAtCarryingValue"],
+    ["IncomeTaxExpenseBenefit"],
+    ["CurrentLeaseLiabilityNet"],
+    ["LesseeOperatingLeaseLiabilityPaymentsDueNextTwelveMonths"],
+    ["LesseeOperatingLeaseLiabilityPaymentsDueYearTwo"],
+    ["LesseeOperatingLeaseLiabilityPaymentsDueYearThree"],
+    ["LesseeOperatingLeaseLiabilityPaymentsDueYearFour"],
+    ["LesseeOperatingLeaseLiabilityPaymentsDueYearFive"],
+    ["LesseeOperatingLeaseLiabilityPaymentsDueAfterYearFive"],
+    ["NetIncomeLoss"],
+    ["AssetsCurrent"],
+    ["LiabilitiesCurrent"],
+    ["LiabilitiesAndStockholdersEquity"],
+    ["Assets"],
+    ["InventoryNet"],
+    ["CostOfRevenue", "CostOfGoodsAndServicesSold"],
+    ["GrossProfit"],
+    ["CostsAndExpenses"],
+    ["ResearchAndDevelopmentExpense"],
+    ["InterestExpense"],
+    ["PropertyPlantAndEquipmentNet"],
+    ["Depreciation", "DepreciationDepletionAndAmortization", "DepreciationAmortizationAndOther",
+     "DepreciationAmortizationAndAccretionNet"],
+    ["AmortizationOfIntangibleAssets"],
+]
+
+
+def find_latest_tuple_by_string(data_list, search_string_list):
+    """The linear scan previously used by the XBRL processors, kept here as the baseline."""
+    search_string = None
+
+    for search_element in search_string_list:
+        for main_tuple in data_list:
+            if search_element == main_tuple[0]:
+                search_string = search_element
+                break
+        if search_string:
+                break
+
+    latest_tuple = None
+
+    for current_tuple in data_list:
+        str_value, num_value, dt_object = current_tuple
+
+        if str_value == search_string:
+            if latest_tuple is None:
+                latest_tuple = current_tuple
+            else:
+                _, _, latest_dt_object = latest_tuple
+                if dt_object > latest_dt_object:
+                    latest_tuple = current_tuple
+
+    return latest_tuple
+
+
+def facts_from_json(data):
+    """(concept, value, end date) tuples of the non-dimensional facts of an instance JSON."""
+    facts = []
+    for fact_data in data.get("facts", {}).values():
+        dimensions = fact_data.get("dimensions", {})
+        if len(dimensions) != 5 or "concept" not in dimensions or "period" not in dimensions or "value" not in fact_data:
+            continue
+        date_str = dimensions["period"].split('/')[-1]
+        try:
+            facts.append((dimensions["concept"], fact_data["value"], datetime.fromisoformat(date_str)))
+        except ValueError:
+            continue
+    return facts
+
+
+def load_instance_facts(instance):
+    from xbrl.cache import HttpCache
+    from xbrl.instance import XbrlParser
+    from headers.sec_client import sec_client, USER_AGENT
+    from headers.instance_facts import extract_instance_facts
+
+    cache = HttpCache(os.path.join('/tmp', 'xbrl_cache'), verify_https=False)
+    cache.set_headers({'User-Agent': USER_AGENT})
+    sec_client.attach_to_cache(cache)
+    inst = XbrlParser(cache).parse_instance(instance)
+    return extract_instance_facts(inst)
+
+
+def synthetic_facts(count, seed=0):
+    """A 10-K sized fact list: a few hundred concepts, each reported for a handful of periods."""
+    rng = random.Random(seed)
+    concepts = [concept for lookup in CONCEPT_LOOKUPS for concept in lookup]
+    concepts += [f"ExtensionConcept{i}" for i in range(max(count // 6 - len(concepts), 0))]
+    end = datetime(2024, 9, 28)
+    return [
+        (rng.choice(concepts), rng.uniform(-1e9, 1e11), end - timedelta(days=365 * rng.randint(0, 3)))
+        for _ in range(count)
+    ]
+
+
+def fill_legacy(facts):
+    # Each variable was looked up twice: once to test for None, once to take [1]
+    values = []
+    for lookup in CONCEPT_LOOKUPS:
+        found = find_latest_tuple_by_string(facts, lookup)
+        values.append(find_latest_tuple_by_string(facts, lookup)[1] if found is not None else 0.0)
+    return values
+
+
+def fill_indexed(facts):
+    concept_index = build_concept_index(facts)
+    values = []
+    for lookup in CONCEPT_LOOKUPS:
+        found = find_latest_in_index(concept_index, lookup)
+        values.append(found[1] if found is not None else 0.0)
+    return values
+
+
+def fill_extracted(facts):
+    return financial_extractor.extract(facts)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = arg_parser.add_mutually_exclusive_group()
+    source.add_argument('--instance', help="URL or path of a 10-K XBRL instance (iXBRL .htm or .xml)")
+    source.add_argument('--json', help="Path of an instance JSON saved with XbrlInstance.json()")
+    arg_parser.add_argument('--facts', type=int, nargs='+', default=[3000], help="Synthetic fact counts")
+    arg_parser.add_argument('--repeat', type=int, default=50)
+    args = arg_parser.parse_args()
+
+    if args.instance:
+        fact_sets = [(args.instance, load_instance_facts(args.instance))]
+    elif args.json:
+        with open(args.json, 'r') as f:
+            fact_sets = [(args.json, facts_from_json(json.load(f)))]
+    else:
+        fact_sets = [(f"synthetic-{count}", synthetic_facts(count)) for count in args.facts]
+
+    print(f"{'fact set':<40} {'facts':>7} {'legacy ms':>10} {'index ms':>9} {'extract ms':>11} {'speedup':>8}")
+    for name, facts in fact_sets:
+        if fill_legacy(facts) != fill_indexed(facts):
+            raise SystemExit(f"Concept index output differs from the linear scans for {name}")
+
+        # One run fills all variables of one report date
+        legacy_s = min(timeit.repeat(lambda: fill_legacy(facts), number=args.repeat, repeat=3)) / args.repeat
+        index_s = min(timeit.repeat(lambda: fill_indexed(facts), number=args.repeat, repeat=3)) / args.repeat
+        extract_s = min(timeit.repeat(lambda: fill_extracted(facts), number=args.repeat, repeat=3)) / args.repeat
+        print(f"{name[-40:]:<40} {len(facts):>7} {legacy_s * 1000:>10.3f} {index_s * 1000:>9.3f} "
+              f"{extract_s * 1000:>11.3f} {legacy_s / extract_s:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Micro-benchmark of the vectorized ratio engine (src/ratio_engine.py) against the
+per-date Python loops it replaced, on synthetic wide company frames.
+
+Usage (from the backend/ directory):
+    python -m validation.benchmark_ratio_engine --years 40 60 --repeat 200
+"""
+import argparse
+import os
+import sys
+import timeit
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '..'))
+
+from src.ratio_engine import evaluate_ratios
+from src.ratio_registry import RATIO_REGISTRY
+
+ACCOUNTING_VARIABLES = [
+    'Revenue', 'OperatingIncome', 'Equity(BV)', 'ShortTermDebt(BV)', 'LongTermDebtWithoutLease(BV)',
+    'LongTermLease(BV)', 'LongTermDebt(BV)', 'Debt(BV)', 'Cash', 'Tax', 'NetIncome', 'CurrentAssets',
+    'CurrentLiabilities', 'TotalLiability', 'TotalAsset', 'Inventory', 'CostofSales', 'GrossProfit', 'Interest',
+]
+
+# The eight dashboard ratios: (registry name, metric name, numerator, denominator, scale, averaged denominator)
+RATIOS = [
+    ('net-margin', "Net Profit Margin", 'NetIncome', 'Revenue', 100, False),
+    ('operating-margin', "Operating Margin", 'OperatingIncome', 'Revenue', 100, False),
+    ('current-ratio', "Current Ratio", 'CurrentAssets', 'CurrentLiabilities', 1, False),
+    ('cash-ratio', "Cash Ratio", 'Cash', 'CurrentLiabilities', 1, False),
+    ('debtequity-ratio', "Debt Equity Ratio", 'TotalLiability', 'Equity(BV)', 1, False),
+    ('debtasset-ratio', "Debt Asset Ratio", 'TotalLiability', 'TotalAsset', 1, False),
+    ('inventoryturnover-ratio', "Inventory Turnover Ratio", 'Revenue', 'Inventory', 1, True),
+    ('assetturnover-ratio', "Asset Turnover Ratio", 'Revenue', 'TotalAsset', 1, True),
+]
+
+
+def build_frame(years, seed=0):
+    """Builds a company frame shaped like company-csv-data/<ticker>.csv with one column per year."""
+    rng = np.random.default_rng(seed)
+    dates = [f"{year}-12-31" for year in range(2024 - years + 1, 2025)]
+    values = rng.uniform(-1e9, 1e11, size=(len(ACCOUNTING_VARIABLES), len(dates)))
+    values[rng.random(values.shape) < 0.05] = 0.0
+    df = pd.DataFrame(values, columns=dates)
+    df.insert(0, 'Accounting Variable', ACCOUNTING_VARIABLES)
+    return df
+
+
+def legacy_ratio(df, metric_name, numerator_row, denominator_row, scale, average_denominator):
+    """The per-date loop previously duplicated across src/*ratio.py, kept here as the baseline."""
+    numerator_raw = df[df['Accounting Variable'] == numerator_row].iloc[0].drop('Accounting Variable')
+    denominator_raw = df[df['Accounting Variable'] == denominator_row].iloc[0].drop('Accounting Variable')
+
+    graph_data = []
+    numeric_values = []
+    all_dates = sorted(list(set(numerator_raw.index) & set(denominator_raw.index)))
+
+    previous = None
+    for i, date_col in enumerate(all_dates):
+        numerator = pd.to_numeric(numerator_raw.get(date_col, 0.0), errors='coerce')
+        denominator = pd.to_numeric(denominator_raw.get(date_col, 0.0), errors='coerce')
+        if pd.isna(numerator) or pd.isna(denominator):
+            previous = denominator
+            continue
+        if average_denominator:
+            if i > 0 and previous is not None:
+                divisor = (previous + denominator) / 2
+            else:
+                previous = denominator
+                continue
+            previous = denominator
+        else:
+            divisor = denominator
+        value = (numerator / divisor) * scale if divisor != 0 else 0.0
+        graph_data.append({'date': date_col, 'value': value})
+        numeric_values.append(value)
+
+    graph_data.sort(key=lambda x: datetime.strptime(x['date'], '%Y-%m-%d'))
+    average = pd.Series(numeric_values).mean() if numeric_values else 0
+    std_dev = pd.Series(numeric_values).std() if len(numeric_values) > 1 else 0
+    return {
+        "status": "success",
+        "data": {
+            "metric_name": metric_name,
+            "graph_data": graph_data,
+            "statistics": {"average_margin": round(average, 2), "std_dev_margin": round(std_dev, 2)}
+        }
+    }
+
+
+def run_legacy(df):
+    return [legacy_ratio(df, *ratio[1:]) for ratio in RATIOS]
+
+
+def run_engine(df):
+    results = evaluate_ratios(df, [RATIO_REGISTRY[ratio[0]] for ratio in RATIOS])
+    return [payload for payload, _ in results.values()]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--years', type=int, nargs='+', default=[10, 40, 60])
+    arg_parser.add_argument('--repeat', type=int, default=100)
+    args = arg_parser.parse_args()
+
+    print(f"{'years':>6} {'legacy ms/req':>14} {'engine ms/req':>14} {'speedup':>8}")
+    for years in args.years:
+        df = build_frame(years)
+        if run_legacy(df) != run_engine(df):
+            raise SystemExit(f"Engine output differs from the legacy loop for a {years}-year frame")
+
+        # One "request" evaluates all eight dashboard ratios against the frame
+        legacy_s = min(timeit.repeat(lambda: run_legacy(df), number=args.repeat, repeat=3)) / args.repeat
+        engine_s = min(timeit.repeat(lambda: run_engine(df), number=args.repeat, repeat=3)) / args.repeat
+        print(f"{years:>6} {legacy_s * 1000:>14.3f} {engine_s * 1000:>14.3f} {legacy_s / engine_s:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
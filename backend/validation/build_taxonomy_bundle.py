@@ -0,0 +1,55 @@
+"""
+Builds the XBRL taxonomy bundle loaded by the parsers at startup (headers/taxonomy_bundle.py):
+the us-gaap, srt, dei, ecd and cyd taxonomies of the given years, with every schema and
+linkbase they pull, packed as a gzipped tar with a namespace catalog. Fresh instances then
+parse filings without downloading any taxonomy file.
+
+The bundle is written to headers/taxonomy_bundles/ (picked up by default, newest first) and,
+with --upload, to S3 under xbrl-taxonomy-bundles/, from where instances started with
+XBRL_TAXONOMY_BUNDLE=<bundle file name> download it.
+
+Usage (from the backend/ directory):
+    python -m validation.build_taxonomy_bundle --years 2019-2025 --upload
+"""
+import argparse
+import logging
+import os
+import sys
+from datetime import datetime
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '..'))
+
+from headers.taxonomy_bundle import DEFAULT_BUNDLE_DIR, build_taxonomy_bundle, upload_taxonomy_bundle
+
+USER_AGENT = "YourCustomResearchApp/1.0 (your.email@example.com)"
+
+
+def parse_years(value):
+    first, _, last = value.partition('-')
+    return list(range(int(first), int(last or first) + 1))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    current_year = datetime.now().year
+    arg_parser.add_argument('--years', type=parse_years, default=parse_years(f"{current_year - 6}-{current_year}"),
+                            help="Taxonomy years, e.g. 2019-2025 (default: the last 7 years)")
+    arg_parser.add_argument('--schema', action='append', default=[], metavar='NAMESPACE=URL',
+                            help="Additional taxonomy to include, may be repeated")
+    arg_parser.add_argument('--output-dir', default=DEFAULT_BUNDLE_DIR)
+    arg_parser.add_argument('--upload', action='store_true', help="Also store the bundle in S3 (S3_BUCKET_NAME)")
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    extra_schemas = dict(schema.split('=', 1) for schema in args.schema)
+    bundle_path = build_taxonomy_bundle(args.years, args.output_dir, user_agent=USER_AGENT, extra_schemas=extra_schemas)
+    print(f"Bundle: {bundle_path} ({os.path.getsize(bundle_path) / 1e6:.1f} MB)")
+
+    if args.upload:
+        upload_taxonomy_bundle(bundle_path)
+        print(f"Uploaded to S3 as xbrl-taxonomy-bundles/{os.path.basename(bundle_path)}")
+
+
+if __name__ == '__main__':
+    main()
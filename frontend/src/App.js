@@ -1,9 +1,10 @@
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import DropdownButton from './components/Button/dropdownbutton';
 import './App.css';
 
 // Import API functions
 import { fetchCompanyInfo } from './api/companyInfo';
+import { fetchAllRatios } from './api/ratios';
 
 // Import ratio components
 import NetProfitMarginChart from './features/ProfitabilityRatios/NetProfitMargin';
@@ -18,6 +19,18 @@ import AssetTurnoverChart from './features/EfficiencyRatios/AssetTurnover';
 // Import the JSON data
 import allCompaniesData from './us_company_tickers.json'; // Adjust the path as needed
 
+// Ratio slug (see /api/ratios) shown by each ratio component
+const RATIO_METRICS = {
+  NetProfitMargin: 'net-margin',
+  OperatingMargin: 'operating-margin',
+  CurrentRatio: 'current-ratio',
+  CashRatio: 'cash-ratio',
+  DebtEquityRatio: 'debtequity-ratio',
+  DebtAssetRatio: 'debtasset-ratio',
+  InventoryTurnover: 'inventoryturnover-ratio',
+  AssetTurnover: 'assetturnover-ratio',
+};
+
 function App() {
   const [openDropdownIndex, setOpenDropdownIndex] = useState(null);
   const [isLoading, setIsLoading] = useState(false);
@@ -33,6 +46,10 @@ function App() {
   const [selectedCompanyName, setSelectedCompanyName] = useState(null);
   // State to determine which ratio chart to display
   const [activeRatioComponent, setActiveRatioComponent] = useState(null);
+  // Every dashboard ratio of the selected company, fetched in a single request
+  const [ratios, setRatios] = useState({ ticker: null, data: null, error: null });
+  const [ratiosLoading, setRatiosLoading] = useState(false);
+  const ratiosRequestedFor = useRef(null); // Ticker whose ratios were last requested
   // --- End Search State ---
 
   const dropdownsData = [
@@ -78,6 +95,34 @@ function App() {
     event.preventDefault();
   };
 
+  // Fetch all ratios once per company, when the first ratio is shown (after its data is processed)
+  useEffect(() => {
+    if (!selectedCompanyTicker || !activeRatioComponent || isLoading || ratiosRequestedFor.current === selectedCompanyTicker) {
+      return;
+    }
+
+    const ticker = selectedCompanyTicker;
+    ratiosRequestedFor.current = ticker;
+    const loadRatios = async () => {
+      setRatiosLoading(true);
+      let loaded;
+      try {
+        const result = await fetchAllRatios(ticker, Object.values(RATIO_METRICS));
+        loaded = { ticker, data: result.data || {}, error: null };
+      } catch (err) {
+        console.error("Failed to fetch ratio data:", err);
+        loaded = { ticker, data: null, error: err.message || 'Network error' };
+      }
+      // Ignore the answer if another company was selected meanwhile
+      if (ratiosRequestedFor.current === ticker) {
+        setRatios(loaded);
+        setRatiosLoading(false);
+      }
+    };
+
+    loadRatios();
+  }, [selectedCompanyTicker, activeRatioComponent, isLoading]);
+
   const handleCompanySelect = async (company) => {
     //alert(`You selected: ${company.name} (${company.ticker})`);
     setSearchQuery(company.name);
@@ -86,6 +131,10 @@ function App() {
     setSelectedCompanyTicker(company.ticker);
     setSelectedCompanyName(company.name);
     setActiveRatioComponent(null); // Clear any active ratio display
+    // Ratios are fetched again for the new company
+    ratiosRequestedFor.current = null;
+    setRatios({ ticker: null, data: null, error: null });
+    setRatiosLoading(false);
 
     console.log(`Company "${company.name}" selected from search. Now fetching overview data.`);
 
@@ -185,67 +234,67 @@ function App() {
       );
     }
 
+    // Props of the active ratio component: its slice of the bundled ratios response
+    const ratioProps = {
+        selectedCompanyName,
+        ratioResult: ratios.data ? ratios.data[RATIO_METRICS[activeRatioComponent]] : null,
+        isLoading: ratiosLoading || ratios.ticker !== selectedCompanyTicker,
+        fetchError: ratios.error,
+    };
+
     // Render the active ratio component based on the state
     switch (activeRatioComponent) {
         case 'NetProfitMargin':
             return (
                 <NetProfitMarginChart
-                    selectedCompanyTicker={selectedCompanyTicker}
-                    selectedCompanyName={selectedCompanyName}
+                    {...ratioProps}
                 />
             );
         case 'OperatingMargin':
             return (
                 <OperatingMarginChart
-                    selectedCompanyTicker={selectedCompanyTicker}
-                    selectedCompanyName={selectedCompanyName}
+                    {...ratioProps}
                 />
             );
         case 'CurrentRatio':
             return (
                 <CurrentRatioChart
-                    selectedCompanyTicker={selectedCompanyTicker}
-                    selectedCompanyName={selectedCompanyName}
+                    {...ratioProps}
                 />
             );
 
         case 'CashRatio':
             return (
                 <CashRatioChart
-                    selectedCompanyTicker={selectedCompanyTicker}
-                    selectedCompanyName={selectedCompanyName}
+                    {...ratioProps}
                 />
             );
 
         case 'DebtEquityRatio':
             return (
                 <DebtEquityRatioChart
-                    selectedCompanyTicker={selectedCompanyTicker}
-                    selectedCompanyName={selectedCompanyName}
+                    {...ratioProps}
                 />
             );
 
         case 'DebtAssetRatio':
             return (
                 <DebtAssetRatioChart
-                    selectedCompanyTicker={selectedCompanyTicker}
-                    selectedCompanyName={selectedCompanyName}
+                    {...ratioProps}
                 />
             );
 
         case 'InventoryTurnover':
             return (
                 <InventoryTurnoverChart
-                    selectedCompanyTicker={selectedCompanyTicker}
-                    selectedCompanyName={selectedCompanyName}
+                    {...ratioProps}
                 />
             );
 
         case 'AssetTurnover':
             return (
                 <AssetTurnoverChart
-                    selectedCompanyTicker={selectedCompanyTicker}
-                    selectedCompanyName={selectedCompanyName}
+                    {...ratioProps}
                 />
             );
         // Add cases for other ratio components here
@@ -1,11 +1,39 @@
 // src/api/companyInfo.js
 const BASE_URL = process.env.REACT_APP_API_BASE_URL;
+const JOB_POLL_INTERVAL_MS = 2000;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Polls an ingestion job until it finishes and returns its final state
+const waitForIngestionJob = async (statusUrl) => {
+    while (true) {
+        const response = await fetch(`${BASE_URL}${statusUrl}`);
+        if (!response.ok) {
+            const errorData = await response.json();
+            throw new Error(`HTTP error! status: ${response.status}, message: ${errorData.message}`);
+        }
+        const { data: job } = await response.json();
+        if (job.status === 'succeeded') {
+            return { status: 'success', message: job.message, ticker: job.ticker, job };
+        }
+        if (job.status === 'failed') {
+            throw new Error(`Ingestion failed for ${job.ticker}: ${job.message}`);
+        }
+        await sleep(JOB_POLL_INTERVAL_MS);
+    }
+};
 
 export const fetchCompanyInfo = async (ticker) => {
-    const response = await fetch(`${BASE_URL}/api/company-info/${ticker}`);
+    // swr: tickers already in S3 are confirmed immediately and refreshed in the background
+    const response = await fetch(`${BASE_URL}/api/company-info/${ticker}?mode=swr`);
     if (!response.ok) {
         const errorData = await response.json();
         throw new Error(`HTTP error! status: ${response.status}, message: ${errorData.message}`);
     }
-    return response.json();
-};
\ No newline at end of file
+    const data = await response.json();
+    // 202 Accepted: ingestion runs in the background, wait for the job to finish
+    if (response.status === 202 && data.status_url) {
+        return waitForIngestionJob(data.status_url);
+    }
+    return data;
+};
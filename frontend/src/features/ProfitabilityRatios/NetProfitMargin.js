@@ -1,54 +1,21 @@
 // src/features/Profitability/NetProfitMarginChart.js
-import React, { useState, useEffect } from 'react';
+import React from 'react';
 import {
   LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer
 } from 'recharts';
-import { fetchNetProfitMargin } from '../../api/ratios';
 import { formatPercentage } from '../../utils/formatters'; // Using the formatter
 // Assuming you create a LoadingSpinner component
 // import LoadingSpinner from '../../components/LoadingSpinner/LoadingSpinner';
 
 
-const NetProfitMarginChart = ({ selectedCompanyTicker, selectedCompanyName }) => {
-  const [graphData, setGraphData] = useState(null);
-  const [stats, setStats] = useState(null);
-  const [isLoading, setIsLoading] = useState(false);
-  const [error, setError] = useState(null);
-
-  useEffect(() => {
-    const loadData = async () => {
-      if (!selectedCompanyTicker) {
-        // setError("No company selected. Please select a company from the search bar.");
-        return; // Don't fetch if no company is selected
-      }
-
-      setIsLoading(true);
-      setError(null);
-      setGraphData(null);
-      setStats(null);
-
-      try {
-        const result = await fetchNetProfitMargin(selectedCompanyTicker); // Call the centralized API function
-
-        if (result.status === "success" && result.data) {
-          setGraphData(result.data.graph_data);
-          console.log(result.data.graph_data);
-          setStats(result.data.statistics);
-        } else {
-          setError(result.message || "Failed to load net profit margin data.");
-        }
-      } catch (err) {
-        console.error("Failed to fetch Net Profit Margin data:", err);
-        setError(`Failed to load Net Profit Margin: ${err.message || 'Network error'}.`);
-      } finally {
-        setIsLoading(false);
-      }
-    };
-
-    // This effect runs whenever selectedCompanyTicker changes,
-    // ensuring data is re-fetched for a new company.
-    loadData();
-  }, [selectedCompanyTicker]); // Dependency array: re-run when selectedCompanyTicker changes
+const NetProfitMarginChart = ({ selectedCompanyName, ratioResult, isLoading, fetchError }) => {
+  // App fetches every ratio of the company in one request and passes this ratio's slice
+  const loaded = ratioResult && ratioResult.status === "success" && ratioResult.data;
+  const graphData = loaded ? ratioResult.data.graph_data : null;
+  const stats = loaded ? ratioResult.data.statistics : null;
+  const error = fetchError
+    ? `Failed to load Net Profit Margin: ${fetchError}.`
+    : (ratioResult && !loaded ? (ratioResult.message || "Failed to load net profit margin data.") : null);
 
   if (isLoading) {
     return (